@@ -8,4 +8,5 @@ python3 manage.py collectstatic --no-input
 # Apply any outstanding database migrations
 python3 manage.py migrate --noinput
 # Start the application
-gunicorn snap_menu.wsgi:application --bind 0.0.0.0:$PORT
\ No newline at end of file
+# ASGI, so the long-lived order feed (SSE) costs a coroutine, not a worker
+gunicorn snap_menu.asgi:application -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:$PORT
\ No newline at end of file
@@ -1,11 +1,10 @@
 from django.contrib import admin
-import qrcode
+from django.db import transaction
 import zipfile
 import io
 from django.contrib import admin
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.urls import reverse
-import qrcode
 from io import BytesIO
 from django.core.files import File
 from django.contrib import admin
@@ -26,13 +25,15 @@ from .models import (
     Category,
     ProductVariation,
     MenuVisit,
+    MenuVisitDaily,
+    MenuVisitHourly,
     Notification 
     )
 from django.utils.html import format_html
 from django.core.files.base import ContentFile
-from django.utils.text import slugify
-from PIL import Image
-from django.db.models import Sum
+from django.db.models import DecimalField, F, OuterRef, Prefetch, Subquery, Sum
+from .qr_export import build_qrcode_pdf, stream_qrcode_zip
+from .qrcode_generator import assign_table_qrcodes, qrcode_pool
 
 
 
@@ -43,6 +44,14 @@ class MenuVisitAdmin(admin.ModelAdmin):
     search_fields = ('restaurant__name', 'device')
 
 
+@admin.register(MenuVisitHourly, MenuVisitDaily)
+class MenuVisitRollupAdmin(admin.ModelAdmin):
+    list_display = ('restaurant', 'period_start', 'device', 'visits')
+    list_filter = ('restaurant', 'device')
+    list_select_related = ('restaurant',)
+    date_hierarchy = 'period_start'
+
+
 # Register your models here.
 class CustomerAdmin(admin.ModelAdmin):
     pass
@@ -81,6 +90,22 @@ admin.site.register(Notification, NotificationAdmin)
 class RestaurantAdmin(admin.ModelAdmin):
     list_display = ('restaurant_name', 'address', 'mobile', 'latitude', 'longitude', 'business_hours')
     search_fields = ('restaurant_name', 'address')
+    actions = ['download_table_qr_codes', 'regenerate_table_qr_codes']
+
+    def download_table_qr_codes(self, request, queryset):
+        tables = Table.objects.filter(restaurant__in=queryset).select_related('restaurant')
+        response = HttpResponse(build_qrcode_pdf(tables), content_type='application/pdf')
+        response['Content-Disposition'] = 'attachment; filename=restaurant_table_qrcodes.pdf'
+        return response
+
+    download_table_qr_codes.short_description = 'Download printable QR sheet for all tables (PDF)'
+
+    def regenerate_table_qr_codes(self, request, queryset):
+        for restaurant_id in queryset.values_list('id', flat=True):
+            transaction.on_commit(lambda rid=restaurant_id: qrcode_pool.submit(assign_table_qrcodes, rid, True))
+        self.message_user(request, f'Regenerating table QR codes for {queryset.count()} restaurant(s).')
+
+    regenerate_table_qr_codes.short_description = 'Regenerate table QR codes (after a logo or format change)'
     
     def save_model(self, request, obj, form, change):
         # Ensure no rounding occurs for latitude and longitude
@@ -89,6 +114,9 @@ class RestaurantAdmin(admin.ModelAdmin):
         if 'longitude' in form.changed_data:
             obj.longitude = form.cleaned_data['longitude']
         super().save_model(request, obj, form, change)
+        if change and 'qr_format' in form.changed_data:
+            # Existing tables keep their old file until the new format is rendered.
+            transaction.on_commit(lambda: qrcode_pool.submit(assign_table_qrcodes, obj.id, True))
 
 admin.site.register(Restaurant, RestaurantAdmin)
 
@@ -162,6 +190,24 @@ class OrderAdmin(admin.ModelAdmin):
     search_fields = ('customer__user__first_name', 'customer__user__last_name', 'orderproduct__product__name', 'restaurant__restaurant_name')
     readonly_fields = ('order_date', 'total_amount')
 
+    def get_queryset(self, request):
+        # Total via a correlated subquery so search joins on orderproduct can't inflate it
+        line_totals = (
+            OrderProduct.objects
+            .filter(order=OuterRef('pk'))
+            .values('order')
+            .annotate(total=Sum(F('quantity') * F('price')))
+            .values('total')
+        )
+        return (
+            super().get_queryset(request)
+            .select_related('customer__user', 'restaurant')
+            .prefetch_related(
+                Prefetch('orderproduct_set', queryset=OrderProduct.objects.select_related('product'))
+            )
+            .annotate(line_total=Subquery(line_totals, output_field=DecimalField(max_digits=12, decimal_places=2)))
+        )
+
     def customer_name(self, obj):
         if obj.customer and obj.customer.user:
             return f"{obj.customer.user.first_name} {obj.customer.user.last_name}"
@@ -175,16 +221,20 @@ class OrderAdmin(admin.ModelAdmin):
     restaurant_name.short_description = 'Restaurant Name'
 
     def ordered_products(self, obj):
-        order_items = OrderProduct.objects.filter(order=obj)
+        order_items = obj.orderproduct_set.all()
         product_list = ', '.join([f"{item.product.name} (x{item.quantity})" for item in order_items])
         return product_list
     ordered_products.short_description = 'Ordered Products'
 
     def total_amount(self, obj):
-        order_items = OrderProduct.objects.filter(order=obj)
-        total = sum(item.quantity * item.price for item in order_items)
-        return total
+        if not obj.pk:
+            return 0
+        total = getattr(obj, 'line_total', None)
+        if total is None and not hasattr(obj, 'line_total'):
+            total = sum(item.quantity * item.price for item in obj.orderproduct_set.all())
+        return total or 0
     total_amount.short_description = 'Total Amount'
+    total_amount.admin_order_field = 'line_total'
 
 admin.site.register(Orders, OrderAdmin)
 
@@ -228,7 +278,7 @@ admin.site.register(TopUpRequest, TopUpRequestAdmin)
 
 class TableAdmin(admin.ModelAdmin):
     list_display = ('table_number', 'view_qrcode')
-    actions = ['download_qr_codes']
+    actions = ['download_qr_codes', 'download_qr_codes_pdf']
 
     def view_qrcode(self, obj):
         if obj.qrcode_image:
@@ -239,57 +289,20 @@ class TableAdmin(admin.ModelAdmin):
     view_qrcode.short_description = 'QR Code'
 
     def download_qr_codes(self, request, queryset):
-        # Generate individual QR code images for download
-        for table in queryset:
-            base_url = "http://172.20.10.3:8000/"  # Replace with your desired base URL
-            restaurant_name_slug = slugify(table.restaurant.restaurant_name)  # Slugify the name
-            table_qrcode_url = f'{base_url}/dashboard/{restaurant_name_slug}/{table.restaurant.id}'
-
-            # Generate the QR code image
-            qr = qrcode.QRCode(
-                version=None,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=15,
-                border=4,
-            )
-            qr.add_data(table_qrcode_url)
-            qr.make(fit=True)
-
-            qr_image = qr.make_image(fill_color="green", back_color="white").convert('RGBA')
-
-            # Load the restaurant logo picture
-            if table.restaurant.logo_pic:
-                restaurant_logo_image_path = table.restaurant.logo_pic.path
-                restaurant_logo_image = Image.open(restaurant_logo_image_path).convert('RGBA')
-
-                # Calculate size and position to overlay the logo picture
-                qr_width, qr_height = qr_image.size
-                logo_image_size = qr_width // 8
-                logo_image = restaurant_logo_image.resize((logo_image_size, logo_image_size))
-
-                # Create a transparent image for pasting
-                transparent = Image.new('RGBA', (qr_width, qr_height))
-                transparent.paste(qr_image, (0, 0))
-
-                # Calculate the position for the logo
-                logo_position = (
-                    (qr_width - logo_image_size) // 2,
-                    (qr_height - logo_image_size) // 2,
-                )
-
-                # Paste the logo onto the transparent image
-                transparent.paste(logo_image, logo_position, logo_image)
-                qr_image = transparent
+        response = StreamingHttpResponse(
+            stream_qrcode_zip(queryset.select_related('restaurant')),
+            content_type='application/zip',
+        )
+        response['Content-Disposition'] = 'attachment; filename=table_qrcodes.zip'
+        return response
 
-            # Save the image to a BytesIO buffer
-            image_buffer = BytesIO()
-            qr_image.save(image_buffer, format="PNG")
+    download_qr_codes.short_description = 'Download QR Codes for Selected Tables (ZIP)'
 
-            # Build the response to send the QR code image for download
-            response = HttpResponse(image_buffer.getvalue(), content_type='image/png')
-            response['Content-Disposition'] = f'attachment; filename=table_{table.table_number}_qrcode.png'
-            return response
+    def download_qr_codes_pdf(self, request, queryset):
+        response = HttpResponse(build_qrcode_pdf(queryset.select_related('restaurant')), content_type='application/pdf')
+        response['Content-Disposition'] = 'attachment; filename=table_qrcodes.pdf'
+        return response
 
-    download_qr_codes.short_description = 'Download QR Codes for Selected Tables'
+    download_qr_codes_pdf.short_description = 'Download printable QR sheet for Selected Tables (PDF)'
 
 admin.site.register(Table, TableAdmin)
\ No newline at end of file
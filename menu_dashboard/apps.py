@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MenuDashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'menu_dashboard'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (registers cache invalidation receivers)
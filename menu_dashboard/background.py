@@ -0,0 +1,57 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundPool:
+    """
+    Small in-process thread pool for work that should not hold up a request
+    (image rendering, QR codes). Jobs run with fresh database connections.
+    When the ``background_setting`` is False jobs run inline instead, which
+    is what tests and one-off scripts want.
+    """
+
+    def __init__(self, name, workers_setting, background_setting, default_workers=2):
+        self.name = name
+        self.workers_setting = workers_setting
+        self.background_setting = background_setting
+        self.default_workers = default_workers
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # (Re)create after a fork: the parent's threads did not come along.
+                self._executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, self.workers_setting, self.default_workers),
+                    thread_name_prefix=self.name,
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def submit(self, func, *args):
+        if not getattr(settings, self.background_setting, True):
+            return self.call(func, *args)
+        return self._get_executor().submit(self.call_in_thread, func, *args)
+
+    def call(self, func, *args):
+        try:
+            return func(*args)
+        except Exception as e:
+            logger.error(f"Background job {func.__name__}{args} failed: {e}")
+            return None
+
+    def call_in_thread(self, func, *args):
+        close_old_connections()
+        try:
+            return self.call(func, *args)
+        finally:
+            close_old_connections()
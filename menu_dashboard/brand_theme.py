@@ -0,0 +1,93 @@
+import hashlib
+import logging
+
+from django.core.cache import cache
+from django.urls import reverse
+
+from . import colors
+from .menu_snapshot import DEFAULT_BRAND_COLORS, brand_color_triplet
+from .restaurant_cache import ENTRY_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+THEME_VERSION = 1  # bump when the layout of the theme changes
+ROLES = ('primary', 'secondary', 'third')
+LIGHTEN_STEPS = (10, 20, 40)
+DARKEN_STEPS = (10, 20)
+DARK_TEXT = '#111827'  # text on light brand colours (checkout's --gray-900)
+LIGHT_TEXT = '#ffffff'
+
+
+def theme_cache_key(restaurant_id):
+    return f"brand_theme_v{THEME_VERSION}_{restaurant_id}"
+
+
+def _swatch(hex_color, fallback):
+    """One brand colour with everything the templates derive from it."""
+    rgb = colors.parse_hex(hex_color)
+    if rgb is None:
+        logger.warning(f"Invalid brand colour {hex_color!r}, using {fallback}")
+        rgb = colors.parse_hex(fallback)
+    hex_color = colors.to_hex(rgb)
+    light = colors.is_light(hex_color)
+    swatch = {
+        'hex': hex_color,
+        'rgb': colors.rgb_values(hex_color),
+        'light': light,
+        'on_color': DARK_TEXT if light else LIGHT_TEXT,
+    }
+    for percent in LIGHTEN_STEPS:
+        swatch[f'lighten_{percent}'] = colors.lighten(hex_color, percent)
+    for percent in DARKEN_STEPS:
+        swatch[f'darken_{percent}'] = colors.darken(hex_color, percent)
+    return swatch
+
+
+def _css(theme):
+    lines = []
+    for role in ROLES:
+        swatch = theme[role]
+        lines.append(f"  --brand-{role}: {swatch['hex']};")
+        lines.append(f"  --brand-{role}-rgb: {swatch['rgb']};")
+        lines.append(f"  --brand-on-{role}: {swatch['on_color']};")
+        for percent in LIGHTEN_STEPS:
+            lines.append(f"  --brand-{role}-lighten-{percent}: {swatch[f'lighten_{percent}']};")
+        for percent in DARKEN_STEPS:
+            lines.append(f"  --brand-{role}-darken-{percent}: {swatch[f'darken_{percent}']};")
+    return ":root {\n" + "\n".join(lines) + "\n}\n"
+
+
+def build_theme(restaurant_id, brand_colors):
+    """
+    The restaurant's palette: primary, secondary and third colour (padded
+    with the site defaults), each with its RGB triple, tints, shades and
+    whether it needs dark text, plus the same as a CSS stylesheet.
+    """
+    theme = {
+        role: _swatch(color, default)
+        for role, color, default in zip(ROLES, brand_color_triplet(brand_colors), DEFAULT_BRAND_COLORS)
+    }
+    theme['css'] = _css(theme)
+    theme['digest'] = hashlib.sha256(theme['css'].encode()).hexdigest()[:12]
+    theme['css_url'] = reverse('brand_theme_css', args=[restaurant_id, theme['digest']])
+    return theme
+
+
+def refresh_brand_theme(restaurant_id):
+    """Rebuild and cache a restaurant's theme; run after its brand colours change."""
+    from .models import BrandColor
+
+    brand_colors = list(
+        BrandColor.objects.filter(restaurant_id=restaurant_id).order_by('pk').values_list('color', flat=True)
+    )
+    theme = build_theme(restaurant_id, brand_colors)
+    cache.set(theme_cache_key(restaurant_id), theme, ENTRY_TIMEOUT)
+    return theme
+
+
+def get_brand_theme(restaurant_id):
+    """The cached theme, built on first use if it was evicted or never built."""
+    theme = cache.get(theme_cache_key(restaurant_id))
+    if theme is None:
+        theme = refresh_brand_theme(restaurant_id)
+    return theme
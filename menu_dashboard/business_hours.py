@@ -0,0 +1,162 @@
+import logging
+import re
+
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# Monday is 0, as in datetime.weekday().
+_DAY_NAMES = {
+    'mon': 0, 'monday': 0,
+    'tue': 1, 'tues': 1, 'tuesday': 1,
+    'wed': 2, 'wednesday': 2,
+    'thu': 3, 'thur': 3, 'thurs': 3, 'thursday': 3,
+    'fri': 4, 'friday': 4,
+    'sat': 5, 'saturday': 5,
+    'sun': 6, 'sunday': 6,
+}
+# Longest names first so "monday" is not read as "mon" + "day".
+_DAY = '|'.join(sorted(_DAY_NAMES, key=len, reverse=True))
+_DAY_RANGE_RE = re.compile(rf'({_DAY})(?:\s*(?:-|–|to)\s*({_DAY}))?')
+_EVERYDAY_RE = re.compile(r'every\s*day|daily|all\s*week')
+# "Sun: closed", "Closed on Sunday", "Sunday off": days with no hours.
+_CLOSED_RE = re.compile(r'\b(?:closed|off|shut)\b')
+_TIME = r'(\d{1,2})(?:[:.h]?(\d{2}))?\s*([ap])?\.?m?\.?'
+_TIME_RANGE_RE = re.compile(rf'{_TIME}\s*(?:-|–|to)\s*{_TIME}')
+
+
+def _minutes(hour, minute, meridiem):
+    hour, minute = int(hour), int(minute or 0)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            raise ValueError(f"invalid 12-hour time {hour}:{minute:02d}")
+        hour = hour % 12 + (12 if meridiem == 'p' else 0)
+    if hour > 24 or minute > 59 or (hour == 24 and minute):
+        raise ValueError(f"invalid time {hour}:{minute:02d}")
+    return hour * 60 + minute
+
+
+def _twelve_hour_pm_close(times, open_at, close_at):
+    # "9-5" means nine to five, not nine until five the next morning: with no
+    # am/pm and both hours on a 12-hour dial, a close at or before the opening
+    # time is in the pm, so "11-11" is 11am-11pm.
+    no_meridiem = not times.group(3) and not times.group(6)
+    twelve_hour = 1 <= int(times.group(1)) <= 12 and 1 <= int(times.group(4)) <= 12
+    return no_meridiem and twelve_hour and close_at <= open_at
+
+
+def _days(text):
+    if _EVERYDAY_RE.search(text):
+        return list(range(7))
+    days = []
+    for start, end in _DAY_RANGE_RE.findall(text):
+        first = _DAY_NAMES[start]
+        last = _DAY_NAMES[end] if end else first
+        # Ranges may wrap around the week, e.g. "Fri-Mon".
+        days.extend((first + offset) % 7 for offset in range((last - first) % 7 + 1))
+    return days
+
+
+def _merge(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def compile_business_hours(text):
+    """
+    Compile a free-text schedule into sorted, non-overlapping ``[start, end)``
+    intervals in minutes since Monday 00:00. Accepts what restaurants actually
+    type: "Everyday", "Monday-Friday", "MonTue:0800-1700,WedThu:0900-1800",
+    "Mon-Fri: 9:00-17:00, Sat: 10:00-15:00", "Everyday 8:00 AM - 10:00 pm".
+
+    Days without hours are open all day, unless marked closed ("Sun: closed",
+    "Closed on Sunday"). Hours without days apply to every day. Without
+    am/pm, "9-5" and "11-11" read as a 12-hour clock (09:00-17:00,
+    11:00-23:00); any other closing time at or before the opening time runs
+    past midnight.
+    Raises ValueError on anything it can't read.
+    """
+    text = (text or '').strip().rstrip('.').lower()
+    if not text:
+        return []
+
+    intervals = []
+    pending_days = []
+    for segment in re.split(r'[,;\n]', text):
+        segment = segment.strip()
+        if not segment:
+            continue
+        times = _TIME_RANGE_RE.search(segment)
+        days = _days(segment[:times.start()] if times else segment)
+        if times is None and _CLOSED_RE.search(segment):
+            # Closed days get no interval, nor do the days listed before them.
+            pending_days = []
+            continue
+        if times is None:
+            if not days:
+                raise ValueError(f"unreadable business hours segment {segment!r}")
+            # "Mon, Wed: 9-5" lists days before the hours they share.
+            pending_days.extend(days)
+            continue
+
+        days = pending_days + days or list(range(7))
+        pending_days = []
+        open_at = _minutes(*times.group(1, 2, 3))
+        close_at = _minutes(*times.group(4, 5, 6))
+        if _twelve_hour_pm_close(times, open_at, close_at):
+            close_at += 12 * 60
+        if close_at <= open_at:
+            close_at += MINUTES_PER_DAY
+        for day in days:
+            start, end = day * MINUTES_PER_DAY + open_at, day * MINUTES_PER_DAY + close_at
+            if end > MINUTES_PER_WEEK:
+                # Sunday night into Monday morning.
+                intervals.append((start, MINUTES_PER_WEEK))
+                intervals.append((0, end - MINUTES_PER_WEEK))
+            else:
+                intervals.append((start, end))
+
+    for day in pending_days:
+        intervals.append((day * MINUTES_PER_DAY, (day + 1) * MINUTES_PER_DAY))
+    return _merge(intervals)
+
+
+def compile_or_closed(text):
+    """``compile_business_hours``, treating unreadable hours as always closed."""
+    try:
+        return compile_business_hours(text)
+    except ValueError as e:
+        logger.warning(f"Could not parse business hours {text!r}: {e}")
+        return []
+
+
+def week_minute(moment=None):
+    """Minutes since Monday 00:00 in the site's time zone."""
+    local = timezone.localtime(moment)
+    return local.weekday() * MINUTES_PER_DAY + local.hour * 60 + local.minute
+
+
+def is_open_at(intervals, minute):
+    # At most a couple of intervals per day, so this is a constant-size scan.
+    return any(start <= minute < end for start, end in intervals)
+
+
+def open_restaurants(queryset, moment=None):
+    """Restrict a Restaurant queryset to those open at ``moment`` (default now), in SQL."""
+    from .models import OpeningInterval
+
+    minute = week_minute(moment)
+    return queryset.filter(Exists(
+        OpeningInterval.objects.filter(
+            restaurant=OuterRef('pk'), start_minute__lte=minute, end_minute__gt=minute,
+        )
+    ))
@@ -0,0 +1,88 @@
+from functools import lru_cache
+
+# A page only ever uses a handful of brand colours, so the parsed values and
+# tint tables stay cached for the life of the process.
+PARSE_CACHE_SIZE = 1024
+TINT_CACHE_SIZE = 256
+
+_HEX_PAIRS = tuple(f'{value:02x}' for value in range(256))
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse(hex_color):
+    hex_color = hex_color.lstrip('#')
+    if len(hex_color) == 3:
+        hex_color = ''.join(c * 2 for c in hex_color)
+    try:
+        return tuple(int(hex_color[i:i + 2], 16) for i in (0, 2, 4))
+    except ValueError:
+        return None
+
+
+def parse_hex(hex_color):
+    """
+    ``(r, g, b)`` of "#RRGGBB" or "RRGGBB" (or 3-digit shorthand), or None
+    if it isn't a hex colour.
+    """
+    if not isinstance(hex_color, str):
+        return None
+    return _parse(hex_color)
+
+
+def to_hex(rgb):
+    r, g, b = rgb
+    return '#' + _HEX_PAIRS[r] + _HEX_PAIRS[g] + _HEX_PAIRS[b]
+
+
+@lru_cache(maxsize=TINT_CACHE_SIZE)
+def lighten_table(percent):
+    """Channel value -> lightened channel as two hex digits, for all 256 values."""
+    return tuple('{:02x}'.format(int(c + (255 - c) * (percent / 100))) for c in range(256))
+
+
+@lru_cache(maxsize=TINT_CACHE_SIZE)
+def darken_table(percent):
+    """Channel value -> darkened channel as two hex digits, for all 256 values."""
+    return tuple('{:02x}'.format(int(c * (1 - percent / 100))) for c in range(256))
+
+
+def rgb_values(hex_color):
+    """Turns a hex colour into "R, G, B" for rgba(); '' if it isn't one."""
+    rgb = parse_hex(hex_color)
+    return "{}, {}, {}".format(*rgb) if rgb else ''
+
+
+def lighten(hex_color, percent):
+    """Lightens a hex colour by ``percent`` (0–100)."""
+    rgb = parse_hex(hex_color)
+    if rgb is None:
+        return ''
+    table = lighten_table(percent)
+    return '#' + table[rgb[0]] + table[rgb[1]] + table[rgb[2]]
+
+
+def darken(hex_color, percent):
+    """Darkens a hex colour by ``percent`` (0–100)."""
+    rgb = parse_hex(hex_color)
+    if rgb is None:
+        return ''
+    table = darken_table(percent)
+    return '#' + table[rgb[0]] + table[rgb[1]] + table[rgb[2]]
+
+
+def luminance(rgb):
+    # Perceived luminance
+    r, g, b = rgb
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+
+def is_light(hex_color):
+    """True if the colour's perceived brightness is above the midpoint."""
+    rgb = parse_hex(hex_color)
+    return rgb is not None and luminance(rgb) > 128
+
+
+def cache_clear():
+    """Drop every cached parse and tint table (for benchmarks and tests)."""
+    for cached in (_parse, lighten_table, darken_table):
+        cached.cache_clear()
@@ -0,0 +1,208 @@
+import logging
+
+from django.db import connection, transaction
+from django.db.models import Case, Q, When
+
+from .geo import geohash_neighbourhood, haversine_km
+from .models import DeliveryRequest, Rider
+
+logger = logging.getLogger(__name__)
+
+ASSIGNED = 'Assigned'
+NO_RIDERS_AVAILABLE = 'No Riders Available'
+UNASSIGNED_STATUSES = ('Pending', NO_RIDERS_AVAILABLE)
+
+# Geohash prefix lengths tried from the closest ring outwards:
+# roughly 150m, 1.2km, 5km and 40km cells.
+SEARCH_PRECISIONS = (7, 6, 5, 4)
+MAX_CANDIDATES = 200
+
+
+def _claim_sql(skip_locked):
+    table = connection.ops.quote_name(Rider._meta.db_table)
+    lock = ' FOR UPDATE SKIP LOCKED' if skip_locked else ''
+    return (
+        f"UPDATE {table} SET is_available = %s "
+        f"WHERE id IN (SELECT id FROM {table} WHERE is_available = %s ORDER BY id LIMIT %s{lock}) "
+        f"RETURNING id"
+    )
+
+
+def _claim_nearest_sql(skip_locked, candidates):
+    table = connection.ops.quote_name(Rider._meta.db_table)
+    lock = ' FOR UPDATE SKIP LOCKED' if skip_locked else ''
+    placeholders = ', '.join(['%s'] * candidates)
+    nearest_first = ' '.join(['WHEN %s THEN %s'] * candidates)
+    return (
+        f"UPDATE {table} SET is_available = %s "
+        f"WHERE id IN (SELECT id FROM {table} WHERE id IN ({placeholders}) AND is_available = %s "
+        f"ORDER BY CASE id {nearest_first} END LIMIT 1{lock}) "
+        f"RETURNING id"
+    )
+
+
+def claim_riders(count=1):
+    """
+    Atomically mark up to ``count`` available riders as busy and return their
+    ids. Concurrent callers never get the same rider and never wait on each
+    other: on PostgreSQL rows locked by another dispatch are skipped, and
+    SQLite serializes the single UPDATE statement anyway.
+    """
+    if count <= 0:
+        return []
+    if connection.vendor in ('postgresql', 'sqlite'):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                _claim_sql(skip_locked=connection.vendor == 'postgresql'),
+                [False, True, count],
+            )
+            return sorted(row[0] for row in cursor.fetchall())
+
+    # Backends without UPDATE ... RETURNING: lock-and-skip, then flip the flag.
+    with transaction.atomic():
+        rider_ids = list(
+            Rider.objects
+            .select_for_update(skip_locked=True)
+            .filter(is_available=True)
+            .order_by('id')
+            .values_list('id', flat=True)[:count]
+        )
+        Rider.objects.filter(id__in=rider_ids).update(is_available=False)
+    return rider_ids
+
+
+def release_riders(rider_ids):
+    """Put riders back in the available pool once their delivery is done."""
+    return Rider.objects.filter(id__in=rider_ids).update(is_available=True)
+
+
+def nearby_available_riders(latitude, longitude):
+    """
+    Free riders around a point, nearest first. Walks the geohash rings from
+    the smallest outwards and stops at the first one with any rider, so the
+    lookup is a handful of prefix scans on the geohash index, not a table scan.
+    Returns a list of ``(distance_km, rider_id)``.
+    """
+    for precision in SEARCH_PRECISIONS:
+        cells = Q()
+        for cell in geohash_neighbourhood(latitude, longitude, precision):
+            cells |= Q(geohash__startswith=cell)
+        candidates = list(
+            Rider.objects
+            .filter(cells, is_available=True)
+            .values_list('id', 'latitude', 'longitude')[:MAX_CANDIDATES]
+        )
+        if candidates:
+            return sorted(
+                (haversine_km(latitude, longitude, rider_lat, rider_lon), rider_id)
+                for rider_id, rider_lat, rider_lon in candidates
+            )
+    return []
+
+
+def _claim_nearest(candidates):
+    """Claim the first still-free rider of ``candidates`` (ids, nearest first)."""
+    if connection.vendor in ('postgresql', 'sqlite'):
+        ranks = [value for rank, candidate in enumerate(candidates) for value in (candidate, rank)]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                _claim_nearest_sql(connection.vendor == 'postgresql', len(candidates)),
+                [False, *candidates, True, *ranks],
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    with transaction.atomic():
+        rider_id = (
+            Rider.objects
+            .select_for_update(skip_locked=True)
+            .filter(id__in=candidates, is_available=True)
+            .order_by(Case(*(When(id=candidate, then=rank) for rank, candidate in enumerate(candidates))))
+            .values_list('id', flat=True)
+            .first()
+        )
+        if rider_id is not None:
+            Rider.objects.filter(id=rider_id).update(is_available=False)
+    return rider_id
+
+
+def claim_nearest_rider(latitude, longitude):
+    """
+    Claim the closest free rider to a point in one statement, like
+    claim_riders: on PostgreSQL candidates locked by a concurrent dispatch are
+    skipped rather than waited for. If none with a known position is nearby,
+    any free rider is claimed instead. Returns the rider id or None.
+    """
+    candidates = [rider_id for _, rider_id in nearby_available_riders(latitude, longitude)]
+    if candidates:
+        rider_id = _claim_nearest(candidates)
+        if rider_id is not None:
+            return rider_id
+    rider_ids = claim_riders(1)
+    return rider_ids[0] if rider_ids else None
+
+
+def _restaurant_position(order):
+    restaurant = order.restaurant
+    if restaurant is None or restaurant.latitude is None or restaurant.longitude is None:
+        return None
+    return restaurant.latitude, restaurant.longitude
+
+
+def submit_delivery_request(order):
+    """Create the order's DeliveryRequest and assign it the nearest free rider if there is one."""
+    with transaction.atomic():
+        position = _restaurant_position(order)
+        if position is not None:
+            rider_id = claim_nearest_rider(*position)
+        else:
+            rider_ids = claim_riders(1)
+            rider_id = rider_ids[0] if rider_ids else None
+        return DeliveryRequest.objects.create(
+            order=order,
+            rider_id=rider_id,
+            status=ASSIGNED if rider_id else NO_RIDERS_AVAILABLE,
+        )
+
+
+def assign_pending_requests(limit=100):
+    """
+    Assign riders to up to ``limit`` unassigned delivery requests, oldest
+    first. Requests from restaurants with a known position get the nearest
+    free rider; the rest share one claim statement. Requests locked by
+    another worker are skipped. Returns the number of requests assigned.
+    """
+    with transaction.atomic():
+        pending = list(
+            DeliveryRequest.objects
+            .select_for_update(skip_locked=True, of=('self',))
+            .select_related('order__restaurant')
+            .filter(rider__isnull=True, status__in=UNASSIGNED_STATUSES)
+            .order_by('request_time', 'id')[:limit]
+        )
+        if not pending:
+            return 0
+
+        assigned, unlocated = [], []
+        for delivery_request in pending:
+            position = _restaurant_position(delivery_request.order)
+            if position is None:
+                unlocated.append(delivery_request)
+                continue
+            rider_id = claim_nearest_rider(*position)
+            if rider_id is None:
+                break
+            delivery_request.rider_id = rider_id
+            assigned.append(delivery_request)
+
+        rider_ids = claim_riders(len(unlocated))
+        for delivery_request, rider_id in zip(unlocated, rider_ids):
+            delivery_request.rider_id = rider_id
+            assigned.append(delivery_request)
+
+        for delivery_request in assigned:
+            delivery_request.status = ASSIGNED
+        DeliveryRequest.objects.bulk_update(assigned, ['rider', 'status'])
+    if len(assigned) < len(pending):
+        logger.info(f"Dispatch ran out of riders: {len(pending) - len(assigned)} requests still waiting")
+    return len(assigned)
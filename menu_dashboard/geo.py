@@ -0,0 +1,88 @@
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometres between two points in degrees."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (float(lat1), float(lon1), float(lat2), float(lon2)))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Latitude range and longitude ranges of a box enclosing every point within
+    ``radius_km``. Returns ``((min_lat, max_lat), [(min_lon, max_lon), ...])``:
+    two longitude ranges when the box crosses the antimeridian, the whole
+    circle of longitudes when it reaches a pole.
+    """
+    latitude, longitude = float(latitude), float(longitude)
+    angle = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angle)
+    min_lat, max_lat = max(latitude - dlat, -90.0), min(latitude + dlat, 90.0)
+    ratio = math.sin(angle) / math.cos(math.radians(latitude)) if abs(latitude) < 90 else 2
+    if min_lat <= -90 or max_lat >= 90 or ratio >= 1:
+        return (min_lat, max_lat), [(-180.0, 180.0)]
+
+    dlon = math.degrees(math.asin(ratio))
+    min_lon, max_lon = longitude - dlon, longitude + dlon
+    if min_lon < -180:
+        return (min_lat, max_lat), [(min_lon + 360, 180.0), (-180.0, max_lon)]
+    if max_lon > 180:
+        return (min_lat, max_lat), [(min_lon, 180.0), (-180.0, max_lon - 360)]
+    return (min_lat, max_lat), [(min_lon, max_lon)]
+
+
+def geohash_encode(latitude, longitude, precision=9):
+    """Standard base32 geohash; nearby points share a prefix."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    latitude, longitude = float(latitude), float(longitude)
+    chars = []
+    bit = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        rng, coord = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coord >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(_BASE32[value])
+            bit = 0
+            value = 0
+    return ''.join(chars)
+
+
+def geohash_cell_size(precision):
+    """(lat_degrees, lon_degrees) covered by one cell at ``precision``."""
+    bits = precision * 5
+    lon_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def geohash_neighbourhood(latitude, longitude, precision):
+    """The cell containing the point plus its eight neighbours (deduplicated near the poles)."""
+    dlat, dlon = geohash_cell_size(precision)
+    latitude, longitude = float(latitude), float(longitude)
+    cells = []
+    for i in (0, -1, 1):
+        lat = min(max(latitude + i * dlat, -90.0), 90.0)
+        for j in (0, -1, 1):
+            lon = (longitude + j * dlon + 180.0) % 360.0 - 180.0
+            cell = geohash_encode(lat, lon, precision)
+            if cell not in cells:
+                cells.append(cell)
+    return cells
+
@@ -0,0 +1,51 @@
+import os
+from io import BytesIO
+
+from PIL import Image
+
+DEFAULT_MAX_SIZE = (800, 800)
+DEFAULT_QUALITY = 85
+
+
+def image_format(name):
+    """Pillow format name for a file name's extension ('JPG' -> 'JPEG')."""
+    extension = os.path.splitext(name)[1][1:].upper()
+    return 'JPEG' if extension in ('JPG', 'JPEG', 'JFIF') else extension
+
+
+def image_dimensions(image_file):
+    """Width and height from the file header alone; the pixel data is not decoded."""
+    with Image.open(image_file) as img:
+        return img.size
+
+
+def needs_resize(image_file, max_width=DEFAULT_MAX_SIZE[0], max_height=DEFAULT_MAX_SIZE[1]):
+    width, height = image_dimensions(image_file)
+    return width > max_width or height > max_height
+
+
+def fit_size(size, max_width, max_height):
+    width, height = size
+    ratio = min(max_width / width, max_height / height)
+    return int(width * ratio), int(height * ratio)
+
+
+def resize_to_fit(image_file, name, max_width=DEFAULT_MAX_SIZE[0], max_height=DEFAULT_MAX_SIZE[1],
+                  quality=DEFAULT_QUALITY):
+    """
+    Return the encoded bytes of the image scaled down to fit the bounds, or
+    None if it already fits. JPEGs are decoded at a reduced DCT scale via
+    ``draft()`` so a 4000px photo is never fully decoded just to become 800px.
+    """
+    with Image.open(image_file) as img:
+        if img.width <= max_width and img.height <= max_height:
+            return None
+        target = fit_size(img.size, max_width, max_height)
+        if img.format == 'JPEG':
+            # Decodes at 1/2, 1/4 or 1/8 scale, never below the target size.
+            img.draft('RGB', target)
+        resized = img.resize(target, Image.LANCZOS, reducing_gap=3.0)
+
+        output = BytesIO()
+        resized.save(output, format=image_format(name) or img.format, quality=quality)
+        return output.getvalue()
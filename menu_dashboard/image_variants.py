@@ -0,0 +1,124 @@
+import hashlib
+import logging
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from .background import BackgroundPool
+from .restaurant_cache import bump_restaurant_version
+
+logger = logging.getLogger(__name__)
+
+try:  # AVIF needs the optional pillow-avif-plugin on Pillow < 11.2
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
+
+# Square, center-cropped widths matching the sizes attribute in index.html.
+VARIANT_WIDTHS = (400, 800, 1200)
+VARIANT_ROOT = 'product_image/variants'
+
+_ENCODERS = (
+    # (key, Pillow format, extension, save options)
+    ('avif', 'AVIF', 'avif', {'quality': 60}),
+    ('webp', 'WEBP', 'webp', {'quality': 80, 'method': 4}),
+    ('jpeg', 'JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+
+def available_encoders():
+    Image.init()
+    return [encoder for encoder in _ENCODERS if encoder[1] in Image.SAVE]
+
+
+def _encode(image, pillow_format, options):
+    if pillow_format == 'JPEG' and image.mode != 'RGB':
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+        image = background
+    output = BytesIO()
+    image.save(output, format=pillow_format, **options)
+    return output.getvalue()
+
+
+def render_variants(data, source_name, widths=VARIANT_WIDTHS):
+    """
+    Write every width/format variant of one image and return the mapping
+    stored on ``Product.image_variants``. Variants live under the source's
+    content hash, so re-uploading the same picture reuses existing files.
+    Widths are never upscaled beyond the image's shorter side.
+    """
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(source_name))[0]
+
+    with Image.open(BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or 'A' in image.getbands() else 'RGB')
+        short_side = min(image.size)
+        widths = sorted({min(width, short_side) for width in widths})
+
+        formats = {}
+        for key, pillow_format, extension, options in available_encoders():
+            formats[key] = []
+        for width in widths:
+            square = ImageOps.fit(image, (width, width), method=Image.LANCZOS, centering=(0.5, 0.5))
+            for key, pillow_format, extension, options in available_encoders():
+                name = f"{VARIANT_ROOT}/{digest}/{stem}-{width}.{extension}"
+                if not default_storage.exists(name):
+                    name = default_storage.save(name, ContentFile(_encode(square, pillow_format, options)))
+                formats[key].append([width, default_storage.url(name)])
+
+    return {'source': source_name, 'digest': digest, 'widths': widths, 'formats': formats}
+
+
+def build_product_variants(product_id):
+    """Generate and record the variants for a product's current image."""
+    from .models import Product
+
+    product = Product.objects.filter(pk=product_id).only('id', 'restaurant_id', 'product_image').first()
+    if product is None or not product.product_image:
+        return None
+    source_name = product.product_image.name
+    with product.product_image.open('rb') as image_file:
+        data = image_file.read()
+    variants = render_variants(data, source_name)
+
+    # Only record them if the image was not replaced while we were rendering.
+    updated = Product.objects.filter(pk=product_id, product_image=source_name).update(image_variants=variants)
+    if updated and product.restaurant_id:
+        bump_restaurant_version(product.restaurant_id)
+    return variants if updated else None
+
+
+def needs_variants(product):
+    return bool(product.product_image) and (product.image_variants or {}).get('source') != product.product_image.name
+
+
+def srcset(entries):
+    return ', '.join(f"{url} {width}w" for width, url in entries)
+
+
+def image_sources(product):
+    """Precomputed <picture> data for the menu snapshot; falls back to the original upload."""
+    if not product.product_image:
+        return {'image_src': '', 'image_srcset': '', 'image_webp_srcset': '', 'image_avif_srcset': ''}
+    variants = product.image_variants or {}
+    if variants.get('source') != product.product_image.name:
+        url = product.product_image.url
+        return {'image_src': url, 'image_srcset': '', 'image_webp_srcset': '', 'image_avif_srcset': ''}
+    formats = variants['formats']
+    fallback = formats.get('jpeg') or formats.get('webp') or []
+    return {
+        'image_src': fallback[0][1] if fallback else product.product_image.url,
+        'image_srcset': srcset(fallback),
+        'image_webp_srcset': srcset(formats.get('webp', [])),
+        'image_avif_srcset': srcset(formats.get('avif', [])),
+    }
+
+
+# Pillow releases the GIL while resampling and encoding, so threads overlap well.
+variant_pool = BackgroundPool('image-variants', 'IMAGE_VARIANT_WORKERS', 'IMAGE_VARIANT_BACKGROUND')
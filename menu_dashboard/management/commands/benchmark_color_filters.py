@@ -0,0 +1,65 @@
+# management/commands/benchmark_color_filters.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.template import Context, Template
+
+from menu_dashboard import colors
+
+# One menu item's worth of the colour filters, as the menu templates use them.
+ITEM_TEMPLATE = (
+    '<div style="background: {{ item.color|lighten:40 }}; border-color: {{ item.color|darken:20 }};'
+    ' box-shadow: 0 1px 2px rgba({{ item.color|rgb_values }}, 0.2);'
+    ' color: {% if item.color|is_light %}#111827{% else %}#ffffff{% endif %}">'
+    '<span style="color: {{ item.accent|lighten:10 }}">{{ item.name }}</span></div>'
+)
+
+
+class Command(BaseCommand):
+    help = 'Measure the per-render cost of the colour template filters on a menu-sized page'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=200, help='Menu items per render')
+        parser.add_argument('--renders', type=int, default=200, help='Renders to time')
+        parser.add_argument('--brand-colors', type=int, default=3,
+                            help='Distinct colours on the page (a menu uses its few brand colours)')
+
+    def handle(self, *args, **options):
+        palette = [f'#{(0x13a658 + i * 0x2f1d3b) % 0xffffff:06x}' for i in range(options['brand_colors'])]
+        items = [
+            {'name': f'Dish {i}', 'color': palette[i % len(palette)], 'accent': palette[(i + 1) % len(palette)]}
+            for i in range(options['products'])
+        ]
+        template = Template(
+            '{% load color_filters %}{% for item in items %}' + ITEM_TEMPLATE + '{% endfor %}'
+        )
+        context = Context({'items': items})
+
+        def per_render(clear_caches):
+            start = time.perf_counter()
+            for _ in range(options['renders']):
+                if clear_caches:
+                    colors.cache_clear()
+                template.render(context)
+            return (time.perf_counter() - start) / options['renders'] * 1000
+
+        # The same loop without the filters, to isolate what they cost.
+        baseline_template = Template('{% for item in items %}' + ITEM_TEMPLATE
+                                     .replace('|lighten:40', '').replace('|lighten:10', '')
+                                     .replace('|darken:20', '').replace('|rgb_values', '')
+                                     .replace('item.color|is_light', 'item.color') + '{% endfor %}')
+        start = time.perf_counter()
+        for _ in range(options['renders']):
+            baseline_template.render(context)
+        baseline = (time.perf_counter() - start) / options['renders'] * 1000
+
+        cold = per_render(clear_caches=True)
+        warm = per_render(clear_caches=False)
+        calls = options['products'] * 5
+        self.stdout.write(f'{options["products"]} items, {calls} filter calls per render, '
+                          f'{options["brand_colors"]} distinct colours')
+        self.stdout.write(f'Template without filters: {baseline:.2f} ms/render')
+        self.stdout.write(f'Filters, caches cleared every render: {cold:.2f} ms/render '
+                          f'({(cold - baseline) * 1000 / calls:.2f} µs/filter call)')
+        self.stdout.write(f'Filters, warm caches: {warm:.2f} ms/render '
+                          f'({(warm - baseline) * 1000 / calls:.2f} µs/filter call)')
@@ -0,0 +1,99 @@
+# management/commands/benchmark_dispatch.py
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from menu_dashboard.dispatch import ASSIGNED, assign_pending_requests, submit_delivery_request
+from menu_dashboard.models import DeliveryRequest, Orders, Rider
+
+
+class Command(BaseCommand):
+    help = 'Measure rider dispatch throughput with many concurrent orders (use a scratch database)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--riders', type=int, default=200, help='Number of riders to create')
+        parser.add_argument('--orders', type=int, default=500, help='Number of orders to dispatch')
+        parser.add_argument('--workers', type=int, default=8, help='Number of concurrent dispatch threads')
+        parser.add_argument('--batch-size', type=int, default=0,
+                            help='Dispatch pending requests in batches of this size instead of one order at a time')
+
+    def handle(self, *args, **options):
+        if Rider.objects.filter(is_available=True).exists():
+            raise CommandError('Available riders already exist; run the benchmark against a scratch database')
+
+        tag = f'dispatch-bench-{uuid.uuid4().hex[:8]}'
+        get_user_model().objects.bulk_create([
+            get_user_model()(username=f'{tag}-{i}') for i in range(options['riders'])
+        ])
+        users = get_user_model().objects.filter(username__startswith=tag)
+        Rider.objects.bulk_create([Rider(user=user, mobile='0') for user in users])
+        Orders.objects.bulk_create([Orders(payment_method=tag) for _ in range(options['orders'])])
+        orders = list(Orders.objects.filter(payment_method=tag))
+
+        try:
+            if options['batch_size']:
+                elapsed, errors = self._run_batched(orders, options['workers'], options['batch_size'])
+            else:
+                elapsed, errors = self._run_single(orders, options['workers'])
+            self._report(orders, options, elapsed, errors)
+        finally:
+            Orders.objects.filter(payment_method=tag).delete()
+            get_user_model().objects.filter(username__startswith=tag).delete()
+
+    def _run_single(self, orders, workers):
+        def dispatch(order):
+            try:
+                submit_delivery_request(order)
+                return 0
+            except Exception as e:
+                self.stderr.write(f'Dispatch failed for order {order.id}: {e}')
+                return 1
+            finally:
+                close_old_connections()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            errors = sum(pool.map(dispatch, orders))
+        return time.perf_counter() - start, errors
+
+    def _run_batched(self, orders, workers, batch_size):
+        DeliveryRequest.objects.bulk_create([DeliveryRequest(order=order) for order in orders])
+
+        def drain(_):
+            errors = 0
+            try:
+                while True:
+                    try:
+                        if not assign_pending_requests(batch_size):
+                            return errors
+                    except Exception as e:
+                        errors += 1
+                        self.stderr.write(f'Batch dispatch failed: {e}')
+                        if errors > 10:
+                            return errors
+            finally:
+                close_old_connections()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            errors = sum(pool.map(drain, range(workers)))
+        return time.perf_counter() - start, errors
+
+    def _report(self, orders, options, elapsed, errors):
+        requests = DeliveryRequest.objects.filter(order__in=orders)
+        assigned = requests.filter(status=ASSIGNED)
+        assigned_count = assigned.count()
+        distinct_riders = assigned.values('rider').distinct().count()
+
+        mode = f'batches of {options["batch_size"]}' if options['batch_size'] else 'one order at a time'
+        self.stdout.write(f'Dispatched {len(orders)} orders {mode} with {options["workers"]} workers '
+                          f'in {elapsed:.3f}s ({len(orders) / elapsed:.0f} orders/s)')
+        self.stdout.write(f'Assigned: {assigned_count}, waiting for a rider: {requests.count() - assigned_count}, '
+                          f'errors: {errors}')
+        if distinct_riders != assigned_count:
+            raise CommandError(f'{assigned_count - distinct_riders} riders were assigned to more than one order')
+        self.stdout.write(self.style.SUCCESS('No rider was assigned twice'))
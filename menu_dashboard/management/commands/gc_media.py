@@ -0,0 +1,84 @@
+# management/commands/gc_media.py
+from collections import Counter
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from menu_dashboard.image_variants import VARIANT_ROOT
+from menu_dashboard.models import Product, Restaurant, Table
+
+
+def walk(storage, directory):
+    """Yield every file name below ``directory`` in ``storage``."""
+    if not storage.exists(directory):
+        return
+    subdirectories, files = storage.listdir(directory)
+    for filename in files:
+        yield f'{directory}/{filename}'
+    for subdirectory in subdirectories:
+        yield from walk(storage, f'{directory}/{subdirectory}')
+
+
+class Command(BaseCommand):
+    help = 'Delete product images, logos, table QR codes and image variants that no row references any more'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only list what would be deleted')
+        parser.add_argument('--grace-minutes', type=int, default=60,
+                            help='Keep files newer than this; their rows may not be committed yet')
+
+    def handle(self, *args, **options):
+        product_refs = Counter(
+            Product.objects.exclude(product_image='').exclude(product_image__isnull=True)
+            .values_list('product_image', flat=True)
+        )
+        logo_refs = Counter(
+            Restaurant.objects.exclude(logo_pic='').exclude(logo_pic__isnull=True)
+            .values_list('logo_pic', flat=True)
+        )
+        qrcode_refs = Counter(
+            Table.objects.exclude(qrcode_image='').values_list('qrcode_image', flat=True)
+        )
+        variant_digests = {
+            variants.get('digest')
+            for variants in Product.objects.exclude(image_variants={}).values_list('image_variants', flat=True)
+            if variants
+        }
+        # Store-list cards keep a logo thumbnail among the variants.
+        variant_digests.update(
+            card.get('logo_digest')
+            for card in Restaurant.objects.exclude(card_data={}).values_list('card_data', flat=True)
+            if card
+        )
+
+        shared = sum(1 for refs in (product_refs + logo_refs).values() if refs > 1)
+        saved = sum(refs - 1 for refs in (product_refs + logo_refs).values())
+        self.stdout.write(f'{len(product_refs)} product images and {len(logo_refs)} logos referenced; '
+                          f'{shared} shared, saving {saved} duplicate files')
+
+        cutoff = timezone.now() - timedelta(minutes=options['grace_minutes'])
+        deleted = 0
+        roots = (
+            (Product._meta.get_field('product_image'), product_refs),
+            (Restaurant._meta.get_field('logo_pic'), logo_refs),
+            (Table._meta.get_field('qrcode_image'), qrcode_refs),
+        )
+        for field, refs in roots:
+            storage = field.storage
+            root = field.upload_to.rstrip('/')
+            for name in walk(storage, root):
+                if name.startswith(f'{VARIANT_ROOT}/'):
+                    referenced = name.split('/')[2] in variant_digests
+                else:
+                    referenced = refs[name] > 0
+                if referenced or storage.get_modified_time(name) > cutoff:
+                    continue
+                deleted += 1
+                if options['dry_run']:
+                    self.stdout.write(f'Would delete {name}')
+                else:
+                    storage.delete(name)
+
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {deleted} unreferenced media files'))
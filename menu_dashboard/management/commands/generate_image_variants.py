@@ -0,0 +1,37 @@
+# management/commands/generate_image_variants.py
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.core.management.base import BaseCommand
+
+from menu_dashboard.image_variants import build_product_variants, needs_variants, variant_pool
+from menu_dashboard.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Render responsive image variants for products that do not have them yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Number of rendering threads')
+        parser.add_argument('--force', action='store_true', help='Re-render variants even if they are up to date')
+
+    def handle(self, *args, **options):
+        products = (
+            Product.objects
+            .exclude(product_image='')
+            .exclude(product_image__isnull=True)
+            .only('id', 'product_image', 'image_variants')
+        )
+        product_ids = [
+            product.id for product in products.iterator()
+            if options['force'] or needs_variants(product)
+        ]
+        self.stdout.write(f'Rendering variants for {len(product_ids)} products')
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            results = list(pool.map(partial(variant_pool.call_in_thread, build_product_variants), product_ids))
+
+        failed = sum(1 for result in results if result is None)
+        if failed:
+            self.stdout.write(self.style.WARNING(f'{failed} products could not be processed (see log)'))
+        self.stdout.write(self.style.SUCCESS(f'Rendered variants for {len(product_ids) - failed} products'))
@@ -0,0 +1,32 @@
+# management/commands/rebuild_restaurant_cards.py
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.core.management.base import BaseCommand
+
+from menu_dashboard.models import Restaurant
+from menu_dashboard.restaurant_cards import CARD_FIELDS, card_pool, needs_card, refresh_restaurant_card
+
+
+class Command(BaseCommand):
+    help = 'Build store-list cards for restaurants that do not have an up-to-date one'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Number of rendering threads')
+        parser.add_argument('--force', action='store_true', help='Rebuild cards even if they are up to date')
+
+    def handle(self, *args, **options):
+        restaurant_ids = [
+            restaurant.id for restaurant in Restaurant.objects.only(*CARD_FIELDS).iterator()
+            if options['force'] or needs_card(restaurant)
+        ]
+        self.stdout.write(f'Building cards for {len(restaurant_ids)} restaurants')
+
+        if options['workers'] <= 1:
+            cards = [refresh_restaurant_card(restaurant_id) for restaurant_id in restaurant_ids]
+        else:
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                cards = list(pool.map(partial(card_pool.call_in_thread, refresh_restaurant_card), restaurant_ids))
+
+        built = sum(1 for card in cards if card is not None)
+        self.stdout.write(self.style.SUCCESS(f'Built store-list cards for {built} restaurants'))
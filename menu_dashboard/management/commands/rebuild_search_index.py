@@ -0,0 +1,12 @@
+# management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+
+from menu_dashboard.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the restaurant and dish search index from scratch'
+
+    def handle(self, *args, **options):
+        entries = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {entries} restaurants and dishes'))
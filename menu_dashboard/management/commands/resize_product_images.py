@@ -1,19 +1,141 @@
 # management/commands/resize_product_images.py
+import os
+from contextlib import nullcontext
+from multiprocessing import Pool
+
+import django
+from django.core.files.base import ContentFile
 from django.core.management.base import BaseCommand
+from django.db import connections
+
+from menu_dashboard.image_resize import DEFAULT_MAX_SIZE, DEFAULT_QUALITY, needs_resize, resize_to_fit
 from menu_dashboard.models import Product
+from menu_dashboard.restaurant_cache import bump_restaurant_version
+
+DEFAULT_CHECKPOINT = 'resize_product_images.checkpoint'
+
+
+def _storage():
+    return Product._meta.get_field('product_image').storage
+
+
+def _init_worker():
+    # Needed under the "spawn" start method; a no-op for forked workers.
+    django.setup()
+
+
+def _process(job):
+    """Runs in a worker: check one image's header and rewrite it if it is too large."""
+    product_id, name, max_width, max_height, quality, dry_run = job
+    try:
+        with _storage().open(name, 'rb') as image_file:
+            if not needs_resize(image_file, max_width, max_height):
+                return product_id, name, 'skipped', None
+            if dry_run:
+                return product_id, name, 'would resize', None
+            image_file.seek(0)
+            data = resize_to_fit(image_file, name, max_width, max_height, quality)
+        return product_id, name, 'resized', _storage().save(name, ContentFile(data))
+    except Exception as e:
+        return product_id, name, 'failed', str(e)
+
 
 class Command(BaseCommand):
-    help = 'Resize all existing product images'
+    help = 'Resize existing product images in parallel, resuming from a checkpoint file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Number of worker processes (1 runs inline)')
+        parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT,
+                            help='File recording finished images so an interrupted run can resume')
+        parser.add_argument('--restart', action='store_true',
+                            help='Ignore an existing checkpoint file and start from scratch')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report which images would be resized')
+        parser.add_argument('--max-width', type=int, default=DEFAULT_MAX_SIZE[0])
+        parser.add_argument('--max-height', type=int, default=DEFAULT_MAX_SIZE[1])
+        parser.add_argument('--quality', type=int, default=DEFAULT_QUALITY)
 
     def handle(self, *args, **options):
-        products = Product.objects.filter(product_image__isnull=False)
-        total = products.count()
-        self.stdout.write(f'Resizing {total} product images...')
-        
-        for i, product in enumerate(products):
-            if product.product_image:
-                product.resize_image()
-                product.save(update_fields=['product_image'])
-                self.stdout.write(f'Processed {i+1}/{total}: {product.name}')
-        
-        self.stdout.write(self.style.SUCCESS('Successfully resized all product images'))
\ No newline at end of file
+        checkpoint = options['checkpoint']
+        if options['restart'] and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        done = self._load_checkpoint(checkpoint)
+
+        products = (
+            Product.objects
+            .exclude(product_image='')
+            .exclude(product_image__isnull=True)
+            .order_by('id')
+            .values_list('id', 'product_image')
+        )
+        jobs = [
+            (product_id, name, options['max_width'], options['max_height'], options['quality'], options['dry_run'])
+            for product_id, name in products
+            if (product_id, name) not in done
+        ]
+        self.stdout.write(f'Checking {len(jobs)} product images ({len(done)} already done)...')
+
+        counts = {'skipped': 0, 'resized': 0, 'would resize': 0, 'failed': 0}
+        touched_restaurants = set()
+        with nullcontext() if options['dry_run'] else open(checkpoint, 'a') as checkpoint_file:
+            for product_id, name, outcome, detail in self._run(jobs, options['workers']):
+                counts[outcome] += 1
+                if outcome == 'failed':
+                    self.stderr.write(f'Failed {name} (product {product_id}): {detail}')
+                    continue
+                if outcome == 'would resize':
+                    self.stdout.write(f'Would resize {name} (product {product_id})')
+                    continue
+                if outcome == 'resized':
+                    restaurant_id = self._swap_image(product_id, name, detail)
+                    touched_restaurants.add(restaurant_id)
+                    name = detail
+                if checkpoint_file is not None:
+                    checkpoint_file.write(f'{product_id}\t{name}\n')
+                    checkpoint_file.flush()
+
+        for restaurant_id in touched_restaurants - {None}:
+            bump_restaurant_version(restaurant_id)
+
+        self.stdout.write(', '.join(f'{outcome}: {count}' for outcome, count in counts.items()))
+        if counts['resized']:
+            self.stdout.write('Run generate_image_variants to refresh the resized products\' variants.')
+        self.stdout.write(self.style.SUCCESS('Finished resizing product images'))
+
+    def _run(self, jobs, workers):
+        if workers <= 1:
+            yield from map(_process, jobs)
+            return
+        # Don't let forked workers inherit open database connections.
+        connections.close_all()
+        with Pool(processes=workers, initializer=_init_worker) as pool:
+            yield from pool.imap_unordered(_process, jobs, chunksize=8)
+
+    @staticmethod
+    def _load_checkpoint(path):
+        if not os.path.exists(path):
+            return set()
+        done = set()
+        with open(path) as checkpoint_file:
+            for line in checkpoint_file:
+                product_id, _, name = line.rstrip('\n').partition('\t')
+                if product_id.isdigit() and name:
+                    done.add((int(product_id), name))
+        return done
+
+    @classmethod
+    def _swap_image(cls, product_id, old_name, new_name):
+        """Point the product at the resized file without going through Product.save()."""
+        updated = Product.objects.filter(pk=product_id, product_image=old_name).update(product_image=new_name)
+        # Stored files can be shared between products, so only drop unreferenced ones.
+        cls._delete_if_unreferenced(old_name if updated else new_name)
+        if not updated:
+            # Image replaced while we worked; keep the user's new upload.
+            return None
+        return Product.objects.filter(pk=product_id).values_list('restaurant_id', flat=True).first()
+
+    @staticmethod
+    def _delete_if_unreferenced(name):
+        if not Product.objects.filter(product_image=name).exists():
+            _storage().delete(name)
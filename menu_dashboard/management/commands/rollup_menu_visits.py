@@ -0,0 +1,24 @@
+# management/commands/rollup_menu_visits.py
+from django.core.management.base import BaseCommand
+
+from menu_dashboard.visit_rollups import fold_new_visits, prune_rolled_up_visits
+
+
+class Command(BaseCommand):
+    help = 'Fold new menu visits into the hourly/daily rollups and optionally prune old raw visits'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=50000,
+                            help='Number of visit ids folded per transaction')
+        parser.add_argument('--prune-days', type=int, default=None,
+                            help='Delete raw visits older than this many days once rolled up')
+
+    def handle(self, *args, **options):
+        folded = fold_new_visits(chunk_size=options['chunk_size'])
+        self.stdout.write(f'Folded {folded} menu visits into rollups')
+
+        if options['prune_days'] is not None:
+            deleted = prune_rolled_up_visits(options['prune_days'])
+            self.stdout.write(f'Pruned {deleted} raw menu visits older than {options["prune_days"]} days')
+
+        self.stdout.write(self.style.SUCCESS('Menu visit rollup complete'))
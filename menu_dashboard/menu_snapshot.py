@@ -0,0 +1,165 @@
+import logging
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.utils import timezone
+
+from .image_variants import image_sources
+from .restaurant_cache import get_or_build
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the layout of the snapshot changes so old payloads are ignored.
+SNAPSHOT_VERSION = 2
+
+DEFAULT_VARIATION_NAME = 'S'
+WINGS_DISCOUNT_WEEKDAY = 2  # 0 = Monday, …, 6 = Sunday
+GST_NOTE = "12% GST will be added"
+
+DEFAULT_BRAND_COLORS = ("#f7c028", "#000000", "#ffffff")
+
+
+def snapshot_cache_key(restaurant_id, discount_day=False):
+    suffix = 'wings' if discount_day else 'regular'
+    return f"menu_snapshot_v{SNAPSHOT_VERSION}_{restaurant_id}_{suffix}"
+
+
+def is_discount_day(weekday):
+    return weekday == WINGS_DISCOUNT_WEEKDAY
+
+
+def _money(value):
+    return str(Decimal(value).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+
+
+def _base_price(product, default_variation):
+    """
+    Numeric price the menu is based on: the default variation's price, or the
+    product price with its discount applied.
+    """
+    if default_variation is not None:
+        return default_variation.price
+    if product.price is None:
+        return None
+    price = product.price
+    if product.discount_percentage:
+        price = price * (Decimal('1') - product.discount_percentage / Decimal('100'))
+    return price
+
+
+def _serialize_product(product, discount_day):
+    """Flatten a product (with prefetched variations) into plain data."""
+    variations = list(product.variations.all())
+    size_variation = next((v for v in variations if v.name == DEFAULT_VARIATION_NAME), None)
+    default_variation = size_variation or (variations[0] if variations else None)
+
+    list_price = product.get_display_price()
+    if size_variation is not None and size_variation.price:
+        price_label = str(size_variation.price)
+    else:
+        price_label = list_price
+
+    display_price = str(default_variation.price) if default_variation else list_price
+    is_discounted = discount_day and 'wings' in product.name.lower()
+    if is_discounted and not product.price_by_percentage:
+        base_price = _base_price(product, default_variation)
+        if base_price:
+            display_price = _money(base_price / 2)
+
+    image_name = product.product_image.name if product.product_image else ''
+    category = product.category
+
+    return {
+        'id': product.id,
+        'name': product.name,
+        'description': product.description,
+        'has_description': bool(product.description and product.description.strip()),
+        'status': product.status,
+        'special_offer': product.special_offer,
+        'price_by_percentage': product.price_by_percentage,
+        'gst_note': GST_NOTE if product.charge_gst else "",
+        'category_id': category.id if category else None,
+        'category_name': category.name if category else '',
+        'image': image_name,
+        'image_url': product.product_image.url if image_name else '',
+        **image_sources(product),
+        'price_label': price_label,
+        'display_price': display_price,
+        'is_discounted': is_discounted,
+        'variations_list': [
+            {
+                'id': variation.id,
+                'name': variation.name,
+                'price': str(variation.price),
+                'is_default': variation.is_default,
+            }
+            for variation in variations
+        ] or None,
+    }
+
+
+def build_menu_snapshot(restaurant, discount_day=False):
+    """
+    Build the plain-data menu for a restaurant in a fixed number of queries:
+    one for products (with their categories), one for variations and one for
+    brand colors.
+    """
+    from .models import Product
+
+    products = (
+        Product.objects
+        .filter(restaurant=restaurant)
+        .select_related('category')
+        .prefetch_related('variations')
+        .order_by('category__order', 'category_id', 'id')
+    )
+
+    categories = []
+    sections = {}
+    uncategorized = []
+    for product in products:
+        data = _serialize_product(product, discount_day)
+        if product.category is None:
+            uncategorized.append(data)
+            continue
+        if product.category_id not in sections:
+            sections[product.category_id] = []
+            categories.append({
+                'id': product.category.id,
+                'name': product.category.name,
+                'emoji': product.category.emoji,
+                'order': product.category.order,
+            })
+        sections[product.category_id].append(data)
+
+    all_sections = [sections[category['id']] for category in categories]
+    if uncategorized:
+        all_sections.append(uncategorized)
+
+    return {
+        'version': SNAPSHOT_VERSION,
+        'restaurant_id': restaurant.id,
+        'built_at': timezone.now().isoformat(),
+        'discount_day': discount_day,
+        'categories': categories,
+        'sections': all_sections,
+        'brand_colors': list(restaurant.brand_colors.values_list('color', flat=True)),
+    }
+
+
+def get_menu_snapshot(restaurant, weekday):
+    """
+    Return the snapshot for ``restaurant``, rebuilding it only when the
+    restaurant's content version has moved on since it was cached.
+    """
+    discount_day = is_discount_day(weekday)
+    return get_or_build(
+        restaurant.id,
+        snapshot_cache_key(restaurant.id, discount_day),
+        lambda: build_menu_snapshot(restaurant, discount_day),
+    )
+
+
+def brand_color_triplet(colors):
+    """Pad a list of hex colors out to (primary, secondary, third)."""
+    padded = list(colors[:3]) + list(DEFAULT_BRAND_COLORS[len(colors[:3]):])
+    return tuple(padded)
@@ -0,0 +1,71 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu_dashboard', '0003_alter_restaurant_latitude_alter_restaurant_longitude'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MenuVisitDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateTimeField()),
+                ('device', models.CharField(blank=True, default='', max_length=100)),
+                ('visits', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MenuVisitHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateTimeField()),
+                ('device', models.CharField(blank=True, default='', max_length=100)),
+                ('visits', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MenuVisitRollupState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_visit_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='menuvisit',
+            index=models.Index(fields=['restaurant', 'timestamp'], name='menu_dashbo_restaur_0b410b_idx'),
+        ),
+        migrations.AddField(
+            model_name='menuvisitdaily',
+            name='restaurant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='menu_dashboard.restaurant'),
+        ),
+        migrations.AddField(
+            model_name='menuvisithourly',
+            name='restaurant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='menu_dashboard.restaurant'),
+        ),
+        migrations.AddIndex(
+            model_name='menuvisitdaily',
+            index=models.Index(fields=['restaurant', 'period_start'], name='menu_dashbo_restaur_e24952_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='menuvisitdaily',
+            constraint=models.UniqueConstraint(fields=('restaurant', 'period_start', 'device'), name='unique_menu_visit_daily'),
+        ),
+        migrations.AddIndex(
+            model_name='menuvisithourly',
+            index=models.Index(fields=['restaurant', 'period_start'], name='menu_dashbo_restaur_9b6cb6_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='menuvisithourly',
+            constraint=models.UniqueConstraint(fields=('restaurant', 'period_start', 'device'), name='unique_menu_visit_hourly'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu_dashboard', '0004_menu_visit_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orders',
+            name='idempotency_key',
+            field=models.CharField(blank=True, help_text='Client-supplied key that makes checkout retries return the original order.', max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='orders',
+            constraint=models.UniqueConstraint(fields=('customer', 'idempotency_key'), name='unique_order_idempotency_key'),
+        ),
+    ]
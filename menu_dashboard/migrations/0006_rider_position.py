@@ -0,0 +1,33 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu_dashboard', '0005_orders_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rider',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='rider',
+            name='latitude',
+            field=models.DecimalField(blank=True, decimal_places=5, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='rider',
+            name='longitude',
+            field=models.DecimalField(blank=True, decimal_places=5, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='rider',
+            name='position_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu_dashboard', '0006_rider_position'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Pre-rendered responsive sizes of product_image (see image_variants.py).'),
+        ),
+    ]
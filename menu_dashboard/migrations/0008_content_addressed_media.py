@@ -0,0 +1,24 @@
+# Generated by Django 5.1.3 on 2026-10-18 11:05
+
+import menu_dashboard.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu_dashboard', '0007_product_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='product_image',
+            field=models.ImageField(blank=True, null=True, storage=menu_dashboard.storage.content_storage, upload_to='product_image/'),
+        ),
+        migrations.AlterField(
+            model_name='restaurant',
+            name='logo_pic',
+            field=models.ImageField(blank=True, null=True, storage=menu_dashboard.storage.content_storage, upload_to='logo_pic/RestaurantLogo/'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-18 11:12
+
+import menu_dashboard.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu_dashboard', '0008_content_addressed_media'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='table',
+            name='qrcode_image',
+            field=models.ImageField(blank=True, storage=menu_dashboard.storage.content_storage, upload_to='core/table_qrcodes'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 11:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu_dashboard', '0009_table_qrcode_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='qr_format',
+            field=models.CharField(choices=[('png', 'PNG'), ('svg', 'SVG (vector)')], default='png', max_length=3),
+        ),
+    ]
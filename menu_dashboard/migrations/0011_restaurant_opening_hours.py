@@ -0,0 +1,153 @@
+# Generated by Django 5.1.3 on 2026-10-18 11:22
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# A frozen copy of menu_dashboard.business_hours as of this migration, so later
+# changes to the live parser can't change what this backfill produces.
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+_DAY_NAMES = {
+    'mon': 0, 'monday': 0,
+    'tue': 1, 'tues': 1, 'tuesday': 1,
+    'wed': 2, 'wednesday': 2,
+    'thu': 3, 'thur': 3, 'thurs': 3, 'thursday': 3,
+    'fri': 4, 'friday': 4,
+    'sat': 5, 'saturday': 5,
+    'sun': 6, 'sunday': 6,
+}
+_DAY = '|'.join(sorted(_DAY_NAMES, key=len, reverse=True))
+_DAY_RANGE_RE = re.compile(rf'({_DAY})(?:\s*(?:-|–|to)\s*({_DAY}))?')
+_EVERYDAY_RE = re.compile(r'every\s*day|daily|all\s*week')
+_CLOSED_RE = re.compile(r'\b(?:closed|off|shut)\b')
+_TIME = r'(\d{1,2})(?:[:.h]?(\d{2}))?\s*([ap])?\.?m?\.?'
+_TIME_RANGE_RE = re.compile(rf'{_TIME}\s*(?:-|–|to)\s*{_TIME}')
+
+
+def _minutes(hour, minute, meridiem):
+    hour, minute = int(hour), int(minute or 0)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            raise ValueError
+        hour = hour % 12 + (12 if meridiem == 'p' else 0)
+    if hour > 24 or minute > 59 or (hour == 24 and minute):
+        raise ValueError
+    return hour * 60 + minute
+
+
+def _days(text):
+    if _EVERYDAY_RE.search(text):
+        return list(range(7))
+    days = []
+    for start, end in _DAY_RANGE_RE.findall(text):
+        first = _DAY_NAMES[start]
+        last = _DAY_NAMES[end] if end else first
+        days.extend((first + offset) % 7 for offset in range((last - first) % 7 + 1))
+    return days
+
+
+def _merge(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def compile_business_hours(text):
+    text = (text or '').strip().rstrip('.').lower()
+    if not text:
+        return []
+
+    intervals = []
+    pending_days = []
+    for segment in re.split(r'[,;\n]', text):
+        segment = segment.strip()
+        if not segment:
+            continue
+        times = _TIME_RANGE_RE.search(segment)
+        days = _days(segment[:times.start()] if times else segment)
+        if times is None and _CLOSED_RE.search(segment):
+            pending_days = []
+            continue
+        if times is None:
+            if not days:
+                raise ValueError
+            pending_days.extend(days)
+            continue
+
+        days = pending_days + days or list(range(7))
+        pending_days = []
+        open_at = _minutes(*times.group(1, 2, 3))
+        close_at = _minutes(*times.group(4, 5, 6))
+        no_meridiem = not times.group(3) and not times.group(6)
+        twelve_hour = 1 <= int(times.group(1)) <= 12 and 1 <= int(times.group(4)) <= 12
+        if no_meridiem and twelve_hour and close_at <= open_at:
+            close_at += 12 * 60
+        if close_at <= open_at:
+            close_at += MINUTES_PER_DAY
+        for day in days:
+            start, end = day * MINUTES_PER_DAY + open_at, day * MINUTES_PER_DAY + close_at
+            if end > MINUTES_PER_WEEK:
+                intervals.append((start, MINUTES_PER_WEEK))
+                intervals.append((0, end - MINUTES_PER_WEEK))
+            else:
+                intervals.append((start, end))
+
+    for day in pending_days:
+        intervals.append((day * MINUTES_PER_DAY, (day + 1) * MINUTES_PER_DAY))
+    return _merge(intervals)
+
+
+def compile_or_closed(text):
+    try:
+        return compile_business_hours(text)
+    except ValueError:
+        return []
+
+
+def compile_existing_hours(apps, schema_editor):
+    Restaurant = apps.get_model('menu_dashboard', 'Restaurant')
+    OpeningInterval = apps.get_model('menu_dashboard', 'OpeningInterval')
+    intervals = []
+    for restaurant in Restaurant.objects.only('id', 'business_hours'):
+        restaurant.opening_hours = compile_or_closed(restaurant.business_hours)
+        restaurant.save(update_fields=['opening_hours'])
+        intervals.extend(
+            OpeningInterval(restaurant_id=restaurant.id, start_minute=start, end_minute=end)
+            for start, end in restaurant.opening_hours
+        )
+    OpeningInterval.objects.bulk_create(intervals, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu_dashboard', '0010_restaurant_qr_format'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='opening_hours',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.CreateModel(
+            name='OpeningInterval',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_minute', models.PositiveSmallIntegerField()),
+                ('end_minute', models.PositiveSmallIntegerField()),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='opening_intervals', to='menu_dashboard.restaurant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['start_minute', 'end_minute'], name='menu_dashbo_start_m_2ef091_idx')],
+            },
+        ),
+        migrations.RunPython(compile_existing_hours, migrations.RunPython.noop),
+    ]
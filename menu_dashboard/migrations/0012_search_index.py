@@ -0,0 +1,102 @@
+# Generated by Django 5.1.3 on 2026-10-18 11:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SQLITE_INDEX = [
+    # External-content FTS5 table: the text lives once, in searchentry. kind
+    # and restaurant_id ride along unindexed so ranking needs no join.
+    """CREATE VIRTUAL TABLE menu_dashboard_searchentry_fts USING fts5(
+        title, body, kind UNINDEXED, restaurant_id UNINDEXED,
+        content='menu_dashboard_searchentry', content_rowid='id', tokenize='trigram'
+    )""",
+    # Title matches weigh ten times body matches.
+    "INSERT INTO menu_dashboard_searchentry_fts(menu_dashboard_searchentry_fts, rank) VALUES('rank', 'bm25(10.0, 1.0)')",
+    """CREATE TRIGGER menu_dashboard_searchentry_ai AFTER INSERT ON menu_dashboard_searchentry BEGIN
+        INSERT INTO menu_dashboard_searchentry_fts(rowid, title, body, kind, restaurant_id)
+        VALUES (new.id, new.title, new.body, new.kind, new.restaurant_id);
+    END""",
+    """CREATE TRIGGER menu_dashboard_searchentry_ad AFTER DELETE ON menu_dashboard_searchentry BEGIN
+        INSERT INTO menu_dashboard_searchentry_fts(menu_dashboard_searchentry_fts, rowid, title, body, kind, restaurant_id)
+        VALUES ('delete', old.id, old.title, old.body, old.kind, old.restaurant_id);
+    END""",
+    """CREATE TRIGGER menu_dashboard_searchentry_au AFTER UPDATE ON menu_dashboard_searchentry BEGIN
+        INSERT INTO menu_dashboard_searchentry_fts(menu_dashboard_searchentry_fts, rowid, title, body, kind, restaurant_id)
+        VALUES ('delete', old.id, old.title, old.body, old.kind, old.restaurant_id);
+        INSERT INTO menu_dashboard_searchentry_fts(rowid, title, body, kind, restaurant_id)
+        VALUES (new.id, new.title, new.body, new.kind, new.restaurant_id);
+    END""",
+]
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS menu_dashboard_searchentry_au",
+    "DROP TRIGGER IF EXISTS menu_dashboard_searchentry_ad",
+    "DROP TRIGGER IF EXISTS menu_dashboard_searchentry_ai",
+    "DROP TABLE IF EXISTS menu_dashboard_searchentry_fts",
+]
+POSTGRES_INDEX = [
+    """ALTER TABLE menu_dashboard_searchentry ADD COLUMN document tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(body, '')), 'B')
+    ) STORED""",
+    "CREATE INDEX menu_dashboard_searchentry_document ON menu_dashboard_searchentry USING gin (document)",
+]
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS menu_dashboard_searchentry_document",
+    "ALTER TABLE menu_dashboard_searchentry DROP COLUMN IF EXISTS document",
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def create_text_index(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_INDEX, 'postgresql': POSTGRES_INDEX})
+
+
+def drop_text_index(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_DROP, 'postgresql': POSTGRES_DROP})
+
+
+def index_existing(apps, schema_editor):
+    Restaurant = apps.get_model('menu_dashboard', 'Restaurant')
+    Product = apps.get_model('menu_dashboard', 'Product')
+    SearchEntry = apps.get_model('menu_dashboard', 'SearchEntry')
+    entries = [
+        SearchEntry(kind='restaurant', object_id=restaurant.id, restaurant_id=restaurant.id,
+                    title=restaurant.restaurant_name or '', body=restaurant.address or '')
+        for restaurant in Restaurant.objects.only('id', 'restaurant_name', 'address')
+    ]
+    entries.extend(
+        SearchEntry(kind='product', object_id=product.id, restaurant_id=product.restaurant_id,
+                    title=product.name or '', body=product.description or '')
+        for product in Product.objects.exclude(restaurant=None).only('id', 'restaurant_id', 'name', 'description')
+    )
+    SearchEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu_dashboard', '0011_restaurant_opening_hours'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('restaurant', 'Restaurant'), ('product', 'Product')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='menu_dashboard.restaurant')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_search_entry')],
+            },
+        ),
+        migrations.RunPython(create_text_index, drop_text_index),
+        migrations.RunPython(index_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu_dashboard', '0012_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='card_data',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-18 11:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu_dashboard', '0013_restaurant_card_data'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=models.Index(fields=['latitude', 'longitude'], name='menu_dashbo_latitud_67f8cc_idx'),
+        ),
+    ]
@@ -5,8 +5,10 @@ from django.utils import timezone
 from accounts.models import User  # Ensure this is the correct User model being imported
 from django.conf import settings
 from decimal import Decimal
-from .qrcode_generator import generate_qrcode
-from django.core.files import File
+from .business_hours import compile_or_closed, is_open_at, week_minute
+from .geo import geohash_encode
+from .image_resize import resize_to_fit
+from .storage import content_storage
 from django.db.models import Index
 from django.core.cache import cache
 from django.utils.text import slugify
@@ -19,8 +21,6 @@ import sys
 from django.core.files.base import ContentFile
 
 
-from datetime import datetime
-import datetime
 import hashlib
 from decimal import Decimal, ROUND_HALF_UP
 
@@ -29,16 +29,24 @@ class Restaurant(models.Model):
     restaurant_name  = models.CharField(max_length=40, null=True, blank=True, db_index=True)
     slug             = models.SlugField(max_length=255, null=True, blank=True)
     hashed_slug      = models.CharField(max_length=64, unique=True, blank=True)  
-    logo_pic         = models.ImageField(upload_to='logo_pic/RestaurantLogo/', null=True, blank=True)
+    logo_pic         = models.ImageField(upload_to='logo_pic/RestaurantLogo/', storage=content_storage, null=True, blank=True)
     address          = models.CharField(max_length=255, blank=True, null=True)
     mobile           = models.CharField(max_length=20)
     latitude         = models.DecimalField(max_digits=10, decimal_places=5, null=True, blank=True)
     longitude        = models.DecimalField(max_digits=10, decimal_places=5, null=True, blank=True)
     business_hours   = models.CharField(max_length=255, null=True, blank=True)
+    # business_hours compiled on save: [start, end) minutes since Monday 00:00.
+    opening_hours    = models.JSONField(default=list, blank=True, editable=False)
+    # SVG table codes are vector: a few KB and sharp at any print size.
+    qr_format        = models.CharField(max_length=3, choices=[('png', 'PNG'), ('svg', 'SVG (vector)')], default='png')
+    # Precomputed store-list card (see restaurant_cards.py), refreshed after commit.
+    card_data        = models.JSONField(default=dict, blank=True, editable=False)
 
     class Meta:
         indexes = [
             models.Index(fields=['restaurant_name']),
+            # Bounding-box prefilter of the nearby-restaurants lookup.
+            models.Index(fields=['latitude', 'longitude']),
         ]
 
     def save(self, *args, **kwargs):
@@ -46,6 +54,16 @@ class Restaurant(models.Model):
         if not self.slug and self.restaurant_name:
             self.slug = slugify(self.restaurant_name)
 
+        update_fields = kwargs.get('update_fields')
+        hours_changed = False
+        if update_fields is None or 'business_hours' in update_fields:
+            opening_hours = compile_or_closed(self.business_hours)
+            # Most saves leave the hours alone; only then rewrite the intervals.
+            hours_changed = opening_hours != self.opening_hours
+            self.opening_hours = opening_hours
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'opening_hours'}
+
         # 2) Generate hashed_slug if missing (after first save to get self.id)
         if not self.hashed_slug:
             # Temporarily save to get an ID if this is a new object
@@ -62,6 +80,17 @@ class Restaurant(models.Model):
         # 4) Save the final model
         super().save(*args, **kwargs)
 
+        if hours_changed:
+            self.sync_opening_intervals()
+
+    def sync_opening_intervals(self):
+        """Mirror ``opening_hours`` into OpeningInterval rows for SQL "open now" filters."""
+        self.opening_intervals.all().delete()
+        OpeningInterval.objects.bulk_create([
+            OpeningInterval(restaurant=self, start_minute=start, end_minute=end)
+            for start, end in self.opening_hours
+        ])
+
     def __str__(self):
         return self.restaurant_name or "Unnamed Restaurant"
 
@@ -77,40 +106,48 @@ class Restaurant(models.Model):
             cache.set(key, total, 3600)
         return total
 
-    def is_open(self):
+    def is_open(self, moment=None):
         """
-        Returns True if the restaurant is open right now.
-        Supports:
-          - "Everyday" or "Everyday." → always open
-          - Comma-separated schedules like "MonTue:0800-1700,WedThu:0900-1800"
+        Returns True if the restaurant is open at ``moment`` (default now),
+        from the schedule compiled on save; see business_hours for the
+        formats understood. Unreadable hours count as closed.
         """
-        now = datetime.datetime.now()
-        dow = now.strftime('%a')               # 'Mon', 'Tue', ...
-        current = int(now.strftime('%H%M'))    # e.g. 1330
-
-        if not self.business_hours:
-            return False
-
-        bh = self.business_hours.strip().rstrip('.').lower()
-        if bh == 'everyday':
-            return True
-
-        try:
-            for part in self.business_hours.split(','):
-                days, hours = part.split(':')
-                open_time, close_time = map(int, hours.split('-'))
-                days = days.strip()
-                # treat 'Everyday' here also
-                if 'Everyday'.lower() in days.lower():
-                    return open_time <= current <= close_time
-                # check if today is in the 'days' substring
-                if dow.lower()[:3] in days.lower():
-                    return open_time <= current <= close_time
-        except ValueError:
-            # malformed entry → treat as closed
-            return False
-
-        return False
+        return is_open_at(self.opening_hours, week_minute(moment))
+
+
+class OpeningInterval(models.Model):
+    """One open interval of a restaurant's week, for filtering "open now" in SQL."""
+    restaurant   = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='opening_intervals')
+    start_minute = models.PositiveSmallIntegerField()  # minutes since Monday 00:00
+    end_minute   = models.PositiveSmallIntegerField()  # exclusive
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['start_minute', 'end_minute']),
+        ]
+
+
+class SearchEntry(models.Model):
+    """
+    Searchable text of a restaurant or one of its dishes. The database's
+    full-text index over title/body (FTS5 on SQLite, tsvector on Postgres)
+    is created in the migration and queried by search.py.
+    """
+    RESTAURANT = 'restaurant'
+    PRODUCT = 'product'
+    KIND_CHOICES = [(RESTAURANT, 'Restaurant'), (PRODUCT, 'Product')]
+
+    kind       = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id  = models.BigIntegerField()
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='+')
+    title      = models.CharField(max_length=255)
+    body       = models.TextField(blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_search_entry'),
+        ]
+
 
 class BrandColor(models.Model):
     restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='brand_colors')
@@ -157,19 +194,14 @@ class Customer(models.Model):
 class Table(models.Model):
     table_number = models.IntegerField(null=True, blank=True, db_index=True)
     restaurant = models.ForeignKey('Restaurant', on_delete=models.CASCADE, related_name='table', null=True, blank=True)
-    qrcode_image = models.ImageField(upload_to='core/table_qrcodes', blank=True)
+    # Generated after commit by signals.table_saved; all tables of a restaurant share one file.
+    qrcode_image = models.ImageField(upload_to='core/table_qrcodes', storage=content_storage, blank=True)
 
     class Meta:
         indexes = [
             models.Index(fields=['restaurant', 'table_number']),
         ]
 
-    def save(self, *args, **kwargs):
-        if not self.qrcode_image:
-            image_filename, image_buffer = generate_qrcode(self)
-            self.qrcode_image.save(image_filename, File(image_buffer), save=False)
-        super().save(*args, **kwargs)
-
     def __str__(self):
         return f"Table {self.table_number}" if self.table_number is not None else "No Table Number"
 
@@ -193,7 +225,7 @@ class Product(models.Model):
         ('Unavailable', 'Unavailable'),
     )
     name = models.CharField(max_length=40, db_index=True)
-    product_image = models.ImageField(upload_to='product_image/', null=True, blank=True)
+    product_image = models.ImageField(upload_to='product_image/', storage=content_storage, null=True, blank=True)
     price = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
     description = models.CharField(max_length=200, null=True, blank=True)
     restaurant = models.ForeignKey('Restaurant', on_delete=models.CASCADE,
@@ -227,6 +259,10 @@ class Product(models.Model):
         default=False,
         help_text="If enabled, the product will display its price as a percentage (e.g., '50%')."
     )
+    image_variants = models.JSONField(
+        default=dict, blank=True, editable=False,
+        help_text="Pre-rendered responsive sizes of product_image (see image_variants.py)."
+    )
     
     class Meta:
         indexes = [
@@ -237,42 +273,19 @@ class Product(models.Model):
         return self.name or "No Name"
     
     def save(self, *args, **kwargs):
-        if self.product_image:
+        # Only a freshly assigned upload is uncommitted; re-saving a product
+        # whose image did not change must not touch the file at all.
+        if self.product_image and not self.product_image._committed:
             self.resize_image()
         super().save(*args, **kwargs)
     
     def resize_image(self, max_width=800, max_height=800, quality=85):
-        from PIL import Image
-        from io import BytesIO
-        from django.core.files.base import ContentFile
-        import os
-    
-        # Open the image
-        img = Image.open(self.product_image)
-    
-        # Check if resizing is needed
-        if img.width > max_width or img.height > max_height:
-        # Calculate the resize ratio to maintain aspect ratio
-            ratio = min(max_width/img.width, max_height/img.height)
-            new_width = int(img.width * ratio)
-            new_height = int(img.height * ratio)
-        
-            # Resize the image
-            img = img.resize((new_width, new_height), Image.LANCZOS)
-        
-            # Save the resized image
-            output = BytesIO()
-            # Preserve format
-            format = os.path.splitext(self.product_image.name)[1][1:].upper()
-            if format == 'JPG':
-                
-                format = 'JPEG'
-        
-            img.save(output, format=format, quality=quality)
-            output.seek(0)
-        
-            # Replace the image with resized version
-            self.product_image = ContentFile(output.read(), name=self.product_image.name)
+        # Header-only check first; large JPEGs are decoded at reduced scale.
+        self.product_image.seek(0)
+        data = resize_to_fit(self.product_image, self.product_image.name, max_width, max_height, quality)
+        self.product_image.seek(0)
+        if data is not None:
+            self.product_image = ContentFile(data, name=self.product_image.name)
     
     def get_display_price(self) -> str:
         """
@@ -391,11 +404,19 @@ class Orders(models.Model):
     payment_method = models.CharField(max_length=50, null=True, choices=PAYMENT_METHOD)
     table_number = models.IntegerField(null=True)
     amount = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    idempotency_key = models.CharField(
+        max_length=64, null=True, blank=True,
+        help_text="Client-supplied key that makes checkout retries return the original order."
+    )
 
     class Meta:
         indexes = [
             models.Index(fields=['customer', 'restaurant', 'status', 'order_date']),
         ]
+        constraints = [
+            models.UniqueConstraint(fields=['customer', 'idempotency_key'],
+                                    name='unique_order_idempotency_key'),
+        ]
 
     def __str__(self):
         customer_name = f"{self.customer.user.first_name} {self.customer.user.last_name}" if self.customer else "No Customer"
@@ -403,30 +424,41 @@ class Orders(models.Model):
         return f'Order {self.id} - Customer: {customer_name}, Restaurant: {restaurant_name}'
 
     def submit_delivery_request(self):
-        from django.db import transaction
-        with transaction.atomic():
-            delivery_request = DeliveryRequest.objects.create(order=self)
-            available_riders = Rider.objects.filter(is_available=True).select_for_update()
-            if available_riders.exists():
-                rider = available_riders.first()
-                delivery_request.rider = rider
-                delivery_request.status = 'Assigned'
-                delivery_request.save()
-                rider.is_available = False
-                rider.save()
-            else:
-                delivery_request.status = 'No Riders Available'
-                delivery_request.save()
-        return delivery_request
+        from .dispatch import submit_delivery_request
+        return submit_delivery_request(self)
 
 class Rider(models.Model):
+    GEOHASH_PRECISION = 9  # ~5m cells; dispatch searches shorter prefixes of this
+
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     mobile = models.CharField(max_length=20, null=False)
     is_available = models.BooleanField(default=True, db_index=True)
+    latitude = models.DecimalField(max_digits=10, decimal_places=5, null=True, blank=True)
+    longitude = models.DecimalField(max_digits=10, decimal_places=5, null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, default='', db_index=True, editable=False)
+    position_updated_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return self.user.username or "No Name"
 
+    def save(self, *args, **kwargs):
+        self.geohash = self.compute_geohash()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geohash'}
+        super().save(*args, **kwargs)
+
+    def compute_geohash(self):
+        if self.latitude is None or self.longitude is None:
+            return ''
+        return geohash_encode(self.latitude, self.longitude, self.GEOHASH_PRECISION)
+
+    def update_position(self, latitude, longitude):
+        self.latitude = Decimal(str(latitude))
+        self.longitude = Decimal(str(longitude))
+        self.position_updated_at = timezone.now()
+        self.save(update_fields=['latitude', 'longitude', 'position_updated_at'])
+
 class DeliveryRequest(models.Model):
     order = models.OneToOneField('Orders', on_delete=models.CASCADE)
     rider = models.ForeignKey('Rider', on_delete=models.SET_NULL, null=True, blank=True)
@@ -537,12 +569,63 @@ class MenuVisit(models.Model):
     user_agent = models.TextField()
     device = models.CharField(max_length=100, blank=True, null=True)  # New field
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['restaurant', 'timestamp']),
+        ]
+
     def __str__(self):
         if self.restaurant and hasattr(self.restaurant, 'name'):
             return f"{self.restaurant.name} - {self.timestamp}"
         return f"Unknown Restaurant - {self.timestamp}"
 
 
+class MenuVisitRollup(models.Model):
+    """Visit counts per restaurant, device family and period bucket."""
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE)
+    period_start = models.DateTimeField()
+    device = models.CharField(max_length=100, blank=True, default='')
+    visits = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self.restaurant_id} - {self.period_start} - {self.device or 'Unknown'}: {self.visits}"
+
+
+class MenuVisitHourly(MenuVisitRollup):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['restaurant', 'period_start', 'device'],
+                                    name='unique_menu_visit_hourly'),
+        ]
+        indexes = [
+            models.Index(fields=['restaurant', 'period_start']),
+        ]
+
+
+class MenuVisitDaily(MenuVisitRollup):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['restaurant', 'period_start', 'device'],
+                                    name='unique_menu_visit_daily'),
+        ]
+        indexes = [
+            models.Index(fields=['restaurant', 'period_start']),
+        ]
+
+
+class MenuVisitRollupState(models.Model):
+    """High-water mark: the last MenuVisit id folded into the rollup tables."""
+    name = models.CharField(max_length=50, unique=True)
+    last_visit_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.last_visit_id}"
+
+
 class Notification(models.Model):
     title = models.CharField(max_length=100)
     message = models.CharField(max_length=255)
@@ -0,0 +1,61 @@
+import heapq
+import logging
+
+from django.db.models import Q
+
+from .business_hours import open_restaurants, week_minute
+from .geo import bounding_box, haversine_km
+from .restaurant_cards import CARD_FIELDS, card_payload
+
+logger = logging.getLogger(__name__)
+
+NEARBY_LIMIT = 10
+MAX_NEARBY_LIMIT = 50
+# Search radii tried from the closest outwards, like dispatch's geohash rings.
+NEARBY_RADII_KM = (2, 10, 50, 250)
+
+
+def _within(latitude, longitude, radius_km, open_now, moment):
+    """``(distance_km, restaurant)`` for every restaurant within ``radius_km``."""
+    from .models import Restaurant
+
+    (min_lat, max_lat), lon_ranges = bounding_box(latitude, longitude, radius_km)
+    in_box = Q()
+    for min_lon, max_lon in lon_ranges:
+        in_box |= Q(longitude__range=(min_lon, max_lon))
+    # Range scan on the (latitude, longitude) index; the box's corners are
+    # dropped below by the exact distance.
+    candidates = Restaurant.objects.filter(in_box, latitude__range=(min_lat, max_lat)).only(
+        *CARD_FIELDS, 'latitude', 'longitude',
+    )
+    if open_now:
+        candidates = open_restaurants(candidates, moment)
+
+    found = []
+    for restaurant in candidates:
+        distance = haversine_km(latitude, longitude, restaurant.latitude, restaurant.longitude)
+        if distance <= radius_km:
+            found.append((distance, restaurant))
+    return found
+
+
+def nearby_restaurants(latitude, longitude, limit=NEARBY_LIMIT, open_now=True, moment=None):
+    """
+    Store-list cards of the ``limit`` restaurants closest to a point, nearest
+    first, each with its ``distance_km``. Widens the search radius until
+    enough are found, so a dense city costs one small bounding-box query and
+    an empty region a few.
+    """
+    limit = max(1, min(int(limit), MAX_NEARBY_LIMIT))
+    for radius_km in NEARBY_RADII_KM:
+        found = _within(latitude, longitude, radius_km, open_now, moment)
+        if len(found) >= limit:
+            break
+
+    minute = week_minute(moment)
+    cards = []
+    for distance, restaurant in heapq.nsmallest(limit, found, key=lambda hit: (hit[0], hit[1].id)):
+        card = card_payload(restaurant, minute)
+        card['distance_km'] = round(distance, 2)
+        cards.append(card)
+    return cards
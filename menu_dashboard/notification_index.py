@@ -0,0 +1,125 @@
+import heapq
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION_KEY = "notification_index_version"
+# The version lives in the shared cache, i.e. a Redis or disk read: check it
+# at most this often. Changes made in this process invalidate immediately.
+VERSION_CHECK_INTERVAL = 1.0  # seconds
+
+
+def get_notification_version():
+    version = cache.get(INDEX_VERSION_KEY)
+    if version is None:
+        # Wall-clock based, like the restaurant versions, so an evicted key
+        # never comes back with a number a process already indexed.
+        cache.add(INDEX_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(INDEX_VERSION_KEY)
+    return version
+
+
+def bump_notification_version():
+    """Tell every process to reload its notification index on the next render."""
+    try:
+        cache.incr(INDEX_VERSION_KEY)
+    except ValueError:
+        cache.add(INDEX_VERSION_KEY, time.time_ns(), None)
+    notification_index.invalidate()
+
+
+class _CompiledIndex:
+    def __init__(self, version, notifications, now):
+        self.version = version
+        # Loaded newest first; drop what has ended since.
+        self.notifications = [n for n in notifications if n.end_date >= now]
+        self.global_entries = tuple(n for n in self.notifications if n.send_to_all)
+        by_owner = {}
+        for notification in self.notifications:
+            if notification.send_to_all:
+                continue
+            for restaurant in notification.restaurants.all():
+                by_owner.setdefault(restaurant.user_id, []).append(notification)
+        self.by_owner = {owner_id: tuple(entries) for owner_id, entries in by_owner.items()}
+        # Next window boundary at which an entry stops being live.
+        self.expires_at = min((n.end_date for n in self.notifications), default=None)
+
+
+class NotificationIndex:
+    """
+    Process-local index of active and upcoming notifications: the global ones
+    plus, per restaurant owner (user id), the ones targeted at their
+    restaurant. It reloads from the database only when the shared version key
+    changes (a notification was saved or deleted), and reads that key at most
+    once per VERSION_CHECK_INTERVAL; windows are checked in memory, and ended
+    notifications are pruned at their end date without a query. Most lookups
+    therefore cost no cache read and no database queries.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = None
+        self._checked_at = 0.0
+
+    def invalidate(self):
+        self._index = None
+
+    def _version(self, index):
+        checked_at = time.monotonic()
+        if index is not None and checked_at - self._checked_at < VERSION_CHECK_INTERVAL:
+            return index.version
+        version = get_notification_version()
+        self._checked_at = checked_at
+        return version
+
+    def _load(self, now):
+        from .models import Notification
+
+        return list(
+            Notification.objects
+            .filter(is_active=True, end_date__gte=now)
+            .prefetch_related('restaurants')
+            .order_by('-start_date')
+        )
+
+    def _current(self, now):
+        index = self._index
+        version = self._version(index)
+        if index is not None and index.version == version:
+            if index.expires_at is None or now <= index.expires_at:
+                return index
+            # A window ended: recompile from what is already in memory.
+            index = _CompiledIndex(version, index.notifications, now)
+            self._index = index
+            return index
+
+        with self._lock:
+            index = self._index
+            if index is None or index.version != version:
+                index = _CompiledIndex(version, self._load(now), now)
+                self._index = index
+                logger.debug(f"Notification index reloaded: {len(index.notifications)} notifications")
+        return index
+
+    def active_for(self, owner_id=None):
+        """The newest notification live right now for a restaurant owner (or for everyone)."""
+        now = timezone.now()
+        index = self._current(now)
+        candidates = index.global_entries
+        if owner_id is not None and owner_id in index.by_owner:
+            candidates = heapq.merge(
+                index.global_entries, index.by_owner[owner_id],
+                key=lambda n: n.start_date, reverse=True,
+            )
+        for notification in candidates:
+            if notification.start_date <= now <= notification.end_date:
+                return notification
+        return None
+
+
+notification_index = NotificationIndex()
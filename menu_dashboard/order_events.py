@@ -0,0 +1,102 @@
+import asyncio
+import itertools
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = 100
+KEEPALIVE_INTERVAL = 15  # seconds between SSE comment pings on an idle stream
+
+
+class OrderEventBroker:
+    """
+    In-process pub/sub for order events, keyed by restaurant.
+
+    Subscribers are asyncio queues owned by the SSE streams running on the
+    ASGI event loop; ``publish()`` may be called from any thread (checkout
+    runs in a sync thread) and hands events over with
+    ``call_soon_threadsafe``. Events only reach streams served by the same
+    process, so run the kitchen feed on a single ASGI worker.
+    """
+
+    def __init__(self, queue_size=SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self, restaurant_id):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        subscriber = (queue, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(restaurant_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, restaurant_id, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(restaurant_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[restaurant_id]
+
+    def subscriber_count(self, restaurant_id):
+        with self._lock:
+            return len(self._subscribers.get(restaurant_id, ()))
+
+    def publish(self, restaurant_id, event_type, data):
+        event = {'id': next(self._ids), 'event': event_type, 'data': data}
+        with self._lock:
+            subscribers = list(self._subscribers.get(restaurant_id, ()))
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, event)
+            except RuntimeError:
+                # Loop already closed; the stream's finally block will unsubscribe.
+                pass
+        return len(subscribers)
+
+    @staticmethod
+    def _deliver(queue, event):
+        if queue.full():
+            # A stalled client should not hold events forever: drop its oldest.
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+
+order_broker = OrderEventBroker()
+
+
+def order_event_data(order):
+    return {
+        'order_id': order.id,
+        'status': order.status,
+        'table_number': order.table_number,
+        'payment_method': order.payment_method,
+        'amount': str(order.amount) if order.amount is not None else None,
+        'order_date': order.order_date.isoformat() if order.order_date else None,
+    }
+
+
+def format_sse(event):
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+async def order_event_stream(restaurant_id, keepalive=KEEPALIVE_INTERVAL):
+    """Async generator of SSE frames for one kitchen connection."""
+    subscriber = order_broker.subscribe(restaurant_id)
+    queue = subscriber[0]
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(event)
+    finally:
+        order_broker.unsubscribe(restaurant_id, subscriber)
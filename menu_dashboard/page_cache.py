@@ -0,0 +1,63 @@
+import hashlib
+
+from django.core.cache import cache
+from django.utils.http import parse_etags, quote_etag
+
+from .restaurant_cache import get_or_build
+
+PAGE_CACHE_TIMEOUT = 60 * 60 * 24  # 24 hours; entries are also versioned
+ROUTE_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+
+def menu_route_key(hashed_slug):
+    return f"menu_route_{hashed_slug}"
+
+
+def _notification_tag(notification):
+    # The page shows the notification's text, and editing it bumps only the
+    # notification version, so key on what is displayed, not just the id.
+    if notification is None:
+        return '0'
+    shown = (notification.title, notification.message, notification.button_text,
+             notification.button_url, notification.notification_type)
+    return f"{notification.id}-{hashlib.md5(repr(shown).encode()).hexdigest()[:8]}"
+
+
+def menu_page_key(hashed_slug, weekday, notification, url):
+    # ``url`` must not carry the query string: utm_*, fbclid or made-up
+    # parameters would each cost a render and a cache entry.
+    url_hash = hashlib.md5(url.encode()).hexdigest()[:12]
+    return f"menu_page_{hashed_slug}_{weekday}_{_notification_tag(notification)}_{url_hash}"
+
+
+def get_restaurant_id_for_slug(hashed_slug):
+    return cache.get(menu_route_key(hashed_slug))
+
+
+def remember_restaurant_id_for_slug(hashed_slug, restaurant_id):
+    # hashed_slug is derived from the primary key, so the mapping never changes.
+    cache.set(menu_route_key(hashed_slug), restaurant_id, ROUTE_CACHE_TIMEOUT)
+
+
+def build_page_entry(response, slug):
+    """Freeze a rendered TemplateResponse into a cacheable dict with a strong ETag."""
+    response.render()
+    content = response.content
+    return {
+        'slug': slug,
+        'content': content,
+        'content_type': response['Content-Type'],
+        'etag': quote_etag(hashlib.sha256(content).hexdigest()[:32]),
+    }
+
+
+def get_or_render_page(restaurant_id, key, render):
+    return get_or_build(restaurant_id, key, render, timeout=PAGE_CACHE_TIMEOUT)
+
+
+def etag_matches(request, etag):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return etag in etags or '*' in etags
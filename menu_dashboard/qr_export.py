@@ -0,0 +1,165 @@
+import io
+import logging
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.utils.text import slugify
+from PIL import Image, ImageDraw, ImageFont
+
+from .qrcode_generator import render_qrcode_file, render_qrcode_png
+
+logger = logging.getLogger(__name__)
+
+LABEL_HEIGHT = 120
+SVG_LABEL_MODULES = 6  # caption band under an SVG code, in QR modules
+
+
+def restaurant_qrcodes(restaurants):
+    """
+    Render each restaurant's QR once, as PNG bytes keyed by restaurant id.
+    Every table of a restaurant encodes the same menu URL, so the logo is
+    decoded, scaled and overlaid once per restaurant rather than per table.
+    """
+    return {restaurant.id: render_qrcode_png(restaurant) for restaurant in restaurants}
+
+
+def label_qrcode(qr_image, caption, font):
+    """Add a printed caption under a decoded QR image; returns PNG bytes."""
+    sheet = Image.new('RGB', (qr_image.width, qr_image.height + LABEL_HEIGHT), 'white')
+    sheet.paste(qr_image, (0, 0))
+    draw = ImageDraw.Draw(sheet)
+    draw.text((sheet.width // 2, qr_image.height + LABEL_HEIGHT // 3), caption,
+              fill='black', font=font, anchor='mt')
+    output = io.BytesIO()
+    sheet.save(output, format='PNG', optimize=False)
+    return output.getvalue()
+
+
+def label_qrcode_svg(svg, caption):
+    """Add a caption under an SVG QR by nesting it in a taller canvas; stays vector."""
+    svg = svg.decode('utf-8')
+    size = int(re.search(r'viewBox="0 0 (\d+) \d+"', svg).group(1))
+    inner = svg.replace('<svg ', f'<svg width="{size}" height="{size}" ', 1)
+    height = size + SVG_LABEL_MODULES
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {height}">'
+        f'<rect width="{size}" height="{height}" fill="white"/>{inner}'
+        f'<text x="{size / 2:g}" y="{size + SVG_LABEL_MODULES / 2:g}" font-family="sans-serif" '
+        f'font-size="{SVG_LABEL_MODULES / 2:g}" text-anchor="middle" dominant-baseline="middle">'
+        f'{escape(caption)}</text></svg>'
+    ).encode('utf-8')
+
+
+def _tables_with_qrcodes(tables):
+    tables = sorted(
+        (table for table in tables if table.restaurant_id),
+        key=lambda table: (table.restaurant_id, table.table_number or 0),
+    )
+    restaurants = {table.restaurant_id: table.restaurant for table in tables}
+    return tables, restaurant_qrcodes(restaurants.values())
+
+
+def _caption(table):
+    return f"Table {table.table_number}" if table.table_number is not None else table.restaurant.restaurant_name
+
+
+class _ZipStream(io.RawIOBase):
+    """Write-only sink that lets zipfile produce an archive chunk by chunk."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _labelled_pngs(tables, qrcodes):
+    # Only the caption differs per table: decode each restaurant's QR and
+    # load the font once, then draw in-process. A process pool costs more in
+    # start-up and pickling than the drawing it would spread out.
+    font = ImageFont.load_default(size=LABEL_HEIGHT // 2)
+    images = {}
+    for table in tables:
+        if table.restaurant_id not in images:
+            with Image.open(io.BytesIO(qrcodes[table.restaurant_id])) as qr_image:
+                images[table.restaurant_id] = qr_image.convert('RGB')
+        yield label_qrcode(images[table.restaurant_id], _caption(table), font)
+
+
+def _labelled_svgs(tables):
+    svgs = {}
+    for table in tables:
+        restaurant = table.restaurant
+        if restaurant.id not in svgs:
+            svgs[restaurant.id] = render_qrcode_file(restaurant)[1]
+        yield label_qrcode_svg(svgs[restaurant.id], _caption(table))
+
+
+def stream_qrcode_zip(tables):
+    """
+    Yield a ZIP of labelled table QRs, one file per table, as it is built.
+    Restaurants that chose SVG get vector files (labelled inline, it is only
+    string work); the rest get captioned PNGs.
+    """
+    tables = sorted(
+        (table for table in tables if table.restaurant_id),
+        key=lambda table: (table.restaurant_id, table.table_number or 0),
+    )
+    svg_tables = [table for table in tables if table.restaurant.qr_format == 'svg']
+    png_tables, qrcodes = _tables_with_qrcodes(table for table in tables if table.restaurant.qr_format != 'svg')
+    files = [
+        (svg_tables, 'svg', _labelled_svgs(svg_tables)),
+        (png_tables, 'png', _labelled_pngs(png_tables, qrcodes)),
+    ]
+
+    sink = _ZipStream()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for group, extension, contents in files:
+            for table, data in zip(group, contents):
+                name = f"{slugify(table.restaurant.restaurant_name) or table.restaurant_id}/table_{table.table_number}_qrcode.{extension}"
+                archive.writestr(name, data)
+                yield sink.pop()
+    yield sink.pop()
+
+
+def build_qrcode_pdf(tables):
+    """A printable PDF with one table QR and its caption per A4 page."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen import canvas
+
+    tables, qrcodes = _tables_with_qrcodes(tables)
+    # One ImageReader per restaurant: reportlab embeds a repeated image once.
+    readers = {restaurant_id: ImageReader(io.BytesIO(png)) for restaurant_id, png in qrcodes.items()}
+
+    output = io.BytesIO()
+    pdf = canvas.Canvas(output, pagesize=A4)
+    page_width, page_height = A4
+    qr_size = page_width - 6 * cm
+    for table in tables:
+        x = (page_width - qr_size) / 2
+        y = (page_height - qr_size) / 2 + 1.5 * cm
+        pdf.drawImage(readers[table.restaurant_id], x, y, qr_size, qr_size, mask='auto')
+        pdf.setFont('Helvetica-Bold', 32)
+        pdf.drawCentredString(page_width / 2, y - 2 * cm, _caption(table))
+        pdf.setFont('Helvetica', 14)
+        pdf.drawCentredString(page_width / 2, y - 3 * cm, table.restaurant.restaurant_name or '')
+        pdf.showPage()
+    pdf.save()
+    return output.getvalue()
@@ -1,79 +1,205 @@
+import base64
 import logging
+import os
 import qrcode
 import hashlib
 from qrcode.constants import ERROR_CORRECT_L
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
 from django.utils.text import slugify
 from io import BytesIO
 from PIL import Image
 
+from .background import BackgroundPool
+from .storage import ContentAddressedStorage
+
 logger = logging.getLogger(__name__)
 
-def generate_qrcode(table):
-    # Check if the restaurant is associated with the table
-    if not table.restaurant:
-        logger.error("No restaurant associated with the table.")
-        return None, None  # Early return if no restaurant
+DEFAULT_BASE_URL = "https://delvrr.com/"
+QR_BOX_SIZE = 15
+QR_BORDER = 4
+QR_FILL_COLOR = "green"
+QR_BACK_COLOR = "white"
+SVG_LOGO_PIXELS = 96  # embedded logo resolution; it covers 1/8 of the code
+QR_CACHE_TIMEOUT = 60 * 60 * 24 * 30  # entries are keyed on their inputs, so they never go stale
+
+qrcode_pool = BackgroundPool('qrcodes', 'QR_WORKERS', 'QR_BACKGROUND', default_workers=1)
+
+
+def menu_url(restaurant):
+    """Public menu URL that every table QR of ``restaurant`` encodes."""
+    base_url = getattr(settings, 'QR_BASE_URL', DEFAULT_BASE_URL)
+    restaurant_name_slug = slugify(restaurant.restaurant_name)
 
-    base_url = "https://delvrr.com/"
-    restaurant_name_slug = slugify(table.restaurant.restaurant_name)
-    
     # Use the restaurant's hashed_slug if available; otherwise, fallback
-    if table.restaurant.hashed_slug:
-        hashed_value = table.restaurant.hashed_slug
+    if restaurant.hashed_slug:
+        hashed_value = restaurant.hashed_slug
     else:
-        hashed_value = hashlib.sha256(str(table.restaurant.id).encode('utf-8')).hexdigest()[:10]
-    
+        hashed_value = hashlib.sha256(str(restaurant.id).encode('utf-8')).hexdigest()[:10]
+
     # Construct the URL with a trailing slash to match your URL pattern
-    table_qrcode_url = f'{base_url}menu/{restaurant_name_slug}/{hashed_value}/'
+    return f'{base_url}menu/{restaurant_name_slug}/{hashed_value}/'
 
+
+def load_logo(restaurant):
+    """Decode the restaurant logo as RGBA, or None if it has none or it can't be read."""
+    if not restaurant.logo_pic:
+        return None
     try:
-        qr = qrcode.QRCode(
-            version=None,
-            error_correction=ERROR_CORRECT_L,
-            box_size=15,
-            border=4,
+        with restaurant.logo_pic.open('rb') as logo_file:
+            with Image.open(logo_file) as logo:
+                return logo.convert('RGBA')
+    except Exception as e:
+        logger.error(f"Error loading logo image: {e}")
+        return None
+
+
+def _build_qr(url):
+    qr = qrcode.QRCode(
+        version=None,
+        error_correction=ERROR_CORRECT_L,
+        box_size=QR_BOX_SIZE,
+        border=QR_BORDER,
+    )
+    qr.add_data(url)
+    qr.make(fit=True)
+    return qr
+
+
+def render_qrcode(url, logo=None):
+    """Render the green QR for ``url`` with ``logo`` centred at 1/8 of its width."""
+    qr = _build_qr(url)
+    qr_image = qr.make_image(fill_color=QR_FILL_COLOR, back_color=QR_BACK_COLOR).convert('RGBA')
+
+    if logo is not None:
+        qr_width, qr_height = qr_image.size
+        logo_image_size = qr_width // 8
+        if logo.size != (logo_image_size, logo_image_size):
+            logo = logo.resize((logo_image_size, logo_image_size))
+
+        # Calculate the centered logo position
+        logo_position = (
+            (qr_width - logo_image_size) // 2,
+            (qr_height - logo_image_size) // 2,
         )
-        qr.add_data(table_qrcode_url)
-        qr.make(fit=True)
-
-        qr_image = qr.make_image(fill_color="green", back_color="white").convert('RGBA')
-
-        # Check if the restaurant logo exists and overlay it on the QR code
-        if table.restaurant.logo_pic:
-            try:
-                restaurant_logo_image_path = table.restaurant.logo_pic.path
-                if restaurant_logo_image_path:  # Ensure the path is valid
-                    restaurant_logo_image = Image.open(restaurant_logo_image_path).convert('RGBA')
-                    qr_width, qr_height = qr_image.size
-                    logo_image_size = qr_width // 8
-                    logo_image = restaurant_logo_image.resize((logo_image_size, logo_image_size))
-                    
-                    # Create a transparent image and paste the QR code onto it
-                    transparent = Image.new('RGBA', (qr_width, qr_height))
-                    transparent.paste(qr_image, (0, 0))
-                    
-                    # Calculate the centered logo position
-                    logo_position = (
-                        (qr_width - logo_image_size) // 2,
-                        (qr_height - logo_image_size) // 2,
-                    )
-                    
-                    # Overlay the logo using its own mask for transparency
-                    transparent.paste(logo_image, logo_position, logo_image)
-                    qr_image = transparent
-                else:
-                    logger.warning("Restaurant logo path is None.")
-            except Exception as e:
-                logger.error(f"Error loading logo image: {e}")
-
-        # Save the QR code to a buffer
-        image_buffer = BytesIO()
-        qr_image.save(image_buffer, format="PNG")
-        image_buffer.seek(0)  # Reset buffer position
-
-        image_filename = f"table_{table.table_number}_qrcode.png"
-        return image_filename, image_buffer
 
-    except Exception as e:
-        logger.error(f"Error generating QR code: {e}")
-        return None, None
+        # Overlay the logo using its own mask for transparency
+        qr_image.paste(logo, logo_position, logo)
+    return qr_image
+
+
+def render_qrcode_svg(url, logo=None):
+    """
+    Vector version of ``render_qrcode``: one <path> of module runs in a
+    viewBox measured in modules, so it prints sharp at any size. The logo is
+    embedded as a small PNG data URI to keep the file self-contained.
+    """
+    matrix = _build_qr(url).get_matrix()
+    size = len(matrix)
+    runs = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < size:
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < size and row[x]:
+                x += 1
+            runs.append(f"M{start} {y}h{x - start}v1h-{x - start}z")
+
+    logo_element = ''
+    if logo is not None:
+        logo_buffer = BytesIO()
+        logo.resize((SVG_LOGO_PIXELS, SVG_LOGO_PIXELS)).save(logo_buffer, format="PNG", optimize=True)
+        encoded = base64.b64encode(logo_buffer.getvalue()).decode('ascii')
+        logo_size = size / 8
+        offset = (size - logo_size) / 2
+        logo_element = (
+            f'<image x="{offset:g}" y="{offset:g}" width="{logo_size:g}" height="{logo_size:g}" '
+            f'href="data:image/png;base64,{encoded}"/>'
+        )
+
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+        f'<rect width="{size}" height="{size}" fill="{QR_BACK_COLOR}"/>'
+        f'<path fill="{QR_FILL_COLOR}" d="{"".join(runs)}"/>'
+        f'{logo_element}</svg>'
+    )
+
+
+def qrcode_style(qr_format='png'):
+    return f"{qr_format}-{QR_BOX_SIZE}-{QR_BORDER}-{QR_FILL_COLOR}-{QR_BACK_COLOR}-L"
+
+
+def logo_fingerprint(restaurant):
+    """Identify the logo without reading it: content-addressed names are already its hash."""
+    if not restaurant.logo_pic:
+        return 'no-logo'
+    name = restaurant.logo_pic.name
+    if ContentAddressedStorage.is_content_name(name):
+        return os.path.splitext(os.path.basename(name))[0]
+    # Legacy names are unique per upload, so the name identifies the content.
+    return hashlib.sha256(name.encode('utf-8')).hexdigest()
+
+
+def qrcode_cache_key(url, logo_hash, style):
+    digest = hashlib.sha256(f"{url}|{logo_hash}|{style}".encode('utf-8')).hexdigest()[:32]
+    return f"qrcode_{digest}"
+
+
+def _cached_render(restaurant, qr_format, render):
+    url = menu_url(restaurant)
+    key = qrcode_cache_key(url, logo_fingerprint(restaurant), qrcode_style(qr_format))
+    data = cache.get(key)
+    if data is None:
+        data = render(url, load_logo(restaurant))
+        cache.set(key, data, QR_CACHE_TIMEOUT)
+    return data
+
+
+def _png_bytes(url, logo):
+    image_buffer = BytesIO()
+    render_qrcode(url, logo).save(image_buffer, format="PNG")
+    return image_buffer.getvalue()
+
+
+def _svg_bytes(url, logo):
+    return render_qrcode_svg(url, logo).encode('utf-8')
+
+
+def render_qrcode_png(restaurant):
+    """
+    PNG bytes of the restaurant's table QR. Every table of a restaurant
+    encodes the same URL, so the render is cached on (URL, logo, style) and
+    shared by all of them; changing the name or logo changes the key.
+    """
+    return _cached_render(restaurant, 'png', _png_bytes)
+
+
+def render_qrcode_file(restaurant):
+    """``(extension, bytes)`` of the table QR in the restaurant's chosen format."""
+    if restaurant.qr_format == 'svg':
+        return 'svg', _cached_render(restaurant, 'svg', _svg_bytes)
+    return 'png', render_qrcode_png(restaurant)
+
+
+def assign_table_qrcodes(restaurant_id, replace=False):
+    """
+    Give every table of the restaurant that has no QR yet (or every table,
+    with ``replace``) the shared QR file. The field's content-addressed
+    storage writes it once; repeated calls only hash it and update rows.
+    Returns the number of tables updated.
+    """
+    from .models import Restaurant, Table
+
+    restaurant = Restaurant.objects.filter(pk=restaurant_id).first()
+    if restaurant is None:
+        return 0
+    field = Table._meta.get_field('qrcode_image')
+    extension, data = render_qrcode_file(restaurant)
+    name = field.storage.save(f"{field.upload_to}/qrcode.{extension}", ContentFile(data))
+    tables = Table.objects.filter(restaurant_id=restaurant_id)
+    tables = tables.exclude(qrcode_image=name) if replace else tables.filter(qrcode_image='')
+    return tables.update(qrcode_image=name)
@@ -0,0 +1,83 @@
+import logging
+import time
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Entries are tagged with the restaurant's content version, so they can live
+# long: a Product/Category/BrandColor change bumps the version instead of
+# waiting for a TTL to expire.
+ENTRY_TIMEOUT = 60 * 60 * 24 * 7  # 1 week
+LOCK_TIMEOUT = 30                 # seconds a rebuild may hold the lock
+LOCK_WAIT = 2.0                   # seconds a cold request waits for another rebuild
+LOCK_POLL_INTERVAL = 0.05
+
+
+def version_key(restaurant_id):
+    return f"restaurant_{restaurant_id}_version"
+
+
+def _initial_version():
+    # Wall-clock based so a version key evicted from the cache never comes
+    # back with a number that old entries were already tagged with.
+    return time.time_ns()
+
+
+def get_restaurant_version(restaurant_id):
+    """Return the current content version for a restaurant's menu data."""
+    key = version_key(restaurant_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_restaurant_version(restaurant_id):
+    """Mark every versioned cache entry of ``restaurant_id`` as stale."""
+    key = version_key(restaurant_id)
+    try:
+        version = cache.incr(key)
+    except ValueError:
+        cache.add(key, _initial_version(), None)
+        version = cache.get(key)
+    logger.debug(f"Restaurant {restaurant_id} cache version bumped to {version}")
+    return version
+
+
+def get_or_build(restaurant_id, key, builder, timeout=ENTRY_TIMEOUT):
+    """
+    Return the value cached under ``key`` for the restaurant's current version,
+    calling ``builder()`` to rebuild it when missing or stale.
+
+    Only one caller rebuilds at a time (guarded by a cache lock). While it does,
+    everyone else keeps serving the stale value; on a cold cache they briefly
+    wait for the rebuild rather than repeating the same queries.
+    """
+    version = get_restaurant_version(restaurant_id)
+    entry = cache.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    lock_key = f"{key}_rebuild_lock"
+    if cache.add(lock_key, version, LOCK_TIMEOUT):
+        try:
+            value = builder()
+            cache.set(key, (version, value), timeout)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    if entry is not None:
+        return entry[1]
+
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[1]
+
+    logger.warning(f"Timed out waiting for rebuild of {key}; building without the lock")
+    return builder()
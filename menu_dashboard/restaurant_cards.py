@@ -0,0 +1,126 @@
+import logging
+
+from django.db.models import Q
+from django.urls import NoReverseMatch, reverse
+
+from .background import BackgroundPool
+from .business_hours import is_open_at, open_restaurants, week_minute
+from .image_variants import render_variants
+
+logger = logging.getLogger(__name__)
+
+CARD_PAGE_SIZE = 24
+CARD_LOGO_WIDTH = 400   # the store-list grid is at most ~400px per column
+DEFAULT_CARD_COLOUR = "#f7c028"  # same default as Restaurant.get_primary_brand_color
+
+# Everything a store-list card needs, loaded in one query.
+CARD_FIELDS = (
+    'id', 'restaurant_name', 'slug', 'hashed_slug', 'logo_pic', 'address',
+    'business_hours', 'mobile', 'opening_hours', 'card_data',
+)
+
+# Separate from the image-variant pool so a bulk image upload does not hold
+# up store-list cards.
+card_pool = BackgroundPool('restaurant-cards', 'CARD_WORKERS', 'CARD_BACKGROUND', default_workers=1)
+
+
+def build_card(restaurant, colour=DEFAULT_CARD_COLOUR, logo=None, logo_digest=None):
+    """The stored part of a card: everything except the time-dependent open flag."""
+    try:
+        url = reverse('restaurant_menu', kwargs={
+            'restaurant_name_slug': restaurant.slug,
+            'hashed_slug': restaurant.hashed_slug,
+        })
+    except NoReverseMatch:  # no name yet, so no slug
+        url = ''
+    if logo is None and restaurant.logo_pic:
+        logo = restaurant.logo_pic.url
+    return {
+        'id': restaurant.id,
+        'name': restaurant.restaurant_name or '',
+        'slug': restaurant.slug or '',
+        'url': url,
+        'logo': logo or '',
+        'logo_source': restaurant.logo_pic.name if restaurant.logo_pic else '',
+        'logo_digest': logo_digest,
+        'colour': colour,
+        'address': restaurant.address or '',
+        'hours': restaurant.business_hours or '',
+        'mobile': restaurant.mobile or '',
+    }
+
+
+def _logo_thumbnail(restaurant):
+    """``(url, digest)`` of the card-sized logo, rendering it if the logo changed."""
+    card = restaurant.card_data or {}
+    if card.get('logo_source') == restaurant.logo_pic.name and card.get('logo_digest'):
+        return card['logo'], card['logo_digest']
+    with restaurant.logo_pic.open('rb') as logo_file:
+        data = logo_file.read()
+    variants = render_variants(data, restaurant.logo_pic.name, widths=(CARD_LOGO_WIDTH,))
+    # WebP keeps the transparency most logos have; JPEG if it is unavailable.
+    entries = variants['formats'].get('webp') or variants['formats'].get('jpeg')
+    return entries[-1][1], variants['digest']
+
+
+def refresh_restaurant_card(restaurant_id):
+    """Rebuild and store a restaurant's card: logo thumbnail, brand colour, text."""
+    from .models import Restaurant
+
+    restaurant = Restaurant.objects.filter(pk=restaurant_id).only(*CARD_FIELDS).first()
+    if restaurant is None:
+        return None
+    colour = (
+        restaurant.brand_colors.order_by('pk').values_list('color', flat=True).first()
+        or DEFAULT_CARD_COLOUR
+    )
+    logo = logo_digest = None
+    if restaurant.logo_pic:
+        try:
+            logo, logo_digest = _logo_thumbnail(restaurant)
+        except Exception as e:
+            logger.error(f"Could not render card logo for restaurant {restaurant_id}: {e}")
+    card = build_card(restaurant, colour, logo, logo_digest)
+
+    # Only store it if the logo was not replaced while we were rendering.
+    if restaurant.logo_pic:
+        logo_unchanged = Q(logo_pic=restaurant.logo_pic.name)
+    else:
+        logo_unchanged = Q(logo_pic='') | Q(logo_pic__isnull=True)
+    Restaurant.objects.filter(logo_unchanged, pk=restaurant_id).update(card_data=card)
+    return card
+
+
+def needs_card(restaurant):
+    card = restaurant.card_data or {}
+    logo_name = restaurant.logo_pic.name if restaurant.logo_pic else ''
+    return not card or card.get('logo_source') != logo_name or (bool(logo_name) and not card.get('logo_digest'))
+
+
+def card_payload(restaurant, minute):
+    """The card to render or serve, with the open flag for ``minute`` of the week."""
+    card = dict(restaurant.card_data or build_card(restaurant))
+    card['open'] = is_open_at(restaurant.opening_hours, minute)
+    return card
+
+
+def card_page(cursor=None, open_now=False, limit=CARD_PAGE_SIZE, moment=None):
+    """
+    One page of store-list cards in id order, with keyset pagination: the
+    next page starts after the last id served, so every page costs one
+    indexed range query no matter how deep it is. Returns
+    ``(cards, next_cursor)``; ``next_cursor`` is None on the last page.
+    """
+    from .models import Restaurant
+
+    restaurants = Restaurant.objects.only(*CARD_FIELDS).order_by('id')
+    if cursor is not None:
+        restaurants = restaurants.filter(id__gt=cursor)
+    if open_now:
+        restaurants = open_restaurants(restaurants, moment)
+    # One extra row tells us whether there is a next page.
+    restaurants = list(restaurants[:limit + 1])
+    next_cursor = restaurants[limit - 1].id if len(restaurants) > limit else None
+
+    minute = week_minute(moment)
+    return [card_payload(restaurant, minute) for restaurant in restaurants[:limit]], next_cursor
@@ -0,0 +1,206 @@
+import logging
+import re
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+SEARCH_PAGE_SIZE = 20
+MAX_QUERY_TERMS = 8
+MATCHED_DISHES_SHOWN = 3
+MIN_TRIGRAM_LENGTH = 3  # FTS5's trigram index can only answer terms this long
+RESTAURANT_BOOST = 2    # a hit on the restaurant itself outranks a dish hit
+
+# bm25 ranks are negative: lower is better.
+_SQLITE_SEARCH = """
+    SELECT restaurant_id, MIN(rank * CASE WHEN kind = 'restaurant' THEN {boost} ELSE 1 END) AS score
+    FROM menu_dashboard_searchentry_fts
+    WHERE menu_dashboard_searchentry_fts MATCH %s
+    GROUP BY restaurant_id
+    ORDER BY score, restaurant_id
+    LIMIT %s OFFSET %s
+"""
+_POSTGRES_SEARCH = """
+    SELECT e.restaurant_id,
+           MAX(ts_rank(e.document, q) * CASE WHEN e.kind = 'restaurant' THEN {boost} ELSE 1 END) AS score
+    FROM menu_dashboard_searchentry e, to_tsquery('simple', %s) q
+    WHERE e.document @@ q
+    GROUP BY e.restaurant_id
+    ORDER BY score DESC, e.restaurant_id
+    LIMIT %s OFFSET %s
+"""
+
+
+class SearchResults:
+    """One page of ranked restaurants; dish hits are attached as ``matched_dishes``."""
+
+    def __init__(self, query, restaurants, page, has_next):
+        self.query = query
+        self.restaurants = restaurants
+        self.page = page
+        self.has_next = has_next
+        self.has_previous = page > 1
+
+    def __iter__(self):
+        return iter(self.restaurants)
+
+    def __len__(self):
+        return len(self.restaurants)
+
+
+def _restaurant_fields(restaurant):
+    return {
+        'restaurant_id': restaurant.id,
+        'title': restaurant.restaurant_name or '',
+        'body': restaurant.address or '',
+    }
+
+
+def _product_fields(product):
+    return {
+        'restaurant_id': product.restaurant_id,
+        'title': product.name or '',
+        'body': product.description or '',
+    }
+
+
+def index_restaurant(restaurant):
+    from .models import SearchEntry
+
+    SearchEntry.objects.update_or_create(
+        kind=SearchEntry.RESTAURANT, object_id=restaurant.id, defaults=_restaurant_fields(restaurant),
+    )
+
+
+def index_product(product):
+    from .models import SearchEntry
+
+    if not product.restaurant_id:
+        unindex_product(product.id)
+        return
+    SearchEntry.objects.update_or_create(
+        kind=SearchEntry.PRODUCT, object_id=product.id, defaults=_product_fields(product),
+    )
+
+
+def unindex_product(product_id):
+    from .models import SearchEntry
+
+    SearchEntry.objects.filter(kind=SearchEntry.PRODUCT, object_id=product_id).delete()
+
+
+def rebuild_index(batch_size=1000):
+    """Re-create every entry, e.g. after bulk ``update()`` calls that bypass the signals."""
+    from .models import Product, Restaurant, SearchEntry
+
+    restaurants = Restaurant.objects.only('id', 'restaurant_name', 'address')
+    products = Product.objects.exclude(restaurant=None).only('id', 'restaurant_id', 'name', 'description')
+    with transaction.atomic():
+        SearchEntry.objects.all().delete()
+        SearchEntry.objects.bulk_create(
+            [SearchEntry(kind=SearchEntry.RESTAURANT, object_id=r.id, **_restaurant_fields(r))
+             for r in restaurants.iterator()]
+            + [SearchEntry(kind=SearchEntry.PRODUCT, object_id=p.id, **_product_fields(p))
+               for p in products.iterator()],
+            batch_size=batch_size,
+        )
+    return SearchEntry.objects.count()
+
+
+def search_terms(query):
+    """Lower-cased words of ``query``, at most MAX_QUERY_TERMS of them."""
+    return re.findall(r'\w+', (query or '').lower())[:MAX_QUERY_TERMS]
+
+
+def _sqlite_match(terms):
+    """FTS5 MATCH expression, or None when no term is long enough for the trigram index."""
+    terms = [term for term in terms if len(term) >= MIN_TRIGRAM_LENGTH]
+    if not terms:
+        return None
+    return ' AND '.join(f'"{term}"' for term in terms)
+
+
+def _postgres_match(terms):
+    return ' & '.join(f'{term}:*' for term in terms) or None
+
+
+def _ranked_restaurant_ids(terms, limit, offset):
+    """Restaurant ids matching ``terms``, best-ranked first."""
+    if connection.vendor == 'sqlite':
+        match, search_sql = _sqlite_match(terms), _SQLITE_SEARCH
+    elif connection.vendor == 'postgresql':
+        match, search_sql = _postgres_match(terms), _POSTGRES_SEARCH
+    else:
+        match = None
+    if match is None:
+        return _fallback_restaurant_ids(terms, limit, offset)
+
+    with connection.cursor() as cursor:
+        cursor.execute(search_sql.format(boost=RESTAURANT_BOOST), [match, limit, offset])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _fallback_restaurant_ids(terms, limit, offset):
+    # Other backends, and queries of only one- and two-letter words: an
+    # unindexed scan of the (compact) entry table.
+    from .models import SearchEntry
+
+    entries = SearchEntry.objects.all()
+    for term in terms:
+        entries = entries.filter(Q(title__icontains=term) | Q(body__icontains=term))
+    ids = entries.values_list('restaurant_id', flat=True).order_by('restaurant_id').distinct()
+    return list(ids[offset:offset + limit])
+
+
+def _matched_dishes(terms, restaurant_ids):
+    """
+    Dishes of the page's restaurants containing every term. Checked here on
+    the few dozen entries of one page: asking the index would rank every
+    match in the catalogue again.
+    """
+    from .models import SearchEntry
+
+    dishes = {}
+    entries = (
+        SearchEntry.objects
+        .filter(kind=SearchEntry.PRODUCT, restaurant_id__in=restaurant_ids)
+        .order_by('title')
+        .values_list('restaurant_id', 'title', 'body')
+    )
+    for restaurant_id, title, body in entries:
+        text = f"{title} {body}".lower()
+        names = dishes.setdefault(restaurant_id, [])
+        if len(names) < MATCHED_DISHES_SHOWN and all(term in text for term in terms):
+            names.append(title)
+    return dishes
+
+
+def search_restaurants(query, page=1, per_page=SEARCH_PAGE_SIZE):
+    """
+    Restaurants matching every word of ``query`` in their name, address or
+    dishes, best match first. Served from the full-text index, so the cost
+    follows the number of matching entries rather than the catalogue size.
+    """
+    from .models import Restaurant
+
+    terms = search_terms(query)
+    page = max(int(page or 1), 1)
+    if not terms:
+        return SearchResults(query, [], page, False)
+
+    # One extra row tells us whether there is a next page without a COUNT.
+    ids = _ranked_restaurant_ids(terms, per_page + 1, (page - 1) * per_page)
+    has_next = len(ids) > per_page
+    ids = ids[:per_page]
+
+    restaurants = Restaurant.objects.in_bulk(ids)
+    dishes = _matched_dishes(terms, ids)
+    results = []
+    for restaurant_id in ids:
+        restaurant = restaurants.get(restaurant_id)
+        if restaurant is None:
+            continue
+        restaurant.matched_dishes = dishes.get(restaurant_id, [])
+        results.append(restaurant)
+    return SearchResults(query, results, page, has_next)
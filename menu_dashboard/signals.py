@@ -0,0 +1,134 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .brand_theme import refresh_brand_theme
+from .image_variants import build_product_variants, needs_variants, variant_pool
+from .models import BrandColor, Category, Notification, Orders, Product, ProductVariation, Restaurant, Table
+from .notification_index import bump_notification_version, notification_index
+from .order_events import order_broker, order_event_data
+from .qrcode_generator import assign_table_qrcodes, qrcode_pool
+from .restaurant_cache import bump_restaurant_version
+from .restaurant_cards import card_pool, refresh_restaurant_card
+from .search import index_product, index_restaurant, unindex_product
+
+
+def _bump_on_commit(restaurant_ids):
+    restaurant_ids = {restaurant_id for restaurant_id in restaurant_ids if restaurant_id}
+    if not restaurant_ids:
+        return
+
+    def bump_versions():
+        for restaurant_id in restaurant_ids:
+            bump_restaurant_version(restaurant_id)
+
+    transaction.on_commit(bump_versions)
+
+
+@receiver([post_save, post_delete], sender=Product)
+def product_changed(sender, instance, **kwargs):
+    _bump_on_commit([instance.restaurant_id])
+
+
+@receiver(post_save, sender=Product)
+def product_image_changed(sender, instance, **kwargs):
+    if needs_variants(instance):
+        product_id = instance.pk
+        transaction.on_commit(lambda: variant_pool.submit(build_product_variants, product_id))
+
+
+@receiver([post_save, post_delete], sender=ProductVariation)
+def product_variation_changed(sender, instance, **kwargs):
+    restaurant_id = (
+        Product.objects
+        .filter(pk=instance.product_id)
+        .values_list('restaurant_id', flat=True)
+        .first()
+    )
+    _bump_on_commit([restaurant_id])
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, **kwargs):
+    _bump_on_commit(
+        Product.objects.filter(category=instance).values_list('restaurant_id', flat=True).distinct()
+    )
+
+
+@receiver(pre_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    # Products are detached with SET_NULL, so collect their restaurants first.
+    _bump_on_commit(
+        list(Product.objects.filter(category=instance).values_list('restaurant_id', flat=True).distinct())
+    )
+
+
+@receiver([post_save, post_delete], sender=BrandColor)
+def brand_color_changed(sender, instance, **kwargs):
+    _bump_on_commit([instance.restaurant_id])
+
+
+@receiver([post_save, post_delete], sender=BrandColor)
+def brand_theme_changed(sender, instance, **kwargs):
+    restaurant_id = instance.restaurant_id
+    transaction.on_commit(lambda: refresh_brand_theme(restaurant_id))
+
+
+@receiver(post_save, sender=Restaurant)
+def restaurant_saved(sender, instance, **kwargs):
+    # Name, logo and address are part of the cached menu page.
+    _bump_on_commit([instance.id])
+
+
+@receiver(post_save, sender=Orders)
+def order_saved(sender, instance, created, **kwargs):
+    if not instance.restaurant_id:
+        return
+    event_type = 'order.created' if created else 'order.updated'
+    data = order_event_data(instance)
+    transaction.on_commit(lambda: order_broker.publish(instance.restaurant_id, event_type, data))
+
+
+@receiver(post_save, sender=Table)
+def table_saved(sender, instance, **kwargs):
+    if not instance.qrcode_image and instance.restaurant_id:
+        restaurant_id = instance.restaurant_id
+        transaction.on_commit(lambda: qrcode_pool.submit(assign_table_qrcodes, restaurant_id))
+
+
+@receiver([post_save, post_delete], sender=Notification)
+@receiver(m2m_changed, sender=Notification.restaurants.through)
+def notification_changed(sender, **kwargs):
+    # Drop this process's copy now; every process reloads once it commits.
+    notification_index.invalidate()
+    transaction.on_commit(bump_notification_version)
+
+
+@receiver(post_save, sender=Restaurant)
+def restaurant_search_entry(sender, instance, **kwargs):
+    index_restaurant(instance)
+
+
+@receiver(post_save, sender=Product)
+def product_search_entry(sender, instance, **kwargs):
+    index_product(instance)
+
+
+@receiver(post_delete, sender=Product)
+def product_search_entry_deleted(sender, instance, **kwargs):
+    unindex_product(instance.id)
+
+
+def _refresh_card_on_commit(restaurant_id):
+    if restaurant_id:
+        transaction.on_commit(lambda: card_pool.submit(refresh_restaurant_card, restaurant_id))
+
+
+@receiver(post_save, sender=Restaurant)
+def restaurant_card_changed(sender, instance, **kwargs):
+    _refresh_card_on_commit(instance.id)
+
+
+@receiver([post_save, post_delete], sender=BrandColor)
+def brand_color_card_changed(sender, instance, **kwargs):
+    _refresh_card_on_commit(instance.restaurant_id)
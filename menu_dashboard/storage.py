@@ -0,0 +1,55 @@
+import hashlib
+import os
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Media storage that names files by the SHA-256 of their content:
+    ``product_image/dish.jpg`` is stored as ``product_image/3f/3fa2….jpg``.
+    Uploading a picture that is already stored returns the existing name
+    without writing anything, so identical uploads share one file (and one
+    set of thumbnails and variants, which are keyed on the name).
+
+    Files are never deleted when a row changes or goes away, because other
+    rows may still point at them; ``gc_media`` removes unreferenced blobs.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.content_name(name, self.digest(content))
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    @staticmethod
+    def digest(content):
+        sha256 = hashlib.sha256()
+        for chunk in content.chunks():
+            sha256.update(chunk)
+        content.seek(0)
+        return sha256.hexdigest()
+
+    @staticmethod
+    def content_name(name, digest):
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        return os.path.join(directory, digest[:2], f"{digest}{extension}")
+
+    @staticmethod
+    def is_content_name(name):
+        stem = os.path.splitext(os.path.basename(name))[0]
+        parent = os.path.basename(os.path.dirname(name))
+        return len(stem) == 64 and stem.startswith(parent)
+
+
+content_addressed_storage = ContentAddressedStorage()
+
+
+def content_storage():
+    return content_addressed_storage
@@ -0,0 +1,207 @@
+import shutil
+import tempfile
+import zipfile
+from xml.etree import ElementTree
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+
+from menu_dashboard.models import Customer, OrderProduct, Orders, Product, Restaurant, Table
+from menu_dashboard.qr_export import build_qrcode_pdf, stream_qrcode_zip
+from menu_dashboard.qrcode_generator import (
+    assign_table_qrcodes,
+    load_logo,
+    menu_url,
+    render_qrcode_file,
+    render_qrcode_png,
+)
+
+
+class OrderAdminChangelistTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        owner = get_user_model().objects.create_user(username='owner', password='testpass123')
+        self.restaurant = Restaurant.objects.create(
+            user=owner,
+            restaurant_name='Admin Kitchen',
+            hashed_slug='admin-slug'
+        )
+        self.products = [
+            Product.objects.create(name=f'Dish {i}', price=Decimal('3.00'), restaurant=self.restaurant)
+            for i in range(3)
+        ]
+        admin_user = get_user_model().objects.create_superuser(
+            username='admin', password='testpass123', email='admin@example.com'
+        )
+        self.client.force_login(admin_user)
+        self.url = reverse('admin:menu_dashboard_orders_changelist')
+
+    def _create_orders(self, count):
+        for i in range(count):
+            user = get_user_model().objects.create_user(username=f'diner{Orders.objects.count()}')
+            customer = Customer.objects.create(user=user, mobile='123')
+            order = Orders.objects.create(customer=customer, restaurant=self.restaurant, amount=Decimal('0'))
+            OrderProduct.objects.bulk_create([
+                OrderProduct(order=order, product=product, quantity=2, price=product.price)
+                for product in self.products
+            ])
+
+    def _changelist_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_query_count_independent_of_order_count(self):
+        self.client.get(self.url)  # load the per-process notification index
+        self._create_orders(2)
+        few = self._changelist_queries()
+        self._create_orders(10)
+        many = self._changelist_queries()
+        self.assertEqual(few, many)
+
+    def test_total_amount_annotated_from_lines(self):
+        self._create_orders(1)
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['cl'].result_list[0].line_total, Decimal('18'))
+
+    def test_search_on_product_does_not_inflate_total(self):
+        self._create_orders(1)
+        response = self.client.get(self.url, {'q': 'Dish'})
+        orders = response.context['cl'].result_list
+        self.assertEqual(len(orders), 1)
+        self.assertEqual(orders[0].line_total, Decimal('18'))
+
+
+@override_settings(QR_BACKGROUND=False)
+class TableQRCodeExportTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+        owner = get_user_model().objects.create_user(username='owner', password='testpass123')
+        logo = BytesIO()
+        Image.new('RGBA', (64, 64), (255, 0, 0, 255)).save(logo, format='PNG')
+        self.restaurant = Restaurant.objects.create(
+            user=owner,
+            restaurant_name='QR Diner',
+            hashed_slug='qr-slug',
+            logo_pic=SimpleUploadedFile('logo.png', logo.getvalue(), content_type='image/png'),
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tables = [Table.objects.create(table_number=n, restaurant=self.restaurant) for n in range(1, 5)]
+        admin_user = get_user_model().objects.create_superuser(
+            username='admin', password='testpass123', email='admin@example.com'
+        )
+        self.client.force_login(admin_user)
+
+    def _action(self, model, action, objects):
+        return self.client.post(reverse(f'admin:menu_dashboard_{model}_changelist'), {
+            'action': action,
+            '_selected_action': [obj.pk for obj in objects],
+        })
+
+    def _zip_names(self, response):
+        archive = zipfile.ZipFile(BytesIO(b''.join(response.streaming_content)))
+        self.assertIsNone(archive.testzip())
+        return sorted(archive.namelist())
+
+    def test_zip_contains_every_selected_table(self):
+        response = self._action('table', 'download_qr_codes', self.tables)
+
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertEqual(self._zip_names(response), [f'qr-diner/table_{n}_qrcode.png' for n in range(1, 5)])
+
+    def test_render_cached_across_tables_and_exports(self):
+        cache.clear()
+        with mock.patch('menu_dashboard.qrcode_generator.load_logo', wraps=load_logo) as loader:
+            b''.join(stream_qrcode_zip(Table.objects.select_related('restaurant')))
+            build_qrcode_pdf(Table.objects.select_related('restaurant'))
+        loader.assert_called_once()
+
+    def test_tables_share_one_qrcode_file(self):
+        names = set(Table.objects.values_list('qrcode_image', flat=True))
+
+        self.assertEqual(len(names), 1)
+        name = names.pop()
+        self.assertTrue(name.startswith('core/table_qrcodes/'))
+        with Table._meta.get_field('qrcode_image').storage.open(name) as qr_file:
+            self.assertEqual(qr_file.read(), render_qrcode_png(self.restaurant))
+
+    def test_qrcode_generated_after_commit_not_in_save(self):
+        with mock.patch('menu_dashboard.qrcode_generator.render_qrcode') as render:
+            with self.captureOnCommitCallbacks() as callbacks:
+                table = Table.objects.create(table_number=9, restaurant=self.restaurant)
+            render.assert_not_called()
+        self.assertFalse(table.qrcode_image)
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(
+            Table.objects.get(id=table.id).qrcode_image.name,
+            Table.objects.get(id=self.tables[0].id).qrcode_image.name,
+        )
+
+    def test_logo_change_changes_cache_key(self):
+        before = render_qrcode_png(self.restaurant)
+        logo = BytesIO()
+        Image.new('RGBA', (64, 64), (0, 0, 255, 255)).save(logo, format='PNG')
+        self.restaurant.logo_pic = SimpleUploadedFile('logo2.png', logo.getvalue(), content_type='image/png')
+        self.restaurant.save()
+
+        self.assertNotEqual(render_qrcode_png(self.restaurant), before)
+
+    def test_pdf_has_one_page_per_table(self):
+        response = self._action('restaurant', 'download_table_qr_codes', [self.restaurant])
+
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response.content.count(b'/Type /Page\n'), 4)
+        # The shared QR image (and its alpha mask) is embedded once, not per page.
+        self.assertEqual(response.content.count(b'/Subtype /Image'), 2)
+
+    def test_qrcode_encodes_public_menu_url(self):
+        self.assertEqual(menu_url(self.restaurant), 'https://delvrr.com/menu/qr-diner/qr-slug/')
+
+    def test_svg_qrcode_is_small_vector_file(self):
+        self.restaurant.qr_format = 'svg'
+        extension, data = render_qrcode_file(self.restaurant)
+
+        self.assertEqual(extension, 'svg')
+        self.assertLess(len(data), 10 * 1024)
+        root = ElementTree.fromstring(data)
+        self.assertEqual(root.tag, '{http://www.w3.org/2000/svg}svg')
+        self.assertEqual(len(root.findall('{http://www.w3.org/2000/svg}path')), 1)
+        self.assertTrue(root.find('{http://www.w3.org/2000/svg}image').get('href').startswith('data:image/png;base64,'))
+
+    def test_format_change_regenerates_table_files(self):
+        Restaurant.objects.filter(id=self.restaurant.id).update(qr_format='svg')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._action('restaurant', 'regenerate_table_qr_codes', [self.restaurant])
+
+        names = set(Table.objects.values_list('qrcode_image', flat=True))
+        self.assertEqual(len(names), 1)
+        self.assertTrue(names.pop().endswith('.svg'))
+        self.assertEqual(assign_table_qrcodes(self.restaurant.id, replace=True), 0)
+
+    def test_zip_contains_labelled_svgs_for_svg_restaurants(self):
+        Restaurant.objects.filter(id=self.restaurant.id).update(qr_format='svg')
+        response = self._action('table', 'download_qr_codes', self.tables)
+
+        archive = zipfile.ZipFile(BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(sorted(archive.namelist()), [f'qr-diner/table_{n}_qrcode.svg' for n in range(1, 5)])
+        root = ElementTree.fromstring(archive.read('qr-diner/table_2_qrcode.svg'))
+        self.assertEqual(root.find('{http://www.w3.org/2000/svg}text').text, 'Table 2')
@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from menu_dashboard.brand_theme import build_theme, get_brand_theme
+from menu_dashboard.models import BrandColor, Restaurant
+from menu_dashboard.templatetags.color_filters import darken, is_light, lighten, rgb_values
+
+
+class BuildThemeTest(TestCase):
+    def test_matches_template_filters(self):
+        theme = build_theme(1, ['#13a658', '#fff'])
+        primary = theme['primary']
+
+        self.assertEqual(primary['rgb'], rgb_values('#13a658'))
+        self.assertEqual(primary['lighten_20'], lighten('#13a658', 20))
+        self.assertEqual(primary['darken_10'], darken('#13a658', 10))
+        self.assertEqual(primary['light'], is_light('#13a658'))
+        self.assertEqual(theme['secondary']['hex'], '#ffffff')
+        self.assertEqual(theme['secondary']['on_color'], '#111827')
+
+    def test_padded_with_defaults_and_invalid_colours_replaced(self):
+        theme = build_theme(1, ['oops'])
+        self.assertEqual([theme[role]['hex'] for role in ('primary', 'secondary', 'third')],
+                         ['#f7c028', '#000000', '#ffffff'])
+        self.assertIn('--brand-third-rgb: 255, 255, 255;', theme['css'])
+
+
+@override_settings(CARD_BACKGROUND=False)
+class BrandThemeCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        owner = get_user_model().objects.create_user(username='owner', password='testpass123')
+        self.restaurant = Restaurant.objects.create(user=owner, restaurant_name='Palette', hashed_slug='palette-slug')
+
+    def test_rebuilt_when_brand_colours_change(self):
+        old = get_brand_theme(self.restaurant.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            BrandColor.objects.create(restaurant=self.restaurant, color='#123456')
+
+        with self.assertNumQueries(0):
+            theme = get_brand_theme(self.restaurant.id)
+        self.assertEqual(theme['primary']['hex'], '#123456')
+        self.assertNotEqual(theme['css_url'], old['css_url'])
+
+    def test_css_served_with_far_future_caching(self):
+        theme = get_brand_theme(self.restaurant.id)
+
+        response = self.client.get(theme['css_url'])
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('--brand-primary: #f7c028;', response.content.decode())
+
+        stale = reverse('brand_theme_css', args=[self.restaurant.id, 'outdated'])
+        self.assertRedirects(self.client.get(stale), theme['css_url'])
+
+    def test_checkout_does_not_query_brand_colours(self):
+        BrandColor.objects.create(restaurant=self.restaurant, color='#eeeeee')
+        get_brand_theme(self.restaurant.id)
+        self.client.force_login(get_user_model().objects.create_user(username='diner', password='testpass123'))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('restaurant_checkout', args=['palette', 'palette-slug']))
+
+        self.assertEqual(response.context['primary_brand_color'], '#eeeeee')
+        self.assertContains(response, '--primary-rgb: 238, 238, 238;')
+        self.assertFalse([q for q in queries if 'brandcolor' in q['sql']])
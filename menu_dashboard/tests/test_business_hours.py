@@ -0,0 +1,127 @@
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from menu_dashboard.business_hours import compile_business_hours, open_restaurants
+from menu_dashboard.models import OpeningInterval, Restaurant
+
+DAY = 24 * 60
+GIF = b'GIF87a\x01\x00\x01\x00\x80\x01\x00\x00\x00\x00ccc,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;'
+
+
+def at(day, hour, minute=0):
+    # 2026-10-19 is a Monday.
+    return timezone.make_aware(datetime(2026, 10, 19 + day, hour, minute))
+
+
+class CompileBusinessHoursTest(SimpleTestCase):
+    def test_formats_in_use(self):
+        self.assertEqual(compile_business_hours('Everyday.'), [[0, 7 * DAY]])
+        self.assertEqual(compile_business_hours('Monday-Friday'), [[0, 5 * DAY]])
+        self.assertEqual(compile_business_hours('MonTue:0800-1700'), [[480, 1020], [DAY + 480, DAY + 1020]])
+        self.assertEqual(
+            compile_business_hours('Mon-Fri: 9:00-17:00, Sat: 10:00-15:00')[-1],
+            [5 * DAY + 600, 5 * DAY + 900],
+        )
+        self.assertEqual(compile_business_hours('Everyday 8:00 AM - 10:00 pm')[0], [480, 1320])
+
+    def test_whole_day_names_are_not_substring_matches(self):
+        # "thursday" must not also open on "tue" or "sun", nor "monday" on every day.
+        self.assertEqual(compile_business_hours('Thursday: 10:00-12:00'), [[3 * DAY + 600, 3 * DAY + 720]])
+
+    def test_overnight_ranges_wrap_into_next_day_and_week(self):
+        self.assertEqual(compile_business_hours('Fri: 20:00-02:00'), [[4 * DAY + 1200, 5 * DAY + 120]])
+        self.assertEqual(compile_business_hours('Sun: 22:00-01:00'), [[0, 60], [6 * DAY + 1320, 7 * DAY]])
+
+    def test_twelve_hour_ranges_close_in_the_afternoon(self):
+        self.assertEqual(compile_business_hours('Mon, Wed: 9-5'), [[540, 1020], [2 * DAY + 540, 2 * DAY + 1020]])
+        self.assertEqual(compile_business_hours('Mon: 11:30-2:30'), [[690, 870]])
+        # 24-hour and am/pm ranges still run past midnight.
+        self.assertEqual(compile_business_hours('Mon: 20:00-02:00'), [[1200, DAY + 120]])
+        self.assertEqual(compile_business_hours('Mon: 10pm-2am'), [[1320, DAY + 120]])
+
+    def test_equal_twelve_hour_times_span_the_day(self):
+        self.assertEqual(compile_business_hours('Mon: 11-11'), [[660, 1380]])
+        self.assertEqual(compile_business_hours('Mon-Fri 10-10')[-1], [4 * DAY + 600, 4 * DAY + 1320])
+        self.assertEqual(compile_business_hours('00:00-00:00'), [[0, 7 * DAY]])
+
+    def test_closed_days_have_no_hours(self):
+        week = compile_business_hours('Mon-Sat: 9-5')
+        self.assertEqual(compile_business_hours('Mon-Sat: 9-5, Sun: closed'), week)
+        self.assertEqual(compile_business_hours('Mon-Sat: 9-5, Closed on Sunday'), week)
+        self.assertEqual(compile_business_hours('Mon-Sat: 9-5; Sunday off'), week)
+        self.assertEqual(compile_business_hours('Sat, Sun closed'), [])
+
+    def test_days_listed_before_shared_hours(self):
+        self.assertEqual(compile_business_hours('Mon, Wed: 0900-1700'),
+                         [[540, 1020], [2 * DAY + 540, 2 * DAY + 1020]])
+
+    def test_unreadable_hours_raise(self):
+        for text in ('call us', 'Mon: 25:00-26:00'):
+            with self.assertRaises(ValueError):
+                compile_business_hours(text)
+
+
+class RestaurantOpeningHoursTest(TestCase):
+    def _restaurant(self, name, business_hours):
+        owner = get_user_model().objects.create_user(username=name, password='testpass123')
+        return Restaurant.objects.create(
+            user=owner, restaurant_name=name, hashed_slug=f'{name}-slug', business_hours=business_hours,
+            logo_pic=SimpleUploadedFile('logo.gif', GIF, content_type='image/gif'),
+        )
+
+    def test_is_open_uses_compiled_schedule(self):
+        restaurant = self._restaurant('late', 'Fri: 20:00-02:00')
+
+        with self.assertNumQueries(0):
+            self.assertTrue(restaurant.is_open(at(4, 23)))
+            self.assertTrue(restaurant.is_open(at(5, 1, 30)))
+            self.assertFalse(restaurant.is_open(at(5, 2)))
+            self.assertFalse(restaurant.is_open(at(3, 23)))
+
+    def test_unreadable_hours_are_closed(self):
+        restaurant = self._restaurant('vague', 'ask the waiter')
+        self.assertEqual(restaurant.opening_hours, [])
+        self.assertFalse(restaurant.is_open(at(0, 12)))
+
+    def test_open_now_filtered_in_sql(self):
+        self._restaurant('weekdays', 'Mon-Fri: 09:00-17:00')
+        self._restaurant('always', 'Everyday')
+        self._restaurant('nights', 'Everyday 6:00 pm - 2:00 am')
+
+        def names(moment):
+            return set(open_restaurants(Restaurant.objects.all(), moment).values_list('restaurant_name', flat=True))
+
+        self.assertEqual(names(at(0, 10)), {'weekdays', 'always'})
+        self.assertEqual(names(at(5, 1)), {'always', 'nights'})
+
+    def test_schedule_recompiled_when_hours_change(self):
+        restaurant = self._restaurant('changing', 'Mon: 09:00-10:00')
+        restaurant.business_hours = 'Tue: 09:00-10:00'
+        restaurant.save(update_fields=['business_hours'])
+
+        restaurant.refresh_from_db()
+        self.assertEqual(restaurant.opening_hours, [[DAY + 540, DAY + 600]])
+        self.assertEqual(
+            list(OpeningInterval.objects.filter(restaurant=restaurant).values_list('start_minute', 'end_minute')),
+            [(DAY + 540, DAY + 600)],
+        )
+
+    def test_intervals_kept_when_hours_unchanged(self):
+        restaurant = self._restaurant('steady', 'Mon: 09:00-10:00')
+        interval_ids = list(restaurant.opening_intervals.values_list('id', flat=True))
+
+        restaurant.address = 'New address'
+        restaurant.save()
+        self.assertEqual(list(restaurant.opening_intervals.values_list('id', flat=True)), interval_ids)
+
+    def test_store_list_open_now(self):
+        self._restaurant('always', 'Everyday')
+        self._restaurant('never', '')
+
+        response = self.client.get(reverse('restaurant_list'), {'open': 'now'})
+        self.assertEqual([card['name'] for card in response.context['cards']], ['always'])
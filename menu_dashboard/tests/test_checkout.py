@@ -0,0 +1,126 @@
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from menu_dashboard.models import Earnings, OrderProduct, Orders, Product, Restaurant
+
+
+class RestaurantCheckoutPostTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        owner = get_user_model().objects.create_user(username='owner', password='testpass123')
+        self.restaurant = Restaurant.objects.create(
+            user=owner,
+            restaurant_name='Checkout Kitchen',
+            hashed_slug='checkout-slug'
+        )
+        self.products = [
+            Product.objects.create(
+                name=f'Dish {i}',
+                price=Decimal('2.50'),
+                restaurant=self.restaurant
+            )
+            for i in range(15)
+        ]
+        self.customer_user = get_user_model().objects.create_user(username='diner', password='testpass123')
+        self.client.force_login(self.customer_user)
+        self.url = reverse('restaurant_checkout', kwargs={
+            'restaurant_name_slug': self.restaurant.slug,
+            'hashed_slug': 'checkout-slug'
+        })
+
+    def _post(self, cart, **extra):
+        return self.client.post(self.url, {
+            'cart': json.dumps(cart),
+            'payment_method': 'Cash on Delivery',
+        }, **extra)
+
+    def _cart(self, products, qty=2):
+        return {str(product.id): [qty, product.name, str(product.price)] for product in products}
+
+    def test_order_created_with_all_lines(self):
+        response = self._post(self._cart(self.products))
+
+        self.assertEqual(response.status_code, 200)
+        order = Orders.objects.get(id=response.json()['order_id'])
+        self.assertEqual(order.amount, Decimal('75.25'))
+        self.assertEqual(OrderProduct.objects.filter(order=order).count(), 15)
+        self.assertTrue(Earnings.objects.filter(order=order).exists())
+
+    def test_query_count_independent_of_cart_size(self):
+        self._post(self._cart(self.products[:1]))  # creates the Customer row
+
+        with CaptureQueriesContext(connection) as single:
+            self._post(self._cart(self.products[:1]))
+        with CaptureQueriesContext(connection) as full:
+            self._post(self._cart(self.products))
+
+        self.assertEqual(len(single), len(full))
+
+    def test_unavailable_product_rolls_back(self):
+        self.products[3].status = 'Unavailable'
+        self.products[3].save()
+
+        response = self._post(self._cart(self.products))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Orders.objects.exists())
+        self.assertFalse(OrderProduct.objects.exists())
+
+    def test_invalid_quantity_rejected(self):
+        response = self._post(self._cart(self.products[:1], qty=0))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Orders.objects.exists())
+
+    def test_unknown_payment_method_rejected(self):
+        response = self.client.post(self.url, {
+            'cart': json.dumps(self._cart(self.products[:1])),
+            'payment_method': '<img src=x onerror=alert(1)>',
+        })
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Orders.objects.exists())
+
+    def test_retry_with_idempotency_key_replays_original_order(self):
+        cart = self._cart(self.products[:3])
+        first = self._post(cart, HTTP_IDEMPOTENCY_KEY='abc-123')
+
+        with CaptureQueriesContext(connection) as queries:
+            retry = self._post(cart, HTTP_IDEMPOTENCY_KEY='abc-123')
+
+        # Only session/auth lookups; the order write path is skipped entirely
+        self.assertFalse([q for q in queries if 'menu_dashboard_' in q['sql']])
+
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Orders.objects.count(), 1)
+        self.assertEqual(OrderProduct.objects.count(), 3)
+        self.assertEqual(Earnings.objects.count(), 1)
+
+    def test_replay_falls_back_to_database(self):
+        cart = self._cart(self.products[:1])
+        first = self.client.post(self.url, {
+            'cart': json.dumps(cart),
+            'payment_method': 'Cash on Delivery',
+            'idempotency_key': 'form-key',
+        })
+        cache.clear()
+
+        retry = self._post(cart, HTTP_IDEMPOTENCY_KEY='form-key')
+
+        self.assertEqual(retry.json()['order_id'], first.json()['order_id'])
+        self.assertEqual(Orders.objects.count(), 1)
+
+    def test_different_keys_create_separate_orders(self):
+        cart = self._cart(self.products[:1])
+        self._post(cart, HTTP_IDEMPOTENCY_KEY='key-1')
+        self._post(cart, HTTP_IDEMPOTENCY_KEY='key-2')
+
+        self.assertEqual(Orders.objects.count(), 2)
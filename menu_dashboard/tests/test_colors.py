@@ -0,0 +1,39 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase
+
+from menu_dashboard import colors
+from menu_dashboard.templatetags import color_filters, product_extras
+
+
+class ColorFiltersTest(SimpleTestCase):
+    def test_values(self):
+        self.assertEqual(colors.rgb_values('#13a658'), '19, 166, 88')
+        self.assertEqual(colors.rgb_values('fff'), '255, 255, 255')
+        self.assertEqual(colors.lighten('#13a658', 20), '#42b779')
+        self.assertEqual(colors.darken('#13a658', 10), '#11954f')
+        self.assertTrue(colors.is_light('#f7c028'))
+        self.assertFalse(colors.is_light('#000'))
+
+    def test_invalid_colours(self):
+        for value in ('', 'zz', 'abcd', None):
+            self.assertEqual(colors.lighten(value, 10), '')
+            self.assertEqual(colors.rgb_values(value), '')
+            self.assertFalse(colors.is_light(value))
+
+    def test_both_libraries_share_one_implementation(self):
+        for name in ('rgb_values', 'lighten', 'darken', 'is_light'):
+            self.assertIs(color_filters.register.filters[name], getattr(colors, name))
+            self.assertIs(product_extras.register.filters[name], getattr(colors, name))
+
+        rendered = Template(
+            '{% load product_extras %}{{ c|lighten:20 }} {{ c|rgb_values }} {% if c|is_light %}light{% endif %}'
+        ).render(Context({'c': '#13a658'}))
+        self.assertEqual(rendered, '#42b779 19, 166, 88 light')
+
+    def test_benchmark_command_runs(self):
+        out = StringIO()
+        call_command('benchmark_color_filters', products=5, renders=2, stdout=out)
+        self.assertIn('25 filter calls per render', out.getvalue())
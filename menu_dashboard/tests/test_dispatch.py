@@ -0,0 +1,140 @@
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from menu_dashboard.dispatch import (
+    ASSIGNED, NO_RIDERS_AVAILABLE, assign_pending_requests, claim_nearest_rider, claim_riders,
+    release_riders, _claim_nearest,
+)
+from menu_dashboard.geo import geohash_encode, geohash_neighbourhood, haversine_km
+from menu_dashboard.models import DeliveryRequest, Orders, Restaurant, Rider
+
+
+class DispatchTest(TestCase):
+    def _riders(self, count):
+        return [
+            Rider.objects.create(user=get_user_model().objects.create_user(username=f'rider{i}'), mobile='1')
+            for i in range(count)
+        ]
+
+    def test_claim_marks_riders_busy(self):
+        riders = self._riders(3)
+
+        claimed = claim_riders(2)
+
+        self.assertEqual(claimed, [riders[0].id, riders[1].id])
+        self.assertEqual(list(Rider.objects.filter(is_available=True)), [riders[2]])
+        self.assertEqual(claim_riders(5), [riders[2].id])
+        self.assertEqual(claim_riders(1), [])
+
+    def test_release_returns_riders_to_pool(self):
+        riders = self._riders(1)
+        claim_riders(1)
+        release_riders([riders[0].id])
+        self.assertEqual(claim_riders(1), [riders[0].id])
+
+    def test_submit_delivery_request_claims_one_rider_in_one_statement(self):
+        riders = self._riders(2)
+        order = Orders.objects.create()
+
+        with self.assertNumQueries(4):  # savepoint, claim, insert, release savepoint
+            delivery_request = order.submit_delivery_request()
+
+        self.assertEqual(delivery_request.status, ASSIGNED)
+        self.assertEqual(delivery_request.rider_id, riders[0].id)
+        self.assertFalse(Rider.objects.get(id=riders[0].id).is_available)
+        self.assertTrue(Rider.objects.get(id=riders[1].id).is_available)
+
+    def test_submit_without_riders(self):
+        delivery_request = Orders.objects.create().submit_delivery_request()
+        self.assertEqual(delivery_request.status, NO_RIDERS_AVAILABLE)
+        self.assertIsNone(delivery_request.rider_id)
+
+    def test_batch_assigns_oldest_requests_first(self):
+        riders = self._riders(2)
+        requests = [DeliveryRequest.objects.create(order=Orders.objects.create()) for _ in range(3)]
+
+        self.assertEqual(assign_pending_requests(), 2)
+
+        requests = [DeliveryRequest.objects.get(id=r.id) for r in requests]
+        self.assertEqual([r.rider_id for r in requests], [riders[0].id, riders[1].id, None])
+        self.assertEqual([r.status for r in requests], [ASSIGNED, ASSIGNED, 'Pending'])
+        self.assertEqual(assign_pending_requests(), 0)
+
+        release_riders([riders[0].id])
+        self.assertEqual(assign_pending_requests(), 1)
+        self.assertEqual(DeliveryRequest.objects.get(id=requests[2].id).rider_id, riders[0].id)
+
+
+class GeoTest(SimpleTestCase):
+    def test_geohash_encode(self):
+        self.assertEqual(geohash_encode(42.6, -5.6, 5), 'ezs42')
+
+    def test_neighbourhood_has_nine_distinct_cells(self):
+        cells = geohash_neighbourhood(6.3, -10.8, 6)
+        self.assertEqual(len(cells), 9)
+        self.assertEqual(cells[0], geohash_encode(6.3, -10.8, 6))
+
+    def test_haversine(self):
+        self.assertAlmostEqual(haversine_km(0, 0, 0, 1), 111.19, places=1)
+
+
+class ProximityDispatchTest(TestCase):
+    def _rider(self, name, latitude=None, longitude=None):
+        rider = Rider.objects.create(user=get_user_model().objects.create_user(username=name), mobile='1')
+        if latitude is not None:
+            rider.update_position(latitude, longitude)
+        return rider
+
+    def test_geohash_follows_position_updates(self):
+        rider = self._rider('mover', 6.30000, -10.80000)
+        self.assertEqual(Rider.objects.get(id=rider.id).geohash, geohash_encode(6.3, -10.8, 9))
+        rider.update_position(6.4, -10.7)
+        self.assertEqual(Rider.objects.get(id=rider.id).geohash, geohash_encode(6.4, -10.7, 9))
+
+    def test_nearest_rider_is_claimed(self):
+        self._rider('far', 6.40000, -10.70000)
+        near = self._rider('near', 6.30100, -10.80100)
+        self._rider('unknown')
+
+        self.assertEqual(claim_nearest_rider(6.3, -10.8), near.id)
+        self.assertFalse(Rider.objects.get(id=near.id).is_available)
+
+    def test_rider_taken_meanwhile_is_skipped(self):
+        near = self._rider('near', 6.30100, -10.80100)
+        nearer = self._rider('nearer', 6.30010, -10.80010)
+        Rider.objects.filter(id=nearer.id).update(is_available=False)
+
+        self.assertEqual(_claim_nearest([nearer.id, near.id]), near.id)
+        self.assertIsNone(_claim_nearest([nearer.id, near.id]))
+
+    def test_falls_back_to_any_free_rider(self):
+        unknown = self._rider('unknown')
+        self.assertEqual(claim_nearest_rider(6.3, -10.8), unknown.id)
+        self.assertIsNone(claim_nearest_rider(6.3, -10.8))
+
+    def test_orders_go_to_the_rider_nearest_their_restaurant(self):
+        owner = get_user_model().objects.create_user(username='owner')
+        restaurant = Restaurant.objects.create(user=owner, restaurant_name='Geo', hashed_slug='geo-slug', latitude=6.3, longitude=-10.8)
+        near = self._rider('near', 6.30200, -10.80200)
+        self._rider('far', 6.50000, -10.50000)
+
+        self.assertEqual(Orders.objects.create(restaurant=restaurant).submit_delivery_request().rider_id, near.id)
+
+        pending = DeliveryRequest.objects.create(order=Orders.objects.create(restaurant=restaurant))
+        self.assertEqual(assign_pending_requests(), 1)
+        self.assertNotEqual(DeliveryRequest.objects.get(id=pending.id).rider_id, near.id)
+
+    def test_location_endpoint(self):
+        rider = self._rider('reporter')
+        self.client.force_login(rider.user)
+        url = reverse('update_rider_location')
+
+        response = self.client.post(url, {'latitude': '6.3', 'longitude': '-10.8'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Rider.objects.get(id=rider.id).geohash, geohash_encode(6.3, -10.8, 9))
+        self.assertEqual(self.client.post(url, {'latitude': '91', 'longitude': '0'}).status_code, 400)
+
+        self.client.force_login(get_user_model().objects.create_user(username='diner'))
+        self.assertEqual(self.client.post(url, {'latitude': '6', 'longitude': '-10'}).status_code, 403)
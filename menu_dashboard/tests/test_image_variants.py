@@ -0,0 +1,130 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from menu_dashboard.image_variants import needs_variants
+from menu_dashboard.models import Product, Restaurant
+
+
+def jpeg_upload(name='dish.jpg', size=(1000, 600)):
+    output = BytesIO()
+    Image.new('RGB', size, (200, 80, 40)).save(output, format='JPEG')
+    return SimpleUploadedFile(name, output.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(IMAGE_VARIANT_BACKGROUND=False, MENU_VISIT_BACKGROUND=False)
+class ImageVariantTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+        owner = get_user_model().objects.create_user(username='owner', password='testpass123')
+        self.restaurant = Restaurant.objects.create(
+            user=owner,
+            restaurant_name='Variant Grill',
+            hashed_slug='variant-slug',
+            logo_pic=SimpleUploadedFile(
+                name='variant_logo.gif',
+                content=b'GIF87a\x01\x00\x01\x00\x80\x01\x00\x00\x00\x00ccc,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;',
+                content_type='image/gif'
+            )
+        )
+
+    def _create_product(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Product.objects.create(
+                name='Burger', price=5, restaurant=self.restaurant, product_image=jpeg_upload(), **kwargs
+            )
+
+    def test_upload_renders_variants(self):
+        product = Product.objects.get(id=self._create_product().id)
+
+        variants = product.image_variants
+        self.assertEqual(variants['source'], product.product_image.name)
+        # resize_image caps uploads at 800px, so the 480px short side bounds the widths
+        self.assertEqual(variants['widths'], [400, 480])
+        self.assertIn('webp', variants['formats'])
+        self.assertIn('jpeg', variants['formats'])
+        for width, url in variants['formats']['webp']:
+            name = url[len('/media/'):]
+            self.assertTrue(default_storage.exists(name))
+            with default_storage.open(name) as variant, Image.open(variant) as image:
+                self.assertEqual(image.size, (width, width))
+                self.assertEqual(image.format, 'WEBP')
+        self.assertFalse(needs_variants(product))
+
+    def test_saving_other_fields_does_not_rerender(self):
+        product = Product.objects.get(id=self._create_product().id)
+
+        with mock.patch('menu_dashboard.image_variants.render_variants') as render:
+            with self.captureOnCommitCallbacks(execute=True):
+                product.price = 7
+                product.save()
+        render.assert_not_called()
+
+    def test_menu_uses_precomputed_srcset(self):
+        product = Product.objects.get(id=self._create_product().id)
+        url = reverse('restaurant_menu', kwargs={
+            'restaurant_name_slug': self.restaurant.slug,
+            'hashed_slug': 'variant-slug'
+        })
+
+        with mock.patch('sorl.thumbnail.default.kvstore.get') as kv_get:
+            response = self.client.get(url)
+
+        kv_get.assert_not_called()
+        webp_url = product.image_variants['formats']['webp'][0][1]
+        self.assertContains(response, f'{webp_url} 400w')
+        self.assertContains(response, 'type="image/webp"')
+
+
+@override_settings(IMAGE_VARIANT_BACKGROUND=False)
+class ProductImageResizeTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+    def test_large_upload_is_scaled_down_with_draft(self):
+        with mock.patch('PIL.JpegImagePlugin.JpegImageFile.draft', autospec=True,
+                        side_effect=Image.Image.draft) as draft:
+            product = Product.objects.create(name='Big', product_image=jpeg_upload(size=(3200, 2400)))
+        draft.assert_called_once()
+
+        with default_storage.open(product.product_image.name) as image_file, Image.open(image_file) as image:
+            self.assertEqual(image.size, (800, 600))
+
+    def test_small_upload_is_stored_untouched(self):
+        upload = jpeg_upload(size=(300, 200))
+        original = upload.read()
+        product = Product.objects.create(name='Small', product_image=upload)
+
+        with default_storage.open(product.product_image.name) as image_file:
+            self.assertEqual(image_file.read(), original)
+
+    def test_saving_without_new_upload_skips_image_work(self):
+        product = Product.objects.create(name='Edit me', product_image=jpeg_upload())
+        product = Product.objects.get(id=product.id)
+
+        with mock.patch('menu_dashboard.models.resize_to_fit') as resize, \
+                mock.patch('PIL.Image.open') as image_open:
+            product.price = 9
+            product.save()
+
+        resize.assert_not_called()
+        image_open.assert_not_called()
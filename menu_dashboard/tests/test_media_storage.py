@@ -0,0 +1,78 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from menu_dashboard.models import Product
+from menu_dashboard.storage import ContentAddressedStorage, content_addressed_storage
+from menu_dashboard.tests.test_image_variants import jpeg_upload
+
+
+@override_settings(IMAGE_VARIANT_BACKGROUND=False)
+class ContentAddressedStorageTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+    def _files(self, directory):
+        subdirectories, files = content_addressed_storage.listdir(directory)
+        names = [f'{directory}/{name}' for name in files]
+        for subdirectory in subdirectories:
+            if subdirectory != 'variants':
+                names += self._files(f'{directory}/{subdirectory}')
+        return names
+
+    def test_identical_uploads_share_one_file(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            fries = Product.objects.create(name='Fries', product_image=jpeg_upload('fries.jpg'))
+            chips = Product.objects.create(name='Chips', product_image=jpeg_upload('IMG_0001.JPG'))
+            soda = Product.objects.create(name='Soda', product_image=jpeg_upload('soda.jpg', size=(500, 500)))
+
+        self.assertEqual(fries.product_image.name, chips.product_image.name)
+        self.assertNotEqual(fries.product_image.name, soda.product_image.name)
+        self.assertTrue(ContentAddressedStorage.is_content_name(fries.product_image.name))
+        self.assertTrue(fries.product_image.name.endswith('.jpg'))
+        self.assertEqual(len(self._files('product_image')), 2)
+        # Shared blobs also share their rendered variants.
+        self.assertEqual(
+            Product.objects.get(id=fries.id).image_variants['formats'],
+            Product.objects.get(id=chips.id).image_variants['formats'],
+        )
+
+    def test_gc_removes_only_unreferenced_blobs(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            fries = Product.objects.create(name='Fries', product_image=jpeg_upload('fries.jpg'))
+            Product.objects.create(name='Chips', product_image=jpeg_upload('chips.jpg'))
+            burger = Product.objects.create(name='Burger', product_image=jpeg_upload('burger.jpg', size=(500, 500)))
+        old_name = burger.product_image.name
+        old_digest = Product.objects.get(id=burger.id).image_variants['digest']
+        with self.captureOnCommitCallbacks(execute=True):
+            burger.product_image = jpeg_upload('burger2.jpg', size=(600, 500))
+            burger.save()
+        fries.delete()
+
+        out = StringIO()
+        call_command('gc_media', grace_minutes=0, dry_run=True, stdout=out)
+        self.assertIn(f'Would delete {old_name}', out.getvalue())
+        self.assertTrue(content_addressed_storage.exists(old_name))
+
+        call_command('gc_media', grace_minutes=0, stdout=StringIO())
+
+        self.assertFalse(content_addressed_storage.exists(old_name))
+        self.assertEqual(content_addressed_storage.listdir(f'product_image/variants/{old_digest}'), ([], []))
+        remaining = set(Product.objects.values_list('product_image', flat=True))
+        self.assertEqual(set(self._files('product_image')), remaining)
+
+    def test_gc_grace_period_keeps_fresh_files(self):
+        product = Product.objects.create(name='Fresh', product_image=jpeg_upload())
+        name = product.product_image.name
+        product.delete()
+
+        call_command('gc_media', stdout=StringIO())
+
+        self.assertTrue(content_addressed_storage.exists(name))
@@ -0,0 +1,91 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from menu_dashboard.menu_snapshot import get_menu_snapshot
+from menu_dashboard.models import BrandColor, Category, Product, ProductVariation, Restaurant
+from menu_dashboard.restaurant_cache import get_restaurant_version
+
+
+class MenuSnapshotTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username='snapshotuser',
+            password='testpass123'
+        )
+        self.restaurant = Restaurant.objects.create(
+            user=self.user,
+            restaurant_name='Snapshot Grill',
+            hashed_slug='snap-slug'
+        )
+        self.category = Category.objects.create(name='Mains', order=1)
+        self.wings = Product.objects.create(
+            name='Hot Wings',
+            price=Decimal('10.00'),
+            restaurant=self.restaurant,
+            category=self.category,
+            charge_gst=True
+        )
+        self.pizza = Product.objects.create(
+            name='Pizza',
+            price=Decimal('20.00'),
+            restaurant=self.restaurant,
+            category=self.category
+        )
+        ProductVariation.objects.create(product=self.pizza, name='S', price=Decimal('12.00'))
+        ProductVariation.objects.create(product=self.pizza, name='L', price=Decimal('18.00'))
+        self.side = Product.objects.create(
+            name='Fries',
+            price=Decimal('4.00'),
+            restaurant=self.restaurant
+        )
+        BrandColor.objects.create(restaurant=self.restaurant, color='#123456')
+
+    def _products(self, snapshot):
+        return {
+            product['name']: product
+            for section in snapshot['sections']
+            for product in section
+        }
+
+    def test_snapshot_structure(self):
+        snapshot = get_menu_snapshot(self.restaurant, weekday=0)
+
+        self.assertEqual([c['name'] for c in snapshot['categories']], ['Mains'])
+        self.assertEqual(len(snapshot['sections']), 2)  # Mains + uncategorized
+        self.assertEqual(snapshot['brand_colors'], ['#123456'])
+
+        products = self._products(snapshot)
+        self.assertEqual(products['Pizza']['price_label'], '12.00')
+        self.assertEqual([v['name'] for v in products['Pizza']['variations_list']], ['L', 'S'])
+        self.assertEqual(products['Hot Wings']['price_label'], '$10.00')
+        self.assertEqual(products['Hot Wings']['gst_note'], '12% GST will be added')
+        self.assertIsNone(products['Fries']['variations_list'])
+        self.assertFalse(products['Hot Wings']['is_discounted'])
+
+    def test_wednesday_wings_discount(self):
+        products = self._products(get_menu_snapshot(self.restaurant, weekday=2))
+
+        self.assertTrue(products['Hot Wings']['is_discounted'])
+        self.assertEqual(products['Hot Wings']['display_price'], '5.00')
+        self.assertFalse(products['Pizza']['is_discounted'])
+
+    def test_cached_snapshot_uses_no_queries(self):
+        get_menu_snapshot(self.restaurant, weekday=0)
+
+        with self.assertNumQueries(0):
+            get_menu_snapshot(self.restaurant, weekday=0)
+
+    def test_snapshot_invalidated_on_change(self):
+        get_menu_snapshot(self.restaurant, weekday=0)
+        version = get_restaurant_version(self.restaurant.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.side.name = 'Cheesy Fries'
+            self.side.save()
+
+        self.assertGreater(get_restaurant_version(self.restaurant.id), version)
+        self.assertIn('Cheesy Fries', self._products(get_menu_snapshot(self.restaurant, weekday=0)))
@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from menu_dashboard.geo import bounding_box, haversine_km
+from menu_dashboard.models import Restaurant
+from menu_dashboard.nearby import nearby_restaurants
+
+
+class BoundingBoxTest(SimpleTestCase):
+    def test_box_encloses_the_circle(self):
+        (min_lat, max_lat), [(min_lon, max_lon)] = bounding_box(6.3, -10.8, 10)
+        self.assertAlmostEqual(haversine_km(6.3, -10.8, max_lat, -10.8), 10, places=3)
+        self.assertAlmostEqual(haversine_km(6.3, -10.8, 6.3, max_lon), 10, delta=0.01)
+        self.assertLess(min_lat, 6.3)
+        self.assertLess(min_lon, -10.8)
+
+    def test_antimeridian_splits_longitudes(self):
+        _, lon_ranges = bounding_box(0, 179.95, 20)
+        self.assertEqual(len(lon_ranges), 2)
+        self.assertEqual(lon_ranges[0][1], 180.0)
+        self.assertEqual(lon_ranges[1][0], -180.0)
+
+    def test_pole_takes_every_longitude(self):
+        self.assertEqual(bounding_box(89.99, 0, 50)[1], [(-180.0, 180.0)])
+
+
+class NearbyRestaurantsTest(TestCase):
+    def _restaurant(self, name, latitude, longitude, business_hours='Everyday'):
+        owner = get_user_model().objects.create(username=name, email=f'{name}@example.com')
+        return Restaurant.objects.create(
+            user=owner, restaurant_name=name, hashed_slug=f'{name}-slug',
+            latitude=latitude, longitude=longitude, business_hours=business_hours,
+        )
+
+    def setUp(self):
+        # Monrovia, with one venue out of town and one closed.
+        self._restaurant('near', 6.3005, -10.8005)
+        self._restaurant('closer', 6.3001, -10.8001)
+        self._restaurant('town', 6.35, -10.75)
+        self._restaurant('closed', 6.3002, -10.8002, business_hours='')
+        self._restaurant('far', 7.0, -9.0)
+        self._restaurant('unknown', None, None)
+
+    def test_nearest_open_first_with_distance(self):
+        cards = nearby_restaurants(6.3, -10.8, limit=3)
+        self.assertEqual([card['name'] for card in cards], ['closer', 'near', 'town'])
+        self.assertTrue(all(card['open'] for card in cards))
+        self.assertLess(cards[0]['distance_km'], cards[1]['distance_km'])
+
+    def test_radius_widens_until_enough_are_found(self):
+        names = [card['name'] for card in nearby_restaurants(6.3, -10.8, limit=10, open_now=False)]
+        self.assertEqual(names, ['closer', 'closed', 'near', 'town', 'far'])
+
+    def test_endpoint(self):
+        url = reverse('restaurants_nearby')
+        response = self.client.get(url, {'latitude': '6.3', 'longitude': '-10.8', 'limit': '1'})
+        self.assertEqual([card['name'] for card in response.json()['cards']], ['closer'])
+
+        response = self.client.get(url, {'latitude': '6.3', 'longitude': '-10.8', 'limit': '2', 'open': 'any'})
+        self.assertEqual([card['name'] for card in response.json()['cards']], ['closer', 'closed'])
+
+        self.assertEqual(self.client.get(url, {'latitude': '91', 'longitude': '0'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'latitude': '6.3'}).status_code, 400)
@@ -0,0 +1,80 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from menu_dashboard.context_processors import get_active_notification
+from menu_dashboard.models import Notification, Restaurant
+from menu_dashboard.notification_index import notification_index
+
+
+class ActiveNotificationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        notification_index.invalidate()
+        self.factory = RequestFactory()
+        self.owner = get_user_model().objects.create_user(username='owner', password='testpass123')
+        self.other_owner = get_user_model().objects.create_user(username='other', password='testpass123')
+        self.restaurant = Restaurant.objects.create(user=self.owner, restaurant_name='Notified', hashed_slug='n-slug')
+        Restaurant.objects.create(user=self.other_owner, restaurant_name='Other', hashed_slug='o-slug')
+        self.now = timezone.now()
+
+    def _notify(self, title, restaurants=(), **kwargs):
+        kwargs.setdefault('start_date', self.now - timedelta(hours=1))
+        kwargs.setdefault('end_date', self.now + timedelta(hours=1))
+        with self.captureOnCommitCallbacks(execute=True):
+            notification = Notification.objects.create(title=title, message=title, **kwargs)
+            notification.restaurants.set(restaurants)
+        return notification
+
+    def _active(self, user=None, cookies=None):
+        request = self.factory.get('/')
+        request.user = user or AnonymousUser()
+        request.COOKIES.update(cookies or {})
+        return get_active_notification(request)['notification']
+
+    def test_render_costs_no_queries_once_indexed(self):
+        notification = self._notify('Global', send_to_all=True)
+        self._active()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self._active(), notification)
+            self.assertEqual(self._active(self.owner), notification)
+
+    def test_targeted_notification_only_reaches_its_restaurant(self):
+        self._notify('Global', send_to_all=True, start_date=self.now - timedelta(hours=2))
+        targeted = self._notify('Targeted', restaurants=[self.restaurant])
+
+        self.assertEqual(self._active(self.owner), targeted)
+        self.assertEqual(self._active(self.other_owner).title, 'Global')
+        self.assertEqual(self._active().title, 'Global')
+
+    def test_index_refreshed_on_save(self):
+        notification = self._notify('Before', send_to_all=True)
+        self.assertEqual(self._active().title, 'Before')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notification.is_active = False
+            notification.save()
+        self.assertIsNone(self._active())
+
+    def test_window_boundaries_without_reload(self):
+        self._notify('Later', send_to_all=True,
+                     start_date=self.now + timedelta(hours=1), end_date=self.now + timedelta(hours=2))
+        self.assertIsNone(self._active())
+
+        with mock.patch('django.utils.timezone.now', return_value=self.now + timedelta(minutes=90)):
+            with self.assertNumQueries(0):
+                self.assertEqual(self._active().title, 'Later')
+        with mock.patch('django.utils.timezone.now', return_value=self.now + timedelta(hours=3)):
+            with self.assertNumQueries(0):
+                self.assertIsNone(self._active())
+
+    def test_dismissed_notification_hidden(self):
+        notification = self._notify('Dismissable', send_to_all=True)
+
+        self.assertIsNone(self._active(cookies={f'notification_{notification.id}_closed': '1'}))
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import threading
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from menu_dashboard.models import Orders, Restaurant
+from menu_dashboard.order_events import OrderEventBroker, order_broker, order_event_stream
+
+
+class OrderEventBrokerTest(SimpleTestCase):
+    def test_publish_from_another_thread_reaches_subscriber(self):
+        broker = OrderEventBroker()
+
+        async def scenario():
+            queue, _ = broker.subscribe(7)
+            worker = threading.Thread(target=broker.publish, args=(7, 'order.created', {'order_id': 1}))
+            worker.start()
+            event = await asyncio.wait_for(queue.get(), timeout=1)
+            worker.join()
+            return event
+
+        event = asyncio.run(scenario())
+        self.assertEqual(event['event'], 'order.created')
+        self.assertEqual(event['data'], {'order_id': 1})
+
+    def test_events_are_scoped_to_restaurant(self):
+        broker = OrderEventBroker()
+
+        async def scenario():
+            broker.subscribe(1)
+            return broker.publish(2, 'order.created', {})
+
+        self.assertEqual(asyncio.run(scenario()), 0)
+
+    def test_slow_subscriber_drops_oldest_event(self):
+        broker = OrderEventBroker(queue_size=1)
+
+        async def scenario():
+            queue, _ = broker.subscribe(1)
+            broker.publish(1, 'order.created', {'order_id': 1})
+            broker.publish(1, 'order.created', {'order_id': 2})
+            await asyncio.sleep(0)
+            return queue.get_nowait()
+
+        self.assertEqual(asyncio.run(scenario())['data'], {'order_id': 2})
+
+    def test_stream_formats_events_and_keepalives(self):
+        async def scenario():
+            stream = order_event_stream(3, keepalive=0.01)
+            frames = [await stream.__anext__()]
+            frames.append(await stream.__anext__())
+            order_broker.publish(3, 'order.updated', {'order_id': 9, 'status': 'Cooking'})
+            frames.append(await stream.__anext__())
+            await stream.aclose()
+            return frames
+
+        retry, keepalive, event = asyncio.run(scenario())
+        self.assertEqual(retry, "retry: 5000\n\n")
+        self.assertEqual(keepalive, ": keepalive\n\n")
+        self.assertIn("event: order.updated\n", event)
+        self.assertEqual(json.loads(event.split('data: ')[1]), {'order_id': 9, 'status': 'Cooking'})
+        self.assertEqual(order_broker.subscriber_count(3), 0)
+
+
+class OrderFeedTest(TestCase):
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user(username='kitchen', password='testpass123')
+        self.restaurant = Restaurant.objects.create(
+            user=self.owner,
+            restaurant_name='Feed Bistro',
+            hashed_slug='feed-slug'
+        )
+
+    def test_order_save_publishes_after_commit(self):
+        published = []
+        original = order_broker.publish
+        order_broker.publish = lambda *args: published.append(args)
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                order = Orders.objects.create(restaurant=self.restaurant, amount=10)
+            with self.captureOnCommitCallbacks(execute=True):
+                order.status = 'Cooking'
+                order.save()
+        finally:
+            order_broker.publish = original
+
+        self.assertEqual([(p[0], p[1]) for p in published], [
+            (self.restaurant.id, 'order.created'),
+            (self.restaurant.id, 'order.updated'),
+        ])
+        self.assertEqual(published[1][2]['status'], 'Cooking')
+
+    def test_stream_requires_restaurant_account(self):
+        url = reverse('restaurant_order_stream')
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+        diner = get_user_model().objects.create_user(username='diner', password='testpass123')
+        self.client.force_login(diner)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    async def test_stream_served_under_asgi(self):
+        await self.async_client.aforce_login(self.owner)
+        response = await self.async_client.get(reverse('restaurant_order_stream'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        await response.streaming_content.aclose()
+
+    def test_stream_refused_under_wsgi(self):
+        self.client.force_login(self.owner)
+        self.assertEqual(self.client.get(reverse('restaurant_order_stream')).status_code, 503)
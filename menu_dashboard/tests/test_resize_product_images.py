@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from menu_dashboard.image_resize import image_dimensions
+from menu_dashboard.models import Product
+
+
+def jpeg_bytes(size):
+    output = BytesIO()
+    Image.new('RGB', size, (30, 120, 200)).save(output, format='JPEG')
+    return output.getvalue()
+
+
+@override_settings(IMAGE_VARIANT_BACKGROUND=False)
+class ResizeProductImagesCommandTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.checkpoint = os.path.join(self.media_root, 'resize.checkpoint')
+
+        # Written straight to storage so Product.save() does not shrink them first.
+        self.large = self._product('large', (2000, 1200))
+        self.small = self._product('small', (300, 200))
+
+    def _product(self, name, size):
+        product = Product.objects.create(name=name)
+        image_name = default_storage.save(f'product_image/{name}.jpg', ContentFile(jpeg_bytes(size)))
+        Product.objects.filter(pk=product.pk).update(product_image=image_name)
+        return product
+
+    def _call(self, **options):
+        out = StringIO()
+        call_command('resize_product_images', checkpoint=self.checkpoint, stdout=out, stderr=StringIO(), **options)
+        return out.getvalue()
+
+    def _size(self, product):
+        product.refresh_from_db()
+        with default_storage.open(product.product_image.name) as image_file:
+            return image_dimensions(image_file)
+
+    def test_resizes_large_images_and_skips_small_ones(self):
+        output = self._call(workers=1)
+
+        self.assertIn('skipped: 1, resized: 1', output)
+        self.assertEqual(self._size(self.large), (800, 480))
+        self.assertEqual(self._size(self.small), (300, 200))
+        self.assertFalse(default_storage.exists('product_image/large.jpg'))
+
+    def test_checkpoint_resumes(self):
+        self._call(workers=1)
+        self.assertIn('Checking 0 product images (2 already done)', self._call(workers=1))
+        self.assertIn('Checking 2 product images', self._call(workers=1, restart=True))
+
+    def test_dry_run_changes_nothing(self):
+        output = self._call(workers=1, dry_run=True)
+
+        self.assertIn('Would resize product_image/large.jpg', output)
+        self.assertEqual(self._size(self.large), (2000, 1200))
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_worker_pool(self):
+        self._call(workers=2)
+        self.assertEqual(self._size(self.large), (800, 480))
@@ -0,0 +1,46 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from menu_dashboard.restaurant_cache import (
+    bump_restaurant_version,
+    get_or_build,
+    get_restaurant_version,
+)
+
+
+class RestaurantCacheTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_builds_once_per_version(self):
+        builder = mock.Mock(side_effect=['first', 'second'])
+
+        self.assertEqual(get_or_build(1, 'entry', builder), 'first')
+        self.assertEqual(get_or_build(1, 'entry', builder), 'first')
+        self.assertEqual(builder.call_count, 1)
+
+        bump_restaurant_version(1)
+        self.assertEqual(get_or_build(1, 'entry', builder), 'second')
+        self.assertEqual(builder.call_count, 2)
+
+    def test_versions_are_per_restaurant(self):
+        other = get_restaurant_version(2)
+        bump_restaurant_version(1)
+        self.assertEqual(get_restaurant_version(2), other)
+
+    def test_serves_stale_value_while_rebuild_is_locked(self):
+        get_or_build(1, 'entry', lambda: 'stale')
+        bump_restaurant_version(1)
+        cache.add('entry_rebuild_lock', 1, 30)  # another worker is rebuilding
+
+        builder = mock.Mock(return_value='fresh')
+        self.assertEqual(get_or_build(1, 'entry', builder), 'stale')
+        builder.assert_not_called()
+
+    def test_version_recovers_after_eviction(self):
+        get_or_build(1, 'entry', lambda: 'old')
+        cache.delete('restaurant_1_version')
+
+        self.assertEqual(get_or_build(1, 'entry', lambda: 'new'), 'new')
@@ -0,0 +1,104 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from menu_dashboard.models import BrandColor, Restaurant
+from menu_dashboard.restaurant_cards import CARD_PAGE_SIZE, DEFAULT_CARD_COLOUR, card_page
+
+
+def png_logo(size=900):
+    output = BytesIO()
+    Image.new('RGBA', (size, size), (10, 120, 200, 255)).save(output, format='PNG')
+    return SimpleUploadedFile('logo.png', output.getvalue(), content_type='image/png')
+
+
+@override_settings(CARD_BACKGROUND=False, IMAGE_VARIANT_BACKGROUND=False, QR_BACKGROUND=False)
+class RestaurantCardTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+    def _restaurant(self, n, **kwargs):
+        owner = get_user_model().objects.create(username=f'owner{n}', email=f'owner{n}@example.com')
+        kwargs.setdefault('logo_pic', png_logo(64))
+        with self.captureOnCommitCallbacks(execute=True):
+            return Restaurant.objects.create(
+                user=owner, restaurant_name=f'Venue {n}', hashed_slug=f'venue-{n}', **kwargs
+            )
+
+    def test_card_built_after_commit_with_thumbnail_and_colour(self):
+        restaurant = self._restaurant(1, logo_pic=png_logo(), business_hours='Everyday')
+        restaurant.refresh_from_db()
+        card = restaurant.card_data
+
+        self.assertEqual(card['name'], 'Venue 1')
+        self.assertEqual(card['url'], reverse('restaurant_menu', args=['venue-1', 'venue-1']))
+        self.assertEqual(card['colour'], DEFAULT_CARD_COLOUR)
+        self.assertIn('/variants/', card['logo'])
+        self.assertTrue(card['logo'].endswith('-400.webp'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BrandColor.objects.create(restaurant=restaurant, color='#123456')
+        restaurant.refresh_from_db()
+        self.assertEqual(restaurant.card_data['colour'], '#123456')
+        self.assertEqual(restaurant.card_data['logo'], card['logo'])
+
+    def test_rebuild_command_backfills_missing_cards(self):
+        restaurant = self._restaurant(1)
+        built = self._restaurant(2)
+        Restaurant.objects.filter(pk=restaurant.pk).update(card_data={})
+
+        out = StringIO()
+        call_command('rebuild_restaurant_cards', workers=1, stdout=out)
+        self.assertIn('cards for 1 restaurants', out.getvalue())
+        restaurant.refresh_from_db()
+        self.assertEqual(restaurant.card_data['name'], 'Venue 1')
+
+        call_command('rebuild_restaurant_cards', workers=1, force=True, stdout=out)
+        self.assertIn("cards for 2 restaurants", out.getvalue())
+        self.assertEqual(Restaurant.objects.get(pk=built.pk).card_data['name'], 'Venue 2')
+
+    def test_keyset_pages_cover_every_restaurant_once(self):
+        ids = [self._restaurant(n).id for n in range(5)]
+
+        seen, cursor = [], None
+        while True:
+            with self.assertNumQueries(1):
+                cards, cursor = card_page(cursor, limit=2)
+            seen.extend(card['id'] for card in cards)
+            if cursor is None:
+                break
+        self.assertEqual(seen, ids)
+
+    def test_open_now_flag_and_filter(self):
+        self._restaurant(1, business_hours='Everyday')
+        self._restaurant(2, business_hours='')
+
+        self.assertEqual([card['open'] for card in card_page()[0]], [True, False])
+        self.assertEqual([card['name'] for card in card_page(open_now=True)[0]], ['Venue 1'])
+
+    def test_cards_endpoint_scrolls_through_pages(self):
+        for n in range(CARD_PAGE_SIZE + 1):
+            self._restaurant(n)
+
+        first = self.client.get(reverse('restaurant_list'))
+        self.assertEqual(len(first.context['cards']), CARD_PAGE_SIZE)
+        self.assertContains(first, 'id="loadMoreCards"')
+
+        page = self.client.get(first.context['next_cards_url']).json()
+        self.assertEqual([card['name'] for card in page['cards']], [f'Venue {CARD_PAGE_SIZE}'])
+        self.assertIsNone(page['next'])
+        self.assertEqual(set(page['cards'][0]), {
+            'id', 'name', 'slug', 'url', 'logo', 'logo_source', 'logo_digest',
+            'colour', 'address', 'hours', 'mobile', 'open',
+        })
@@ -0,0 +1,83 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from menu_dashboard.models import Product, Restaurant, SearchEntry
+from menu_dashboard.search import search_restaurants
+
+GIF = b'GIF87a\x01\x00\x01\x00\x80\x01\x00\x00\x00\x00ccc,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;'
+
+
+@override_settings(IMAGE_VARIANT_BACKGROUND=False)
+class RestaurantSearchTest(TestCase):
+    def _restaurant(self, name, address=''):
+        owner = get_user_model().objects.create_user(username=name, password='testpass123')
+        return Restaurant.objects.create(
+            user=owner, restaurant_name=name, hashed_slug=f'{name}-slug', address=address,
+            logo_pic=SimpleUploadedFile('logo.gif', GIF, content_type='image/gif'),
+        )
+
+    def setUp(self):
+        self.pizzeria = self._restaurant('Pizza Palace', '1 Main Street')
+        self.diner = self._restaurant('Corner Diner', '5 Harbour Road')
+        self.sushi = self._restaurant('Sushi Bar', '9 Main Street')
+        Product.objects.create(name='Pepperoni Pizza', description='Wood fired', price=9, restaurant=self.diner)
+        Product.objects.create(name='Salmon Nigiri', price=6, restaurant=self.sushi)
+
+    def _names(self, query, **kwargs):
+        return [restaurant.restaurant_name for restaurant in search_restaurants(query, **kwargs)]
+
+    def test_restaurant_name_outranks_dish_match(self):
+        self.assertEqual(self._names('pizza'), ['Pizza Palace', 'Corner Diner'])
+
+    def test_substring_and_address_match(self):
+        self.assertEqual(self._names('nigir'), ['Sushi Bar'])
+        self.assertEqual(sorted(self._names('main street')), ['Pizza Palace', 'Sushi Bar'])
+
+    def test_matched_dishes_attached(self):
+        results = search_restaurants('pepperoni')
+        self.assertEqual([r.matched_dishes for r in results], [['Pepperoni Pizza']])
+
+    def test_index_follows_saves_and_deletes(self):
+        dish = Product.objects.create(name='Tuna Roll', price=7, restaurant=self.sushi)
+        self.assertEqual(self._names('tuna'), ['Sushi Bar'])
+
+        dish.name = 'Eel Roll'
+        dish.save()
+        self.assertEqual(self._names('tuna'), [])
+
+        dish.delete()
+        self.assertEqual(self._names('eel roll'), [])
+
+        self.diner.restaurant_name = 'Harbour Grill'
+        self.diner.save()
+        self.assertEqual(self._names('grill'), ['Harbour Grill'])
+
+    def test_pagination(self):
+        first = search_restaurants('street', per_page=1)
+        second = search_restaurants('street', page=2, per_page=1)
+
+        self.assertTrue(first.has_next)
+        self.assertFalse(second.has_next)
+        self.assertTrue(second.has_previous)
+        self.assertNotEqual(first.restaurants, second.restaurants)
+
+    def test_short_terms_fall_back_to_scan(self):
+        self.assertEqual(self._names('ba'), ['Sushi Bar'])
+
+    def test_rebuild_command(self):
+        SearchEntry.objects.all().delete()
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(SearchEntry.objects.count(), 5)
+        self.assertEqual(self._names('salmon'), ['Sushi Bar'])
+
+    def test_search_view(self):
+        response = self.client.get(reverse('restaurant_search'), {'q': 'pizza'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Pepperoni Pizza')
+        self.assertEqual([card['name'] for card in response.context['cards']],
+                         ['Pizza Palace', 'Corner Diner'])
@@ -1,11 +1,17 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
-from menu_dashboard.models import Restaurant, Category, Product, BrandColor
+from menu_dashboard.models import Restaurant, Category, Product, BrandColor, Notification
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.utils import timezone
+from datetime import timedelta
 
+@override_settings(IMAGE_VARIANT_BACKGROUND=False, MENU_VISIT_BACKGROUND=False)
 class RestaurantMenuViewTest(TestCase):
     def setUp(self):
+        cache.clear()
+
         # Create test user
         self.user = get_user_model().objects.create_user(
             username='testuser',
@@ -70,7 +76,7 @@ class RestaurantMenuViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         
         # Check if the correct template is used
-        self.assertTemplateUsed(response, 'menu_dashboard/index1.html')
+        self.assertTemplateUsed(response, 'menu_dashboard/index.html')
         
         # Check if the context contains the required data
         self.assertIn('restaurant', response.context)
@@ -83,6 +89,65 @@ class RestaurantMenuViewTest(TestCase):
         
         # Check if the product is in the categorized products
         self.assertTrue(
-            any(self.product in category_products 
-                for category_products in response.context['allProds'])
-        ) 
\ No newline at end of file
+            any(product['id'] == self.product.id
+                for category_products in response.context['allProds']
+                for product in category_products)
+        )
+
+    def _menu_url(self):
+        return reverse('restaurant_menu', kwargs={
+            'restaurant_name_slug': 'test-restaurant',
+            'hashed_slug': 'test-slug'
+        })
+
+    def test_anonymous_menu_served_from_page_cache(self):
+        first = self.client.get(self._menu_url())
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('ETag', first)
+
+        second = self.client.get(self._menu_url())
+        self.assertTemplateNotUsed(second, 'menu_dashboard/index.html')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_query_string_shares_the_cached_page(self):
+        first = self.client.get(self._menu_url())
+
+        tracked = self.client.get(self._menu_url(), {'utm_source': 'qr', 'fbclid': 'abc'})
+        self.assertTemplateNotUsed(tracked, 'menu_dashboard/index.html')
+        self.assertEqual(tracked['ETag'], first['ETag'])
+        self.assertNotContains(tracked, 'utm_source')
+
+    def test_menu_page_refreshed_after_notification_edit(self):
+        now = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            notification = Notification.objects.create(
+                title='Notice', message='Closed for lunch', send_to_all=True,
+                start_date=now - timedelta(hours=1), end_date=now + timedelta(hours=1),
+            )
+        self.assertContains(self.client.get(self._menu_url()), 'Closed for lunch')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notification.message = 'Open all afternoon'
+            notification.save()
+
+        response = self.client.get(self._menu_url())
+        self.assertContains(response, 'Open all afternoon')
+        self.assertNotContains(response, 'Closed for lunch')
+
+    def test_anonymous_menu_etag_returns_not_modified(self):
+        etag = self.client.get(self._menu_url())['ETag']
+
+        response = self.client.get(self._menu_url(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_menu_page_refreshed_after_product_change(self):
+        self.client.get(self._menu_url())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.name = 'Renamed Product'
+            self.product.save()
+
+        response = self.client.get(self._menu_url())
+        self.assertContains(response, 'Renamed Product')
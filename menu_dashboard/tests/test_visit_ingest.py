@@ -0,0 +1,66 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from menu_dashboard.models import MenuVisit, Restaurant
+from menu_dashboard.visit_ingest import MenuVisitRecorder
+
+
+@override_settings(MENU_VISIT_BACKGROUND=False)
+class MenuVisitRecorderTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username='visituser',
+            password='testpass123'
+        )
+        self.restaurant = Restaurant.objects.create(
+            user=self.user,
+            restaurant_name='Visit Cafe',
+            hashed_slug='visit-slug',
+            logo_pic=SimpleUploadedFile(
+                name='visit_logo.gif',
+                content=b'GIF87a\x01\x00\x01\x00\x80\x01\x00\x00\x00\x00ccc,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;',
+                content_type='image/gif'
+            )
+        )
+
+    def test_flush_writes_queued_visits_in_bulk(self):
+        recorder = MenuVisitRecorder(batch_size=2)
+        for _ in range(3):
+            recorder.record(self.restaurant.id, '127.0.0.1', 'agent', 'iPhone')
+
+        self.assertEqual(MenuVisit.objects.count(), 0)
+        with self.assertNumQueries(2):
+            recorder.flush()
+
+        self.assertEqual(MenuVisit.objects.filter(restaurant=self.restaurant).count(), 3)
+        self.assertEqual(recorder.stats()['written'], 3)
+
+    def test_full_queue_drops_and_counts(self):
+        recorder = MenuVisitRecorder(max_size=1)
+
+        self.assertTrue(recorder.record(self.restaurant.id, '127.0.0.1', 'agent', 'iPhone'))
+        self.assertFalse(recorder.record(self.restaurant.id, '127.0.0.1', 'agent', 'iPhone'))
+        self.assertEqual(recorder.stats()['dropped'], 1)
+        self.assertEqual(recorder.stats()['queued'], 1)
+
+    def test_menu_view_queues_visit_without_writing(self):
+        recorder = MenuVisitRecorder()
+        url = reverse('restaurant_menu', kwargs={
+            'restaurant_name_slug': 'visit-cafe',
+            'hashed_slug': 'visit-slug'
+        })
+
+        with mock.patch('menu_dashboard.visit_ingest.visit_recorder', recorder):
+            self.client.get(url, HTTP_USER_AGENT='Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X)')
+
+        self.assertEqual(MenuVisit.objects.count(), 0)
+        recorder.flush()
+        visit = MenuVisit.objects.get()
+        self.assertEqual(visit.restaurant, self.restaurant)
+        self.assertEqual(visit.device, 'iPhone')
@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from menu_dashboard.models import MenuVisit, MenuVisitDaily, MenuVisitHourly, Restaurant
+from menu_dashboard.visit_rollups import fold_new_visits, prune_rolled_up_visits
+
+
+class MenuVisitRollupTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='rollupuser',
+            password='testpass123'
+        )
+        self.restaurant = Restaurant.objects.create(
+            user=self.user,
+            restaurant_name='Rollup Diner',
+            hashed_slug='rollup-slug'
+        )
+        self.hour = (timezone.now() - timedelta(days=3)).replace(minute=0, second=0, microsecond=0)
+
+    def _visit(self, minutes, device='iPhone'):
+        return MenuVisit.objects.create(
+            restaurant=self.restaurant,
+            timestamp=self.hour + timedelta(minutes=minutes),
+            ip_address='127.0.0.1',
+            user_agent='agent',
+            device=device
+        )
+
+    def test_fold_counts_per_period_and_device(self):
+        self._visit(5)
+        self._visit(10)
+        self._visit(15, device=None)
+        self._visit(70)
+
+        self.assertEqual(fold_new_visits(), 4)
+
+        hourly = MenuVisitHourly.objects.get(restaurant=self.restaurant, period_start=self.hour, device='iPhone')
+        self.assertEqual(hourly.visits, 2)
+        self.assertEqual(MenuVisitHourly.objects.get(device='').visits, 1)
+        self.assertEqual(sum(MenuVisitDaily.objects.values_list('visits', flat=True)), 4)
+
+    def test_fold_is_incremental(self):
+        self._visit(5)
+        fold_new_visits()
+        self.assertEqual(fold_new_visits(), 0)
+
+        self._visit(6)
+        self.assertEqual(fold_new_visits(chunk_size=1), 1)
+        self.assertEqual(MenuVisitHourly.objects.get(device='iPhone').visits, 2)
+
+    def test_recent_visits_wait_to_settle(self):
+        MenuVisit.objects.create(restaurant=self.restaurant, ip_address='127.0.0.1', user_agent='agent')
+
+        self.assertEqual(fold_new_visits(), 0)
+
+    def test_prune_only_removes_rolled_up_visits(self):
+        self._visit(5)
+        fold_new_visits()
+        unrolled = self._visit(6)
+
+        self.assertEqual(prune_rolled_up_visits(days=1), 1)
+        self.assertEqual(list(MenuVisit.objects.all()), [unrolled])
+
+    def test_command(self):
+        self._visit(5)
+        call_command('rollup_menu_visits', '--prune-days', '1', stdout=open('/dev/null', 'w'))
+
+        self.assertEqual(MenuVisit.objects.count(), 0)
+        self.assertEqual(MenuVisitDaily.objects.get().visits, 1)
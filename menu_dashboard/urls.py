@@ -10,8 +10,13 @@ from django.utils.text import slugify
 urlpatterns = [
 	path('view/', views.admin_dashboard_view, name='admin-dashboard'),
 	path('restaurants/', views.restaurant_list, name='restaurant_list'),
+	path('restaurants/cards/', views.restaurant_cards, name='restaurant_cards'),
+	path('restaurants/nearby/', views.restaurants_nearby, name='restaurants_nearby'),
+	path('theme/<int:restaurant_id>/<str:digest>.css', views.brand_theme_css, name='brand_theme_css'),
 	path('restaurant-search/', views.restaurant_search, name='restaurant_search'),
 	path('create-menu/', views.create_restaurant_menu, name='create_menu'),
+	path('orders/stream/', views.restaurant_order_stream, name='restaurant_order_stream'),
+	path('riders/location/', views.update_rider_location, name='update_rider_location'),
 	path('<slug:restaurant_name_slug>/<slug:hashed_slug>/', RestaurantMenuView.as_view(), name='restaurant_menu'),
 	path('restaurant_menu_list/', views.restaurant_menu_list, name='restaurant-menu-list'),
 	path('delete_product/<int:product_id>/', views.delete_product, name='delete_product'),
@@ -11,6 +11,7 @@ from django.core.exceptions import ValidationError
 from decimal import Decimal
 from django.http import HttpResponseServerError
 from django.urls import reverse
+from django.utils.http import urlencode
 from django.utils.text import slugify
 from PIL import Image
 from io import BytesIO
@@ -36,7 +37,8 @@ from django.views.decorators.cache import cache_page  # server-side cache
 # from django.contrib.gis.db.models.functions import Distance
 # from django.contrib.gis.geos import Point
 
-from django.http import HttpResponseForbidden
+from django.http import HttpResponseForbidden, HttpResponseNotModified, Http404, StreamingHttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
 from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.core.cache import cache
@@ -44,8 +46,27 @@ from django.db import transaction
 from django.views.decorators.http import require_http_methods, require_POST
 from django.views.decorators.vary import vary_on_cookie
 from django.core.validators import validate_email
+from django.core.handlers.asgi import ASGIRequest
 from django.db.models import F, Sum
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from .business_hours import week_minute
+from .nearby import NEARBY_LIMIT, nearby_restaurants
+from .brand_theme import get_brand_theme
+from .menu_snapshot import get_menu_snapshot
+from .restaurant_cache import get_or_build
+from .restaurant_cards import card_page, card_payload
+from .search import search_restaurants
+from .context_processors import get_active_notification
+from .visit_ingest import record_menu_visit
+from .order_events import order_event_stream
+from .page_cache import (
+    build_page_entry,
+    etag_matches,
+    get_or_render_page,
+    get_restaurant_id_for_slug,
+    menu_page_key,
+    remember_restaurant_id_for_slug,
+)
 
 
 class ProductDetailView(DetailView):
@@ -281,31 +302,21 @@ def restaurant_link(request, restaurant_name_slug, hashed_slug):
     # Fetch the restaurant
     restaurant = get_object_or_404(Restaurant, hashed_slug=hashed_slug)
 
-    # Log menu visit
-    ip_address = request.META.get('REMOTE_ADDR')
-    user_agent_str = request.META.get('HTTP_USER_AGENT', '')
-    parsed_user_agent = getattr(request, 'user_agent', None)
-    device = parsed_user_agent.device.family if parsed_user_agent and hasattr(parsed_user_agent, 'device') else "Unknown Device"
-    MenuVisit.objects.create(
-        restaurant=restaurant,
-        ip_address=ip_address,
-        user_agent=user_agent_str,
-        device=device
-    )
+    # Log menu visit (queued, written in batches by a background thread)
+    record_menu_visit(request, restaurant.id)
 
-    # Cache categories + products
-    cache_key = f"restaurant_{restaurant.id}_categories"
-    categories = cache.get(cache_key)
-    if not categories:
+    # Cache categories + products (versioned, rebuilt once per change)
+    def build_categories():
         product_queryset = Product.objects.filter(restaurant=restaurant).prefetch_related('variations')
-        categories = list(
+        return list(
             Category.objects
                 .filter(products__restaurant=restaurant)
                 .distinct()
                 .order_by('order')
                 .prefetch_related(Prefetch('products', queryset=product_queryset))
         )
-        cache.set(cache_key, categories, 300)  # 5 minutes
+
+    categories = get_or_build(restaurant.id, f"restaurant_{restaurant.id}_categories", build_categories)
 
     # Build categorized_products
     today = datetime.today().weekday()  # 0 = Monday, …, 6 = Sunday
@@ -378,18 +389,16 @@ def restaurant_link(request, restaurant_name_slug, hashed_slug):
     og_description  = restaurant.address or "Scan the QR code to access the digital menu."
 
     # Brand colors
-    brand_colors = restaurant.brand_colors.all()
-    primary_brand_color   = brand_colors[0].color if brand_colors.count() > 0 else "#f7c028"
-    secondary_brand_color = brand_colors[1].color if brand_colors.count() > 1 else "#000000"
-    third_brand_color     = brand_colors[2].color if brand_colors.count() > 2 else "#ffffff"
+    brand_theme = get_brand_theme(restaurant.id)
 
     context = {
         'restaurant': restaurant,
         'allProds': categorized_products,
         'categories': categories,
-        'primary_brand_color': primary_brand_color,
-        'secondary_brand_color': secondary_brand_color,
-        'third_brand_color': third_brand_color,
+        'brand_theme': brand_theme,
+        'primary_brand_color': brand_theme['primary']['hex'],
+        'secondary_brand_color': brand_theme['secondary']['hex'],
+        'third_brand_color': brand_theme['third']['hex'],
         'hide_all_category': restaurant.id == 9,
         # OG/Twitter context:
         'logo_url': logo_url,
@@ -427,11 +436,8 @@ def order_success(request, restaurant_name_slug, hashed_slug, order_id):
     # 5) Get order products - using OrderProduct instead of OrderItem
     order_items = OrderProduct.objects.filter(order=order)
     
-    # 6) Get brand colors with fallbacks (similar to RestaurantCheckoutView)
-    brand_colors = restaurant.brand_colors.all()
-    primary_brand_color = brand_colors[0].color if brand_colors.count() > 0 else "#f7c028"
-    secondary_brand_color = brand_colors[1].color if brand_colors.count() > 1 else "#000000"
-    third_brand_color = brand_colors[2].color if brand_colors.count() > 2 else "#ffffff"
+    # 6) Precomputed brand palette (rebuilt whenever a BrandColor changes)
+    brand_theme = get_brand_theme(restaurant.id)
     
     # 7) Convert to local timezone (for accuracy) and build context
     local_order_time = timezone.localtime(order.order_date)
@@ -445,9 +451,10 @@ def order_success(request, restaurant_name_slug, hashed_slug, order_id):
         'table_number':   order.table_number,
         'amount':         order.amount,
         'order_items':    order_items,
-        'primary_brand_color': primary_brand_color,
-        'secondary_brand_color': secondary_brand_color,
-        'third_brand_color': third_brand_color,
+        'brand_theme':    brand_theme,
+        'primary_brand_color': brand_theme['primary']['hex'],
+        'secondary_brand_color': brand_theme['secondary']['hex'],
+        'third_brand_color': brand_theme['third']['hex'],
     }
     # 8) Render the success page
     return render(request, 'menu_dashboard/order_success.html', context)
@@ -492,14 +499,28 @@ def order_success(request, restaurant_name_slug, hashed_slug, order_id):
 
 def restaurant_search(request):
     query = request.GET.get('q')
+    results = None
+    next_cards_url = None
     if query:
-        restaurants = Restaurant.objects.filter(restaurant_name__icontains=query)
+        try:
+            page = int(request.GET.get('page', 1))
+        except ValueError:
+            page = 1
+        results = search_restaurants(query, page)
+        minute = week_minute()
+        cards = [
+            {**card_payload(restaurant, minute), 'matched_dishes': restaurant.matched_dishes}
+            for restaurant in results
+        ]
     else:
-        restaurants = Restaurant.objects.all()
+        cards, next_cursor = card_page()
+        next_cards_url = _next_cards_url(next_cursor, False)
 
     context = {
-        'restaurants': restaurants,
+        'cards': cards,
         'query': query,
+        'results': results,
+        'next_cards_url': next_cards_url,
     }
 
     return render(request, 'menu_dashboard/store-list.html', context)
@@ -507,17 +528,74 @@ def restaurant_search(request):
 
 
 
+def _card_cursor(request):
+    try:
+        return int(request.GET['cursor'])
+    except (KeyError, ValueError):
+        return None
+
+
+def _next_cards_url(next_cursor, open_now):
+    if next_cursor is None:
+        return None
+    params = {'cursor': next_cursor}
+    if open_now:
+        params['open'] = 'now'
+    return f"{reverse('restaurant_cards')}?{urlencode(params)}"
+
+
 def restaurant_list(request):
-    # Fetch all restaurants from the database
-    restaurants = Restaurant.objects.all()
+    # First page of precomputed cards; the rest arrive via restaurant_cards.
+    open_now = request.GET.get('open') == 'now'
+    cards, next_cursor = card_page(_card_cursor(request), open_now)
 
     context = {
-        'restaurants': restaurants,
+        'cards': cards,
+        'open_now': open_now,
+        'next_cards_url': _next_cards_url(next_cursor, open_now),
     }
 
     return render(request, 'menu_dashboard/store-list.html', context)
 
 
+def restaurant_cards(request):
+    """Infinite-scroll feed for the store list: ``{"cards": [...], "next": url or null}``."""
+    open_now = request.GET.get('open') == 'now'
+    cards, next_cursor = card_page(_card_cursor(request), open_now)
+    return JsonResponse({'cards': cards, 'next': _next_cards_url(next_cursor, open_now)})
+
+
+def restaurants_nearby(request):
+    """
+    Nearest restaurants to ``?latitude=&longitude=`` as store-list cards with
+    ``distance_km``; only open ones unless ``?open=any``.
+    """
+    try:
+        latitude = float(request.GET['latitude'])
+        longitude = float(request.GET['longitude'])
+        limit = int(request.GET.get('limit', NEARBY_LIMIT))
+    except (KeyError, ValueError):
+        return JsonResponse({'error': 'latitude and longitude are required'}, status=400)
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return JsonResponse({'error': 'Coordinates out of range'}, status=400)
+    open_now = request.GET.get('open') != 'any'
+    return JsonResponse({'cards': nearby_restaurants(latitude, longitude, limit, open_now)})
+
+
+def brand_theme_css(request, restaurant_id, digest):
+    """
+    A restaurant's brand palette as CSS custom properties. The URL carries the
+    palette's digest, so the file can be cached forever: a colour change
+    produces a new URL.
+    """
+    theme = get_brand_theme(restaurant_id)
+    if digest != theme['digest']:
+        return redirect(theme['css_url'])
+    response = HttpResponse(theme['css'], content_type='text/css')
+    patch_cache_control(response, public=True, max_age=60 * 60 * 24 * 365, immutable=True)
+    return response
+
+
 import logging
 
 logger = logging.getLogger(__name__)
@@ -532,6 +610,7 @@ class RestaurantCheckoutView(View):
     A class-based view for handling restaurant checkout operations.
     This view is optimized for performance and scalability.
     """
+    IDEMPOTENCY_TTL = 60 * 60 * 24  # 24 hours
     
     def get(self, request, restaurant_name_slug, hashed_slug):
         """
@@ -546,28 +625,25 @@ class RestaurantCheckoutView(View):
             if not restaurant:
                 # If not in cache, fetch from database with optimized query
                 restaurant = get_object_or_404(
-                    Restaurant.objects.select_related('user')
-                                    .prefetch_related('brand_colors'),
+                    Restaurant.objects.select_related('user'),
                     slug=restaurant_name_slug,
                     hashed_slug=hashed_slug
                 )
                 # Cache for 5 minutes
                 cache.set(cache_key, restaurant, 300)
             
-            # Get brand colors with fallbacks
-            brand_colors = restaurant.brand_colors.all()
-            primary_brand_color = brand_colors[0].color if brand_colors.count() > 0 else "#f7c028"
-            secondary_brand_color = brand_colors[1].color if brand_colors.count() > 1 else "#000000"
-            third_brand_color = brand_colors[2].color if brand_colors.count() > 2 else "#ffffff"
+            # Precomputed brand palette (rebuilt whenever a BrandColor changes)
+            brand_theme = get_brand_theme(restaurant.id)
             
             context = {
                 'restaurant': restaurant,
                 'is_logged_in': request.user.is_authenticated,
                 'restaurant_lat': restaurant.latitude,
                 'restaurant_lon': restaurant.longitude,
-                'primary_brand_color': primary_brand_color,
-                'secondary_brand_color': secondary_brand_color,
-                'third_brand_color': third_brand_color,
+                'brand_theme': brand_theme,
+                'primary_brand_color': brand_theme['primary']['hex'],
+                'secondary_brand_color': brand_theme['secondary']['hex'],
+                'third_brand_color': brand_theme['third']['hex'],
             }
             
             return render(request, 'menu_dashboard/checkout.html', context)
@@ -593,6 +669,9 @@ class RestaurantCheckoutView(View):
             
             if not cart_data or not payment_method:
                 return JsonResponse({'error': 'Missing required data'}, status=400)
+            # Shown to the kitchen on its live order feed, so only known methods.
+            if payment_method not in dict(Orders.PAYMENT_METHOD):
+                return JsonResponse({'error': 'Invalid payment method'}, status=400)
             
             # Parse cart data
             try:
@@ -600,6 +679,16 @@ class RestaurantCheckoutView(View):
             except json.JSONDecodeError:
                 return JsonResponse({'error': 'Invalid cart data format'}, status=400)
             
+            # A retried submission returns the original order untouched
+            idempotency_key = self._get_idempotency_key(request)
+            if idempotency_key:
+                replay = self._replay_order(request.user, idempotency_key)
+                if replay is not None:
+                    return replay
+
+            # Validate quantities before touching the database
+            quantities = self._parse_cart(cart)
+
             # Start transaction
             with transaction.atomic():
                 # Get restaurant
@@ -608,7 +697,32 @@ class RestaurantCheckoutView(View):
                     slug=restaurant_name_slug,
                     hashed_slug=hashed_slug
                 )
-                
+
+                # Lock and fetch every cart product in one query (id order avoids deadlocks)
+                products = {
+                    product.id: product
+                    for product in Product.objects.select_for_update().filter(
+                        id__in=quantities,
+                        restaurant=restaurant,
+                        status='Available'
+                    ).order_by('id')
+                }
+                missing = [product_id for product_id in quantities if product_id not in products]
+                if missing:
+                    raise ValidationError(f"Product {missing[0]} not found or not available")
+
+                # Validate and price every line in memory
+                total_amount = Decimal('0.00')
+                service_charge = Decimal('0.25')
+                for product_id, qty in quantities.items():
+                    try:
+                        total_amount += products[product_id].price * qty
+                    except TypeError:
+                        raise ValidationError(f"Invalid data for product {product_id}")
+
+                # Add service charge
+                total_amount += service_charge
+
                 # Get or create customer
                 customer, _ = Customer.objects.get_or_create(user=request.user)
                 
@@ -619,49 +733,20 @@ class RestaurantCheckoutView(View):
                     status='Pending',
                     payment_method=payment_method,
                     table_number=table_number,
-                    amount=0
+                    amount=total_amount,
+                    idempotency_key=idempotency_key
                 )
                 
-                # Calculate total amount
-                total_amount = Decimal('0.00')
-                service_charge = Decimal('0.25')
-                
-                # Process cart items
-                for product_id, item_data in cart.items():
-                    try:
-                        product = Product.objects.select_for_update().get(
-                            id=product_id,
-                            restaurant=restaurant,
-                            status='Available'
-                        )
-                        
-                        qty = int(item_data[0])
-                        if qty <= 0:
-                            raise ValidationError(f"Invalid quantity for product {product_id}")
-                        
-                        # Calculate item total
-                        item_total = product.price * qty
-                        total_amount += item_total
-                        
-                        # Create order product
-                        OrderProduct.objects.create(
-                            order=order,
-                            product=product,
-                            quantity=qty,
-                            price=product.price
-                        )
-                        
-                    except Product.DoesNotExist:
-                        raise ValidationError(f"Product {product_id} not found or not available")
-                    except (ValueError, TypeError):
-                        raise ValidationError(f"Invalid data for product {product_id}")
-                
-                # Add service charge
-                total_amount += service_charge
-                
-                # Update order amount
-                order.amount = total_amount
-                order.save()
+                # Insert all order lines at once
+                OrderProduct.objects.bulk_create([
+                    OrderProduct(
+                        order=order,
+                        product=products[product_id],
+                        quantity=qty,
+                        price=products[product_id].price
+                    )
+                    for product_id, qty in quantities.items()
+                ])
                 
                 # Create earnings record
                 Earnings.objects.create(
@@ -682,14 +767,20 @@ class RestaurantCheckoutView(View):
                 
                 # Log successful order
                 logger.info(f"Order {order.id} placed successfully for restaurant {restaurant.id}")
-                
-                return JsonResponse({
-                    'success': True,
-                    'order_id': order.id,
-                    'total_amount': str(total_amount),
-                    'message': 'Order placed successfully'
-                })
-                
+
+            payload = self._order_payload(order)
+            if idempotency_key:
+                cache.set(self._idempotency_cache_key(request.user, idempotency_key),
+                          payload, self.IDEMPOTENCY_TTL)
+            return JsonResponse(payload)
+
+        except IntegrityError:
+            # A concurrent retry with the same key committed first
+            replay = self._replay_order(request.user, idempotency_key) if idempotency_key else None
+            if replay is not None:
+                return replay
+            logger.error("Integrity error in checkout POST", exc_info=True)
+            return JsonResponse({'error': 'An error occurred while processing your order'}, status=500)
         except ValidationError as e:
             logger.warning(f"Validation error in checkout: {str(e)}")
             return JsonResponse({'error': str(e)}, status=400)
@@ -697,6 +788,57 @@ class RestaurantCheckoutView(View):
             logger.error(f"Error in checkout POST: {str(e)}")
             return JsonResponse({'error': 'An error occurred while processing your order'}, status=500)
 
+    def _get_idempotency_key(self, request):
+        key = request.headers.get('Idempotency-Key') or request.POST.get('idempotency_key')
+        if key and len(key) > 64:
+            raise ValidationError("Idempotency key is too long")
+        return key or None
+
+    def _idempotency_cache_key(self, user, key):
+        return f"checkout_idempotency_{user.id}_{key}"
+
+    def _order_payload(self, order):
+        return {
+            'success': True,
+            'order_id': order.id,
+            'total_amount': str(order.amount),
+            'message': 'Order placed successfully'
+        }
+
+    def _replay_order(self, user, key):
+        """Return the original response for an already-used key, or None."""
+        cache_key = self._idempotency_cache_key(user, key)
+        payload = cache.get(cache_key)
+        if payload is None:
+            order = Orders.objects.filter(customer__user=user, idempotency_key=key).first()
+            if order is None:
+                return None
+            payload = self._order_payload(order)
+            cache.set(cache_key, payload, self.IDEMPOTENCY_TTL)
+        logger.info(f"Replaying order {payload['order_id']} for idempotency key {key}")
+        response = JsonResponse(payload)
+        response['Idempotent-Replayed'] = 'true'
+        return response
+
+    def _parse_cart(self, cart):
+        """
+        Turn the posted cart ({product_id: [quantity, ...]}) into
+        {product_id: quantity}, raising ValidationError on bad entries.
+        """
+        if not isinstance(cart, dict):
+            raise ValidationError("Invalid cart data format")
+        quantities = {}
+        for product_id, item_data in cart.items():
+            try:
+                product_pk = int(product_id)
+                qty = int(item_data[0])
+            except (ValueError, TypeError, IndexError, KeyError):
+                raise ValidationError(f"Invalid data for product {product_id}")
+            if qty <= 0:
+                raise ValidationError(f"Invalid quantity for product {product_id}")
+            quantities[product_pk] = quantities.get(product_pk, 0) + qty
+        return quantities
+
 # Replace the old restaurant_checkout view with the new class-based view
 restaurant_checkout = RestaurantCheckoutView.as_view()
 
@@ -808,6 +950,50 @@ def admin_dashboard_view(request):
     return render(request, 'menu_dashboard/dashboard_view.html', context)
 
 
+@login_required
+@require_POST
+def update_rider_location(request):
+    """Riders' apps post their position here; dispatch uses it to pick the nearest rider."""
+    rider = Rider.objects.filter(user=request.user).first()
+    if rider is None:
+        return JsonResponse({'error': 'Only riders can report a location'}, status=403)
+    try:
+        latitude = float(request.POST['latitude'])
+        longitude = float(request.POST['longitude'])
+    except (KeyError, ValueError):
+        return JsonResponse({'error': 'latitude and longitude are required'}, status=400)
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return JsonResponse({'error': 'Coordinates out of range'}, status=400)
+    rider.update_position(latitude, longitude)
+    return JsonResponse({'geohash': rider.geohash, 'is_available': rider.is_available})
+
+
+async def restaurant_order_stream(request):
+    """
+    Server-Sent Events feed of new orders and status changes for the
+    logged-in vendor's restaurant. Must be served through snap_menu.asgi so
+    idle connections cost no worker thread.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+
+    restaurant_id = await Restaurant.objects.filter(user=user).values_list('id', flat=True).afirst()
+    if restaurant_id is None:
+        return HttpResponseForbidden("Only restaurant accounts can follow the order feed.")
+
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI, Django drains an async stream to the end before sending
+        # anything, and this one never ends: refuse rather than hang a worker.
+        # EventSource gives up on an error status instead of reconnecting.
+        return JsonResponse({'error': 'The order feed is only available under ASGI'}, status=503)
+
+    response = StreamingHttpResponse(order_event_stream(restaurant_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 class RestaurantMenuView(DetailView):
     model = Restaurant
     template_name = 'menu_dashboard/index.html'
@@ -835,35 +1021,68 @@ class RestaurantMenuView(DetailView):
             raise Http404("Restaurant not found")
 
     def get_queryset(self):
-        return Restaurant.objects.select_related('user').prefetch_related('brand_colors')
+        return Restaurant.objects.select_related('user')
+
+    def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            response = super().get(request, *args, **kwargs)
+            self._log_menu_visit(self.object.id)
+            self._handle_customer_assignment(self.object)
+            return response
+        return self._get_cached_page(request, *args, **kwargs)
+
+    def _get_cached_page(self, request, *args, **kwargs):
+        """
+        Serve anonymous visitors from the rendered-HTML cache. Pages are keyed
+        on hashed_slug, weekday (the wings discount) and the active
+        notification's content, and tagged with the restaurant's content version.
+        """
+        hashed_slug = kwargs.get('hashed_slug')
+        restaurant_id = get_restaurant_id_for_slug(hashed_slug)
+        if restaurant_id is None:
+            self.object = self.get_object()
+            restaurant_id = self.object.id
+            remember_restaurant_id_for_slug(hashed_slug, restaurant_id)
+
+        def render_page():
+            if getattr(self, 'object', None) is None:
+                self.object = self.get_object()
+            response = self.render_to_response(self.get_context_data(object=self.object))
+            return build_page_entry(response, self.object.slug)
+
+        notification = get_active_notification(request)['notification']
+        key = menu_page_key(
+            hashed_slug,
+            datetime.today().weekday(),
+            notification,
+            request.build_absolute_uri(request.path),
+        )
+        page = get_or_render_page(restaurant_id, key, render_page)
+        if page['slug'] != kwargs.get('restaurant_name_slug'):
+            raise Http404("Restaurant not found")
+
+        self._log_menu_visit(restaurant_id)
+        self._handle_customer_assignment(None)
+
+        if etag_matches(request, page['etag']):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(page['content'], content_type=page['content_type'])
+        response['ETag'] = page['etag']
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Cookie',))
+        return response
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         restaurant = self.object
         today = datetime.today().weekday()
 
-        # Log menu visit asynchronously
-        self._log_menu_visit(restaurant)
-
-        # Get cached or fresh categories with products
-        categories = self._get_cached_categories(restaurant)
-        
-        # Process products with variations and discounts
-        categorized_products = self._process_products(categories, today)
-        
-        # Get uncategorized products
-        uncategorized_products = self._get_uncategorized_products(restaurant, today)
-        if uncategorized_products:
-            categorized_products.append(uncategorized_products)
-
-        # Handle customer assignment
-        self._handle_customer_assignment(restaurant)
+        # Precompiled, plain-data menu (categories -> products -> variations)
+        snapshot = get_menu_snapshot(restaurant, today)
 
         # Get brand colors
-        brand_colors = restaurant.brand_colors.all()
-        primary_brand_color = brand_colors[0].color if brand_colors.count() > 0 else "#f7c028"
-        secondary_brand_color = brand_colors[1].color if brand_colors.count() > 1 else "#000000"
-        third_brand_color = brand_colors[2].color if brand_colors.count() > 2 else "#ffffff"
+        brand_theme = get_brand_theme(restaurant.id)
 
         # Get meta data
         logo_url = (
@@ -874,115 +1093,24 @@ class RestaurantMenuView(DetailView):
 
         # Update context with old variable names
         context.update({
-            'allProds': categorized_products or [[]],
-            'categories': categories,
-            'primary_brand_color': primary_brand_color,
-            'secondary_brand_color': secondary_brand_color,
-            'third_brand_color': third_brand_color,
+            'allProds': snapshot['sections'] or [[]],
+            'categories': snapshot['categories'],
+            'brand_theme': brand_theme,
+            'primary_brand_color': brand_theme['primary']['hex'],
+            'secondary_brand_color': brand_theme['secondary']['hex'],
+            'third_brand_color': brand_theme['third']['hex'],
             'hide_all_category': restaurant.id == 9,
             'logo_url': logo_url,
-            'canonical_url': self.request.build_absolute_uri(),
+            'canonical_url': self.request.build_absolute_uri(self.request.path),
             'og_title': restaurant.restaurant_name or "Delvrr - QR Code Digital Menu",
             'og_description': restaurant.address or "Scan the QR code to access the digital menu.",
         })
 
         return context
 
-    def _log_menu_visit(self, restaurant):
-        """Log menu visit asynchronously using Django's async support"""
-        from asgiref.sync import sync_to_async
-        ip_address = self.request.META.get('REMOTE_ADDR')
-        user_agent = self.request.META.get('HTTP_USER_AGENT', '')
-        device = getattr(self.request.user_agent, 'device.family', 'Unknown Device')
-        
-        @sync_to_async
-        def create_visit():
-            MenuVisit.objects.create(
-                restaurant=restaurant,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                device=device
-            )
-        
-        # Run in background
-        create_visit()
-
-    def _get_cached_categories(self, restaurant):
-        """Get categories from cache or database"""
-        cache_key = f"restaurant_{restaurant.id}_categories"
-        categories = cache.get(cache_key)
-        
-        if not categories:
-            product_queryset = (
-                Product.objects
-                .filter(restaurant=restaurant)
-                .select_related('category')
-                .prefetch_related('variations')
-            )
-            
-            categories = list(
-                Category.objects
-                .filter(products__restaurant=restaurant)
-                .distinct()
-                .order_by('order')
-                .prefetch_related(
-                    Prefetch('products', queryset=product_queryset)
-                )
-            )
-            cache.set(cache_key, categories, 300)  # 5 minutes cache
-        
-        return categories
-
-    def _process_products(self, categories, today):
-        """Process products with their variations and discounts"""
-        categorized_products = []
-        
-        for category in categories:
-            category_products = []
-            for product in category.products.all():
-                self._process_product(product, today)
-                category_products.append(product)
-            
-            if category_products:
-                categorized_products.append(category_products)
-        
-        return categorized_products
-
-    def _process_product(self, product, today):
-        """Process individual product data"""
-        # Handle variations
-        product.variations_list = list(product.variations.all()) if product.variations.exists() else None
-        default_variation = product.variations.filter(name='S').first() or product.variations.first()
-        product.display_price = default_variation.price if default_variation else product.get_display_price()
-        
-        # Handle descriptions
-        product.has_description = bool(product.description and product.description.strip())
-        
-        # Handle discounts
-        product.is_discounted = (today == 2 and 'wings' in product.name.lower())
-        if product.is_discounted and product.display_price and not product.price_by_percentage:
-            try:
-                price = float(product.display_price)
-                product.display_price = price / 2
-            except (TypeError, ValueError):
-                product.display_price = 0.0
-        
-        # Handle GST
-        product.gst_note = "12% GST will be added" if product.charge_gst else ""
-
-    def _get_uncategorized_products(self, restaurant, today):
-        """Get and process uncategorized products"""
-        uncategorized_products = list(
-            Product.objects
-            .filter(restaurant=restaurant, category__isnull=True)
-            .select_related('restaurant')
-            .prefetch_related('variations')
-        )
-        
-        for product in uncategorized_products:
-            self._process_product(product, today)
-        
-        return uncategorized_products
+    def _log_menu_visit(self, restaurant_id):
+        """Queue the visit for the background writer; never touches the DB here."""
+        record_menu_visit(self.request, restaurant_id)
 
     def _handle_customer_assignment(self, restaurant):
         """Handle customer assignment if user is authenticated"""
@@ -0,0 +1,177 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class MenuVisitRecorder:
+    """
+    In-process, bounded queue of menu visits, drained by a background thread
+    that writes them with ``bulk_create`` once ``batch_size`` visits are
+    waiting or ``flush_interval`` seconds have passed.
+
+    ``record()`` never touches the database and never blocks: when the queue
+    is full the visit is dropped and counted, so a slow database slows down
+    analytics instead of menu requests.
+    """
+
+    def __init__(self, max_size=None, batch_size=None, flush_interval=None):
+        self.max_size = max_size or _setting('MENU_VISIT_QUEUE_SIZE', 10000)
+        self.batch_size = batch_size or _setting('MENU_VISIT_BATCH_SIZE', 200)
+        self.flush_interval = flush_interval or _setting('MENU_VISIT_FLUSH_INTERVAL', 2.0)
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._reset()
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def _reset(self):
+        self._queue = queue.Queue(maxsize=self.max_size)
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = os.getpid()
+
+    def record(self, restaurant_id, ip_address, user_agent, device):
+        from .models import MenuVisit
+
+        visit = MenuVisit(
+            restaurant_id=restaurant_id,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            device=device,
+        )
+        try:
+            self._queue.put_nowait(visit)
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+                dropped = self.dropped
+            if dropped % 1000 == 1:
+                logger.warning(f"Menu visit queue full; {dropped} visits dropped so far")
+            return False
+        with self._stats_lock:
+            self.recorded += 1
+        if _setting('MENU_VISIT_BACKGROUND', True):
+            self._ensure_worker()
+        return True
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked (e.g. gunicorn --preload): the parent's thread did not come along.
+                pending = self._queue
+                self._reset()
+                self._transfer(pending)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='menu-visit-writer', daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def _transfer(self, pending):
+        while True:
+            try:
+                self._queue.put_nowait(pending.get_nowait())
+            except (queue.Empty, queue.Full):
+                return
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect_batch()
+            if batch:
+                self._write(batch)
+
+    def _collect_batch(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        from .models import MenuVisit
+
+        with self._flush_lock:
+            close_old_connections()
+            try:
+                MenuVisit.objects.bulk_create(batch, batch_size=self.batch_size)
+                with self._stats_lock:
+                    self.written += len(batch)
+            except Exception as e:
+                with self._stats_lock:
+                    self.failed += len(batch)
+                logger.error(f"Failed to write {len(batch)} menu visits: {e}")
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        """Synchronously write everything still waiting in the queue."""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'queued': self._queue.qsize(),
+                'recorded': self.recorded,
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed,
+            }
+
+
+visit_recorder = MenuVisitRecorder()
+
+
+def device_family(request):
+    parsed_user_agent = getattr(request, 'user_agent', None)
+    device = getattr(parsed_user_agent, 'device', None)
+    return getattr(device, 'family', None) or "Unknown Device"
+
+
+def record_menu_visit(request, restaurant_id):
+    """Queue a visit for ``restaurant_id`` without touching the database."""
+    return visit_recorder.record(
+        restaurant_id=restaurant_id,
+        ip_address=request.META.get('REMOTE_ADDR') or '0.0.0.0',
+        user_agent=request.META.get('HTTP_USER_AGENT', ''),
+        device=device_family(request),
+    )
@@ -0,0 +1,123 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from .models import MenuVisit, MenuVisitDaily, MenuVisitHourly, MenuVisitRollupState
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_STATE_NAME = 'menu_visits'
+ROLLUP_TABLES = (
+    (MenuVisitHourly, TruncHour),
+    (MenuVisitDaily, TruncDay),
+)
+
+# Visits are written in batches by several processes, so ids can commit out
+# of order for a few seconds. Only fold visits older than this.
+SETTLE_DELAY = timedelta(minutes=1)
+
+
+def _settled_upper_bound():
+    cutoff = timezone.now() - SETTLE_DELAY
+    return (
+        MenuVisit.objects
+        .filter(timestamp__lte=cutoff)
+        .order_by('-id')
+        .values_list('id', flat=True)
+        .first()
+    ) or 0
+
+
+def _fold_range(model, trunc, start_id, end_id):
+    """Add the visits with start_id < id <= end_id to ``model``'s buckets."""
+    rows = (
+        MenuVisit.objects
+        .filter(id__gt=start_id, id__lte=end_id)
+        .annotate(period=trunc('timestamp'))
+        .values('restaurant_id', 'period', 'device')
+        .annotate(visits=Count('id'))
+        .order_by()
+    )
+    counts = defaultdict(int)
+    for row in rows:
+        counts[(row['restaurant_id'], row['period'], row['device'] or '')] += row['visits']
+    if not counts:
+        return 0
+
+    existing = {
+        (rollup.restaurant_id, rollup.period_start, rollup.device): rollup
+        for rollup in model.objects.filter(
+            restaurant_id__in={key[0] for key in counts},
+            period_start__in={key[1] for key in counts},
+        )
+    }
+    to_update, to_create = [], []
+    for (restaurant_id, period_start, device), visits in counts.items():
+        rollup = existing.get((restaurant_id, period_start, device))
+        if rollup is None:
+            to_create.append(model(
+                restaurant_id=restaurant_id,
+                period_start=period_start,
+                device=device,
+                visits=visits,
+            ))
+        else:
+            rollup.visits += visits
+            to_update.append(rollup)
+
+    model.objects.bulk_update(to_update, ['visits'])
+    model.objects.bulk_create(to_create)
+    return sum(counts.values())
+
+
+def fold_new_visits(chunk_size=50000):
+    """
+    Fold MenuVisit rows above the stored high-water mark into the hourly and
+    daily rollups. Each chunk is committed together with the new mark, so an
+    interrupted run resumes where it stopped and never counts a visit twice.
+    Returns the number of visits folded.
+    """
+    MenuVisitRollupState.objects.get_or_create(name=ROLLUP_STATE_NAME)
+    upper = _settled_upper_bound()
+    folded = 0
+    while True:
+        with transaction.atomic():
+            state = MenuVisitRollupState.objects.select_for_update().get(name=ROLLUP_STATE_NAME)
+            start = state.last_visit_id
+            if start >= upper:
+                break
+            end = min(start + chunk_size, upper)
+            chunk_counts = [_fold_range(model, trunc, start, end) for model, trunc in ROLLUP_TABLES]
+            folded += chunk_counts[0]
+            state.last_visit_id = end
+            state.save(update_fields=['last_visit_id', 'updated_at'])
+    logger.info(f"Folded {folded} menu visits into rollups (high-water mark {upper})")
+    return folded
+
+
+def prune_rolled_up_visits(days, batch_size=10000):
+    """
+    Delete raw MenuVisit rows older than ``days`` days that have already been
+    folded into the rollups. Returns the number of rows deleted.
+    """
+    state = MenuVisitRollupState.objects.filter(name=ROLLUP_STATE_NAME).first()
+    if state is None:
+        return 0
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted = 0
+    while True:
+        ids = list(
+            MenuVisit.objects
+            .filter(id__lte=state.last_visit_id, timestamp__lt=cutoff)
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        count, _ = MenuVisit.objects.filter(id__in=ids).delete()
+        deleted += count
+    return deleted
@@ -3,6 +3,10 @@ ASGI config for snap_menu project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Production is served through this entry point (see build.sh and
+render.yaml): the kitchen order feed (menu/orders/stream/) is a long-lived
+Server-Sent Events stream, which only works under ASGI.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 import dj_database_url
 from decouple import config
@@ -153,6 +154,9 @@ if ENVIRONMENT == "development":
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": BASE_DIR / "db.sqlite3",
+            # Take the write lock at BEGIN so concurrent dispatch/checkout
+            # transactions wait for each other instead of failing to upgrade.
+            "OPTIONS": {"transaction_mode": "IMMEDIATE"},
         }
     }
 else:
@@ -162,6 +166,31 @@ else:
         )
     }
 
+# Cache
+# Shared by every web worker and management command: cache entries are
+# invalidated by bumping version keys (menu_dashboard/restaurant_cache.py),
+# and a per-process LocMemCache would keep serving what another process
+# already invalidated. It holds whole menu pages and snapshots, which are
+# there to keep menu traffic off the database, so it is never the database:
+# Redis when REDIS_URL is set, otherwise files shared by the workers on this
+# host. Development and tests keep the per-process default.
+REDIS_URL = config("REDIS_URL", default="")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+elif IS_PRODUCTION:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": config("CACHE_DIR", default=os.path.join(tempfile.gettempdir(), "snap_menu_cache")),
+            "OPTIONS": {"MAX_ENTRIES": 5000},
+        }
+    }
+
 # Static Files
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
@@ -176,5 +205,19 @@ MEDIA_ROOT = BASE_DIR / "media"
 LOGIN_REDIRECT_URL = "/afterlogin"
 LOGIN_URL = "/customer_signin"
 
+# Menu visit ingestion (see menu_dashboard/visit_ingest.py)
+MENU_VISIT_QUEUE_SIZE = 10000     # visits held in memory before new ones are dropped
+MENU_VISIT_BATCH_SIZE = 200       # rows per bulk_create
+MENU_VISIT_FLUSH_INTERVAL = 2.0   # seconds before a partial batch is written
+
+# Product image variants (see menu_dashboard/image_variants.py)
+IMAGE_VARIANT_WORKERS = 2         # threads rendering resized WebP/AVIF/JPEG copies
+
+# Store-list cards (see menu_dashboard/restaurant_cards.py)
+CARD_WORKERS = 1                  # threads rebuilding cards after a restaurant or brand colour changes
+
+# Table QR codes (see menu_dashboard/qrcode_generator.py and qr_export.py)
+QR_WORKERS = 1                    # threads assigning QR codes to newly saved tables
+
 # Default Auto Field
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"